@@ -0,0 +1,311 @@
+
+import os
+
+import shlex
+
+import time
+
+import logging
+
+from itertools import islice
+
+from pathlib import Path
+
+from concurrent.futures import ProcessPoolExecutor
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup, check_for_setup, DEFAULT_SETUP_SIZE_LIMIT
+
+from GUM_Dispenser.GUM_Describe_Source import collect_module_jobs, submit_module_jobs, merge_module_results
+from GUM_Dispenser.GUM_Describe_Source import describe_module
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import write_project_nomnoml, iter_project_nomnoml
+from GUM_Dispenser.GUM_Generate_NOMNOML import ENTRY_STYLE_DIRECTIVE
+
+from GUM_Dispenser.GUM_Scan_Cache import evict_cache_entries, DEFAULT_CACHE_MAX_BYTES
+
+
+# File extension for the diagram written for each project
+
+BATCH_OUTPUT_SUFFIX = '.nomnoml'
+
+
+def read_batch_manifest(manifest_path: str) -> list:
+    """Read the projects listed in a batch manifest
+    Each line holds a project path and optionally a setup.py path, separated by whitespace.
+    Paths containing spaces may be quoted. Blank lines and lines starting with # are skipped,
+    and relative paths are resolved against the manifest's directory"""
+
+    manifest_dir = Path(manifest_path).resolve().parent
+
+    batch_projects = []
+
+    with open(manifest_path, 'r') as manifest_file:
+
+        for line_number, manifest_line in enumerate(manifest_file, 1):
+
+            if manifest_line.strip() == '' or manifest_line.strip().startswith('#'):
+
+                continue
+
+            line_fields = shlex.split(manifest_line)
+
+            if len(line_fields) > 2:
+
+                raise ValueError('Line ' + str(line_number) + ' of ' + manifest_path + ' should hold a project ' +
+                                 'path and an optional setup.py path')
+
+            batch_projects.append({'path': str(manifest_dir.joinpath(line_fields[0])),
+                                   'setup_file': str(manifest_dir.joinpath(line_fields[1]))
+                                   if len(line_fields) > 1 else None})
+
+    return batch_projects
+
+
+def batch_output_path(output_dir: str, project_path: str, used_names: set) -> str:
+    """Name a project's output file after its directory, numbering repeated names"""
+
+    output_name = Path(project_path).name or 'project'
+
+    candidate_name = output_name
+
+    name_index = 1
+
+    while candidate_name in used_names:
+
+        name_index += 1
+
+        candidate_name = output_name + '_' + str(name_index)
+
+    used_names.add(candidate_name)
+
+    return os.path.join(output_dir, candidate_name + BATCH_OUTPUT_SUFFIX)
+
+
+def prepare_batch_project(batch_project: dict, scan_options: dict, setup_options: dict) -> dict:
+    """Parse a project's setup.py and find its modules without scanning them"""
+
+    project_path = Path(batch_project['path']).resolve()
+
+    if not project_path.is_dir():
+
+        raise NotADirectoryError('Project path ' + str(project_path) + ' is not a directory')
+
+    setup_path = check_for_setup({'path': str(project_path), 'setup_file': batch_project.get('setup_file')})
+
+    distro_defs = parse_setup(setup_path, setup_options.get('size_policy'),
+                              setup_options.get('size_limit', DEFAULT_SETUP_SIZE_LIMIT))
+
+    uml_data, module_jobs = collect_module_jobs(distro_defs, project_path, scan_options)
+
+    return {'distro_defs': distro_defs, 'uml_data': uml_data, 'module_jobs': module_jobs,
+            'name': batch_project.get('name', batch_project['path'])}
+
+
+def finish_batch_project(batch_result: dict, prepared_project: dict, pending_scans: list, scan_options: dict,
+                         render_options: dict, output_stream: 'TextIO') -> None:
+    """Collect a project's scanned modules and write its diagram, recording timings in batch_result
+    The diagram goes to output_stream if one is given, otherwise to the project's own output file
+    In output_stream the project is wrapped in a package frame named after it. Nomnoml merges nodes with
+    the same name, so without the frame projects sharing package or module names would be drawn as one"""
+
+    start_time = time.perf_counter()
+
+    if pending_scans is not None:
+
+        uml_data = merge_module_results(prepared_project['module_jobs'], pending_scans, prepared_project['uml_data'],
+                                        scan_options)
+
+    else:
+
+        uml_data = prepared_project['uml_data']
+
+        for current_package, current_module, package_path in prepared_project['module_jobs']:
+
+            uml_data = describe_module(current_package, current_module, package_path, uml_data, scan_options)
+
+    batch_result['scan_seconds'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+
+    if output_stream is not None:
+
+        # The entry point style was written once at the top of the shared stream
+
+        output_stream.write('// Project ' + batch_result['path'] + '\n[<package> ' + prepared_project['name'] + '|\n')
+
+        for module_nomnoml in islice(iter_project_nomnoml(uml_data, prepared_project['distro_defs']['entry_points'],
+                                                          render_options), 1, None):
+
+            output_stream.write(module_nomnoml)
+
+        output_stream.write(']\n\n')
+
+    else:
+
+        with open(batch_result['output'], 'w') as output_file:
+
+            write_project_nomnoml(uml_data, prepared_project['distro_defs']['entry_points'], output_file,
+                                  render_options)
+
+    batch_result['generate_seconds'] = time.perf_counter() - start_time
+
+
+def run_batch(batch_projects: list, output_dir: str, workers: int = 1, scan_options: dict = None,
+              render_options: dict = None, setup_options: dict = None, output_stream: 'TextIO' = None) -> list:
+    """Describe every project in a batch and write one diagram per project to output_dir
+    If output_stream is given, every project is written to it in turn as one combined diagram instead,
+    each in a package frame named after the project
+    A project may carry a 'name' to use for its output file instead of its directory name
+    With more than one worker, modules of all projects are scanned in a single shared process pool
+    A project that fails is recorded in its result and never stops the others
+    Returns one result per project with its status, output path, module count and timings"""
+
+    if scan_options is None:
+
+        scan_options = {}
+
+    if setup_options is None:
+
+        setup_options = {}
+
+    # Phase profiles describe a single project, so they are not collected across a batch
+
+    batch_options = {option: value for option, value in scan_options.items() if option != 'profile'}
+
+    if output_stream is not None:
+
+        output_stream.write(ENTRY_STYLE_DIRECTIVE)
+
+    else:
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    used_names = set()
+
+    batch_results = []
+
+    prepared_projects = []
+
+    for batch_project in batch_projects:
+
+        batch_result = {'path': batch_project['path'], 'status': 'ok', 'error': None, 'modules': 0,
+                        'output': None if output_stream is not None else
+                        batch_output_path(output_dir, batch_project.get('name', batch_project['path']), used_names),
+                        'setup_seconds': 0.0, 'scan_seconds': 0.0, 'generate_seconds': 0.0}
+
+        start_time = time.perf_counter()
+
+        try:
+
+            prepared_project = prepare_batch_project(batch_project, batch_options, setup_options)
+
+            batch_result['modules'] = len(prepared_project['module_jobs'])
+
+        except Exception as err:
+
+            record_batch_failure(batch_result, err)
+
+            prepared_project = None
+
+        batch_result['setup_seconds'] = time.perf_counter() - start_time
+
+        batch_results.append(batch_result)
+
+        prepared_projects.append(prepared_project)
+
+    if workers > 1:
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+
+            # Queue every project's modules up front so the pool never waits between projects
+
+            project_scans = []
+
+            for batch_result, prepared_project in zip(batch_results, prepared_projects):
+
+                pending_scans = None
+
+                if prepared_project is not None:
+
+                    try:
+
+                        pending_scans = submit_module_jobs(executor, prepared_project['module_jobs'], batch_options)
+
+                    except Exception as err:
+
+                        record_batch_failure(batch_result, err)
+
+                project_scans.append(pending_scans)
+
+            for batch_result, prepared_project, pending_scans in zip(batch_results, prepared_projects,
+                                                                     project_scans):
+
+                if pending_scans is not None:
+
+                    run_batch_step(batch_result, finish_batch_project, prepared_project, pending_scans,
+                                   batch_options, render_options, output_stream)
+
+    else:
+
+        for batch_result, prepared_project in zip(batch_results, prepared_projects):
+
+            if prepared_project is not None:
+
+                run_batch_step(batch_result, finish_batch_project, prepared_project, None, batch_options,
+                               render_options, output_stream)
+
+    # Keep the cache within its byte budget once every project has been scanned
+
+    if batch_options.get('cache_dir'):
+
+        evict_cache_entries(batch_options['cache_dir'], batch_options.get('cache_max_bytes', DEFAULT_CACHE_MAX_BYTES))
+
+    return batch_results
+
+
+def run_batch_step(batch_result: dict, step_function: 'Callable', *step_arguments) -> None:
+    """Run one step for a project, recording a failure instead of raising it"""
+
+    try:
+
+        step_function(batch_result, *step_arguments)
+
+    except Exception as err:
+
+        record_batch_failure(batch_result, err)
+
+
+def record_batch_failure(batch_result: dict, err: Exception) -> None:
+    """Mark a project as failed and log why"""
+
+    batch_result['status'] = 'failed'
+
+    batch_result['error'] = type(err).__name__ + ': ' + str(err)
+
+    logging.getLogger('GUM Dispenser').error('Project ' + batch_result['path'] + ' failed. ' + batch_result['error'])
+
+
+def format_batch_summary(batch_results: list) -> str:
+    """Format per project timings and failures as a table"""
+
+    summary_lines = ['{:<8}{:>9}{:>10}{:>10}{:>10}  {}'.format('Status', 'Modules', 'Setup s', 'Scan s',
+                                                              'Output s', 'Project')]
+
+    for batch_result in batch_results:
+
+        summary_lines.append('{:<8}{:>9}{:>10.3f}{:>10.3f}{:>10.3f}  {}'.format(
+            batch_result['status'], batch_result['modules'], batch_result['setup_seconds'],
+            batch_result['scan_seconds'], batch_result['generate_seconds'], batch_result['path']))
+
+        if batch_result['error'] is not None:
+
+            summary_lines.append('        ' + batch_result['error'])
+
+    failure_count = sum(1 for batch_result in batch_results if batch_result['status'] != 'ok')
+
+    summary_lines.append('')
+
+    summary_lines.append(str(len(batch_results) - failure_count) + ' of ' + str(len(batch_results)) +
+                         ' projects succeeded')
+
+    return '\n'.join(summary_lines)
@@ -0,0 +1,50 @@
+
+# Defaults and choices shown by the command line interface
+# Kept free of imports so parsing arguments, --help and argument errors do not load the scanner or renderers
+# The modules that use them import them from here, so they can still be imported from those modules too
+
+# setup.py should be a small file
+
+DEFAULT_SETUP_SIZE_LIMIT = 2000
+
+# What to do with a setup.py larger than the limit. truncate reads only up to the limit
+
+SETUP_SIZE_POLICIES = ['prompt', 'accept', 'truncate', 'reject']
+
+# Modules at least this large are read as a stream and handled by the large module policy
+
+DEFAULT_LARGE_MODULE_BYTES = 16 * 1024 * 1024
+
+# top-level keeps dependencies and top level declarations, skip leaves the module empty
+
+LARGE_MODULE_POLICIES = ['top-level', 'skip']
+
+# Default line widths for declaration blocks
+
+DEFAULT_WRAP_WIDTH = 60
+
+DEFAULT_BREAK_WIDTH = 40
+
+# Default byte budget for a cache directory
+
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Output formats built into GUM_Render.RENDERERS
+
+OUTPUT_FORMATS = ['dot', 'json', 'nomnoml', 'plantuml']
+
+# Encodings for intermediate representation files
+
+IR_ENCODINGS = ['json', 'binary']
+
+# Ways a project can be split into several diagrams
+
+SPLIT_MODES = ['package']
+
+# Address the --serve daemon listens on
+
+DEFAULT_SERVE_ADDRESS = '127.0.0.1:7337'
+
+# Most projects the --serve daemon keeps in memory. The least recently requested one is dropped first
+
+DEFAULT_SERVE_MAX_PROJECTS = 32
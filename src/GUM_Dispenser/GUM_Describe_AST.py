@@ -0,0 +1,228 @@
+
+import ast
+
+import re
+
+import logging
+
+from functools import lru_cache
+
+from tokenize import detect_encoding
+
+from GUM_Dispenser.GUM_Trace import trace_event
+
+from GUM_Dispenser.GUM_Read_Source import source_readline
+
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo
+
+
+DECLARATION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Nodes other than statements that may contain statement bodies
+
+BODY_HOLDING_NODES = tuple(node_type for node_type in (ast.stmt, ast.excepthandler, getattr(ast, 'match_case', None))
+                           if node_type is not None)
+
+
+@lru_cache(maxsize=None)
+def line_ending_pattern() -> 're.Pattern':
+    """Python only treats these sequences as line endings when numbering lines. Compiled on first use"""
+
+    return re.compile(r'\r\n?|\n')
+
+
+def strip_line_comment(line_text: str) -> str:
+    """Remove a trailing # comment from a line of code, ignoring # characters inside string literals"""
+
+    open_quote = None
+
+    char_index = 0
+
+    while char_index < len(line_text):
+
+        current_char = line_text[char_index]
+
+        if open_quote is not None:
+
+            # Skip escaped characters inside strings
+
+            if current_char == '\\':
+
+                char_index += 2
+
+                continue
+
+            if line_text.startswith(open_quote, char_index):
+
+                char_index += len(open_quote)
+
+                open_quote = None
+
+                continue
+
+        elif current_char == '#':
+
+            return line_text[:char_index]
+
+        elif current_char in '\'"':
+
+            open_quote = line_text[char_index:char_index + 3] if line_text[char_index:char_index + 3] in \
+                ('"""', "'''") else current_char
+
+            char_index += len(open_quote)
+
+            continue
+
+        char_index += 1
+
+    return line_text
+
+
+def declaration_signature(declaration_node: 'ast.AST', source_lines: list) -> str:
+    """Rebuild the declaration line of a function or class the way the tokenize engine stores it
+    Multiline declarations are joined with single spaces, and comments and the trailing colon are removed"""
+
+    first_body_node = declaration_node.body[0]
+
+    # A decorated nested declaration starts at its first decorator
+
+    body_line = min([first_body_node.lineno] + [decorator.lineno for decorator in
+                                                getattr(first_body_node, 'decorator_list', [])])
+
+    header_lines = source_lines[declaration_node.lineno - 1:body_line]
+
+    # Check whether the body begins on the last line of the declaration, as in def run(): pass
+
+    if len(getattr(first_body_node, 'decorator_list', [])) == 0:
+
+        # Column offsets are counted in UTF-8 bytes
+
+        body_prefix = header_lines[-1].encode('utf-8')[:first_body_node.col_offset].decode('utf-8', 'replace')
+
+    else:
+
+        body_prefix = ''
+
+    if body_prefix.strip() != '':
+
+        header_lines[-1] = body_prefix
+
+    else:
+
+        header_lines = header_lines[:-1]
+
+    # Blank lines and comments may sit between the declaration and its body
+
+    header_text = [strip_line_comment(line_text).strip() for line_text in header_lines]
+
+    return ' '.join(line_text for line_text in header_text if line_text != '').rstrip(':')
+
+
+def import_dependency(import_path: list, current_package: str) -> str:
+    """Name the dependency for a dotted import path
+    Internal imports are named by module and external imports by their top level package"""
+
+    if import_path[0] == current_package and len(import_path) > 1:
+
+        return import_path[1]
+
+    return import_path[0]
+
+
+def scan_module_ast(module_bytes: bytes, current_package: str, current_module: str,
+                    trace_lines: list = None) -> 'ModuleInfo':
+    """Find a module's dependencies and nested declarations with the ast module
+    Produces the same ModuleInfo records as the tokenize engine, but nests declarations by syntax instead of by
+    signature text, so two scopes may declare the same signature
+    Scope events are appended to trace_lines if it is given
+    Raises SyntaxError if the module does not compile"""
+
+    module_tree = ast.parse(module_bytes)
+
+    # Decode with the encoding Python would use so column offsets line up with our text
+
+    source_encoding = detect_encoding(source_readline(module_bytes))[0]
+
+    source_lines = line_ending_pattern().split(str(module_bytes, source_encoding))
+
+    module_info = ModuleInfo()
+
+    import_aliases = []
+
+    debug_enabled = logging.getLogger('GUM Dispenser').isEnabledFor(logging.DEBUG)
+
+    # Walk depth first in source order so dependencies keep the order they are written in
+
+    pending_nodes = [(child_node, module_info) for child_node in
+                     reversed(list(ast.iter_child_nodes(module_tree))) if isinstance(child_node, BODY_HOLDING_NODES)]
+
+    while len(pending_nodes) > 0:
+
+        current_node, scope_level = pending_nodes.pop()
+
+        if isinstance(current_node, (ast.Import, ast.ImportFrom)):
+
+            if isinstance(current_node, ast.Import):
+
+                import_paths = [imported_name.name.split('.') for imported_name in current_node.names]
+
+            elif current_node.module is not None:
+
+                import_paths = [current_node.module.split('.') + [current_node.names[0].name]]
+
+            # from . import sibling
+
+            else:
+
+                import_paths = [[imported_name.name] for imported_name in current_node.names]
+
+            for import_path in import_paths:
+
+                dependency = import_dependency(import_path, current_package)
+
+                # Do not store duplicate dependencies
+
+                module_info.add_dependency(dependency)
+
+            for imported_name in current_node.names:
+
+                if imported_name.asname is not None:
+
+                    if imported_name.asname not in import_aliases:
+
+                        import_aliases.append(imported_name.asname)
+
+                    else:
+
+                        logging.getLogger('GUM Dispenser').error('You used the same import alias twice ' +
+                                                                 'for two different imports...')
+
+            continue
+
+        if isinstance(current_node, DECLARATION_NODES):
+
+            signature = declaration_signature(current_node, source_lines)
+
+            if debug_enabled:
+
+                logging.getLogger('GUM Dispenser').debug('Caught declaration for ' + current_node.name)
+
+            if trace_lines is not None:
+
+                trace_event(trace_lines, 'scope_enter', module=current_module, scope=signature,
+                            line=current_node.lineno)
+
+            # Repeated signatures in the same scope, such as property setters, share one entry
+
+            declaration = scope_level.get_declaration(signature)
+
+            if declaration is None:
+
+                declaration = scope_level.add_declaration(signature, current_node.name)
+
+            scope_level = declaration
+
+        pending_nodes.extend((child_node, scope_level) for child_node in reversed(list(ast.iter_child_nodes(
+            current_node))) if isinstance(child_node, BODY_HOLDING_NODES))
+
+    return module_info
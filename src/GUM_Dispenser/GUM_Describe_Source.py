@@ -1,9 +1,24 @@
 
 from GUM_Dispenser.GUM_Exceptions import PackageNotFoundError, SourceModuleNotFoundError
 
-import re
+from GUM_Dispenser.GUM_Scan_Cache import module_cache_key, load_cached_module, store_cached_module
+from GUM_Dispenser.GUM_Scan_Cache import evict_cache_entries, DEFAULT_CACHE_MAX_BYTES
+
+from GUM_Dispenser.GUM_Describe_AST import scan_module_ast
+
+from GUM_Dispenser.GUM_Trace import trace_event, write_trace
+
+from GUM_Dispenser.GUM_Profile import new_profile, profile_phase, record_module
+
+from GUM_Dispenser.GUM_Read_Source import open_source, source_readline, is_source_stream
 
-import ast
+from GUM_Dispenser.GUM_Discover_Source import discover_package_modules, list_source_directory, module_file_path
+
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo, as_module_info
+
+from GUM_Dispenser.GUM_Defaults import DEFAULT_LARGE_MODULE_BYTES, LARGE_MODULE_POLICIES
+
+import re
 
 from tokenize import tokenize
 
@@ -11,41 +26,88 @@ import os
 
 import token
 
-from io import BytesIO
-
 from pathlib import Path
 
-import glob
+import time
 
 import logging
 
+from concurrent.futures import ProcessPoolExecutor
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def declaration_name_pattern() -> 're.Pattern':
+    """The name a function or class is declared with, read from its full signature. Compiled on first use"""
+
+    return re.compile(r'(?:def|class)\s+(\w+)')
+
+
+@lru_cache(maxsize=None)
+def split_import_pattern() -> 're.Pattern':
+    """Split an import line by whitespace, punctuation, 'from' and 'import'. Compiled on first use"""
+
+    return re.compile(r'''(\s|[.,]|from|import)+''')
+
+
+def describe_project(distro_defs: dict, dev_directory: 'Path', workers: int = 1, scan_options: dict = None,
+                     executor: 'Executor' = None) -> dict:
+    """Process a source project having either its packages or modules specified
+    Modules are scanned across a process pool when more than one worker is requested,
+    or in the given executor so several projects can share one pool
+    scan_options may hold cache_dir and cache_max_bytes to reuse results from earlier runs,
+    and a profile dictionary from GUM_Profile.new_profile to collect timings in
+    Every path is resolved against dev_directory and no global state is changed,
+    so several projects may be described at once from different threads"""
 
-def describe_project(distro_defs: dict, dev_directory: 'Path') -> dict:
-    """Process a source project having either its packages or modules specified"""
+    if scan_options is None:
+
+        scan_options = {}
+
+    # Resolve once so a later change of working directory cannot affect this scan
+
+    dev_directory = Path(dev_directory).resolve()
+
+    if workers > 1 or executor is not None:
+
+        # Discover every module first so one pool can balance work across all packages
+
+        uml_data, module_jobs = collect_module_jobs(distro_defs, dev_directory, scan_options)
+
+        uml_data = describe_modules_in_pool(module_jobs, uml_data, workers, scan_options, executor)
 
     # At this point, we have at least a package name or module name
     # And we know that dev_directory is an existing directory
 
     # If we have packages and explicit modules specified by setup.py, use packages
 
-    if 'package_names' in distro_defs:
+    elif 'package_names' in distro_defs:
 
-        uml_data = {'packages' : {}}
+        uml_data, module_jobs = collect_module_jobs(distro_defs, dev_directory, scan_options)
 
-        for package in distro_defs['package_names']:
+        for current_package, module_name, package_path in module_jobs:
 
-            uml_data = describe_package(package, dev_directory, uml_data)
+            uml_data = describe_module(current_package, module_name, package_path, uml_data, scan_options)
 
     elif 'module_names' in distro_defs:
         # Perform sanity check that modules exist
 
-        ensure_modules_exist(distro_defs['module_names'], dev_directory)
+        with profile_phase(scan_options.get('profile'), 'discovery'):
+
+            ensure_modules_exist(distro_defs['module_names'], dev_directory)
 
         uml_data = {'modules' : {}}
 
         for module_name in distro_defs['module_names']:
 
-            uml_data = describe_module('None', module_name, dev_directory, uml_data)
+            uml_data = describe_module('None', module_name, dev_directory, uml_data, scan_options)
+
+    # Keep the cache within its byte budget once all new entries are written
+
+    if scan_options.get('cache_dir'):
+
+        evict_cache_entries(scan_options['cache_dir'], scan_options.get('cache_max_bytes', DEFAULT_CACHE_MAX_BYTES))
 
 
     return uml_data
@@ -53,20 +115,95 @@ def describe_project(distro_defs: dict, dev_directory: 'Path') -> dict:
 
 
 
-def describe_package(name: str, dev_directory: 'Path', uml_data: dict) -> dict:
-    """Process source package with the given name"""
+def find_project_packages(package_names: list, dev_directory: 'Path', uml_data: dict, scan_options: dict = None,
+                          listing_cache: dict = None) -> list:
+    """Locate every package listed in setup.py and list the modules it includes
+    A listed subpackage is left to its parent when the parent's modules include it. Otherwise, e.g. when the
+    parent's __all__ leaves it out, it is described as a package of its own
+    Returns (package, package path, package modules) for every package described"""
+
+    walked_packages = set()
+
+    found_packages = []
+
+    # Parents go first so we know which subpackages they include before reaching them
+
+    for package in sorted(package_names, key=lambda package_name: package_name.count('.')):
+
+        if package in walked_packages:
+
+            continue
+
+        package_path, package_modules = find_package_modules(package, dev_directory, uml_data, scan_options,
+                                                              listing_cache, walked_packages)
+
+        found_packages.append((package, package_path, package_modules))
+
+    return found_packages
+
+
+def collect_module_jobs(distro_defs: dict, dev_directory: 'Path', scan_options: dict = None) -> tuple:
+    """Find every module of a project without scanning any of them
+    Returns the project's empty uml_data and a list of (package, module, package path) jobs in output order"""
+
+    if scan_options is None:
+
+        scan_options = {}
+
+    dev_directory = Path(dev_directory).resolve()
+
+    if 'package_names' in distro_defs:
+
+        uml_data = {'packages' : {}}
+
+        module_jobs = []
+
+        # Directory listings are shared by every package so each directory is only read once
+
+        listing_cache = {}
+
+        for package, package_path, package_modules in find_project_packages(distro_defs['package_names'],
+                                                                             dev_directory, uml_data, scan_options,
+                                                                             listing_cache):
+
+            module_jobs.extend((package, module_name, package_path) for module_name in package_modules)
+
+        return uml_data, module_jobs
+
+    with profile_phase(scan_options.get('profile'), 'discovery'):
+
+        ensure_modules_exist(distro_defs['module_names'], dev_directory)
+
+    return {'modules' : {}}, [('None', module_name, dev_directory) for module_name in distro_defs['module_names']]
+
+
+def find_package_modules(name: str, dev_directory: 'Path', uml_data: dict, scan_options: dict = None,
+                         listing_cache: dict = None, walked_packages: set = None) -> tuple:
+    """Locate the source package with the given name and list the modules it includes
+    Dotted package names are looked up in their parent package's directory
+    The dotted names of the package and every subpackage it includes are added to walked_packages if given"""
+
+    if listing_cache is None:
+
+        listing_cache = {}
+
+    if scan_options is None:
+
+        scan_options = {}
+
+    dev_directory = Path(dev_directory)
 
     logging.getLogger('GUM Dispenser').info('Starting processing for package ' + name + '...')
 
     uml_data['packages'][name] = {'modules' : {}}
 
-    expected_path = dev_directory.joinpath(name)
+    expected_path = dev_directory.joinpath(*name.split('.'))
 
     logging.getLogger('GUM Dispenser').debug('Expecting package at ' + str(expected_path))
 
-    # Stop if package doesn't exist
+    # Stop if package doesn't exist. The parent's listing tells us without another stat call
 
-    if not expected_path.exists() or not expected_path.is_dir():
+    if expected_path.name not in list_source_directory(str(expected_path.parent), listing_cache)['directories']:
 
         raise(PackageNotFoundError(name))
 
@@ -78,13 +215,139 @@ def describe_package(name: str, dev_directory: 'Path', uml_data: dict) -> dict:
 
     # Get a list of all the modules we are checking
 
-    package_modules = check_init_file(name, init_path)
+    with profile_phase(scan_options.get('profile'), 'discovery'):
+
+        package_modules = check_init_file(name, init_path, listing_cache, walked_packages)
+
+    return expected_path, package_modules
+
+
+def describe_package(name: str, dev_directory: 'Path', uml_data: dict, workers: int = 1,
+                     scan_options: dict = None, listing_cache: dict = None) -> dict:
+    """Process source package with the given name"""
+
+    expected_path, package_modules = find_package_modules(name, dev_directory, uml_data, scan_options,
+                                                          listing_cache)
 
     # Get required data for UML markup
 
+    if workers > 1:
+
+        module_jobs = [(name, module_name, expected_path) for module_name in package_modules]
+
+        return describe_modules_in_pool(module_jobs, uml_data, workers, scan_options)
+
     for module_name in package_modules:
 
-        uml_data = describe_module(name, module_name, expected_path, uml_data)
+        uml_data = describe_module(name, module_name, expected_path, uml_data, scan_options)
+
+    return uml_data
+
+
+def scan_module(current_package: str, current_module: str, package_path: 'Path', scan_options: dict = None) -> dict:
+    """Describe a single module in isolation and return only that module's data
+    This is the unit of work handed to worker processes"""
+
+    if current_package != 'None':
+
+        module_dict = {'packages' : {current_package : {'modules' : {}}}}
+
+        module_dict = describe_module(current_package, current_module, package_path, module_dict, scan_options)
+
+        return module_dict['packages'][current_package]['modules'][current_module]
+
+    module_dict = describe_module(current_package, current_module, package_path, {'modules' : {}}, scan_options)
+
+    return module_dict['modules'][current_module]
+
+
+def scan_module_profiled(current_package: str, current_module: str, package_path: 'Path',
+                         scan_options: dict) -> tuple:
+    """Describe a single module in a worker process with its own profile
+    Returns the module's data and the worker's module timing records"""
+
+    scan_options = dict(scan_options, profile=new_profile())
+
+    module_data = scan_module(current_package, current_module, package_path, scan_options)
+
+    return module_data, scan_options['profile']['modules']
+
+
+def describe_modules_in_pool(module_jobs: list, uml_data: dict, workers: int, scan_options: dict = None,
+                             executor: 'Executor' = None) -> dict:
+    """Scan (package, module, package path) jobs across a process pool
+    Largest files are submitted first to cut tail latency, but results are merged in job order
+    so the output matches the serial path exactly
+    A shared executor may be given instead of starting a pool of our own"""
+
+    logging.getLogger('GUM Dispenser').info('Scanning ' + str(len(module_jobs)) + ' modules with ' +
+                                            str(workers) + ' workers...')
+
+    if executor is not None:
+
+        pending_scans = submit_module_jobs(executor, module_jobs, scan_options)
+
+        return merge_module_results(module_jobs, pending_scans, uml_data, scan_options)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        pending_scans = submit_module_jobs(executor, module_jobs, scan_options)
+
+        return merge_module_results(module_jobs, pending_scans, uml_data, scan_options)
+
+
+def submit_module_jobs(executor: 'Executor', module_jobs: list, scan_options: dict = None) -> list:
+    """Submit module jobs to an executor, largest files first
+    Returns the futures in job order"""
+
+    if scan_options is None:
+
+        scan_options = {}
+
+    # Sort by descending file size. The sort is stable, so equal sizes keep their listed order
+
+    submission_order = sorted(range(len(module_jobs)),
+                              key=lambda job_index: -os.stat(str(module_file_path(
+                                  module_jobs[job_index][2], module_jobs[job_index][1]))).st_size)
+
+    # Workers cannot add to our profile directly, so they send their timings back with their results
+
+    worker_options = {option: value for option, value in scan_options.items() if option != 'profile'}
+
+    scan_function = scan_module_profiled if scan_options.get('profile') is not None else scan_module
+
+    pending_scans = [None] * len(module_jobs)
+
+    for job_index in submission_order:
+
+        pending_scans[job_index] = executor.submit(scan_function, *module_jobs[job_index], worker_options)
+
+    return pending_scans
+
+
+def merge_module_results(module_jobs: list, pending_scans: list, uml_data: dict, scan_options: dict = None) -> dict:
+    """Wait for submitted module jobs and store their results in uml_data
+    Merging in the original order keeps dictionary ordering deterministic"""
+
+    profile = None if scan_options is None else scan_options.get('profile')
+
+    for job_index, (current_package, current_module, package_path) in enumerate(module_jobs):
+
+        module_data = pending_scans[job_index].result()
+
+        if profile is not None:
+
+            module_data, module_records = module_data
+
+            profile['modules'].extend(module_records)
+
+        if current_package != 'None':
+
+            uml_data['packages'][current_package]['modules'][current_module] = module_data
+
+        else:
+
+            uml_data['modules'][current_module] = module_data
 
     return uml_data
 
@@ -94,7 +357,7 @@ def ensure_modules_exist(found_modules: list, package_path: 'Path') -> None:
 
     for current_module in found_modules:
 
-        module_path = package_path.joinpath(current_module + '.py')
+        module_path = module_file_path(package_path, current_module)
 
         # Check result here to make sure module exists
 
@@ -112,133 +375,203 @@ def ensure_modules_exist(found_modules: list, package_path: 'Path') -> None:
     logging.getLogger('GUM Dispenser').info('All specified modules exist')
 
 
-def check_init_file(name : str, init_path : 'Path') -> list:
-    """Attempt to find __all__ in __init__.py for given package"""
+def check_init_file(name : str, init_path : 'Path', listing_cache: dict = None, walked_packages: set = None) -> list:
+    """Attempt to find __all__ in __init__.py for given package
+    Modules in subpackages are included with dotted names, e.g. 'sub.mod'"""
 
-    # Read __init__ if it exists
+    return discover_package_modules(name, init_path.parent, listing_cache, walked_packages)
 
-    package_modules = []
 
-    try:
+# Requires dev_dir path, module name, current_data_dict
 
-        # Check for __all__ global variable assignments
+def describe_module(current_package : str, current_module : str, package_path : 'Path', current_data_dict : dict,
+                    scan_options: dict = None):
+    """Get all information we need from a module in order to represent it in NOMNOML
+    This includes all function and class declarations, properly nested and
+    external package dependencies and internal module dependencies
+    i.e. If a dependency is in the same package, store the module name. Otherwise, store the package name
+    If scan_options names a cache_dir, a stored result for unchanged file contents is used instead of tokenizing
+    scan_options may also choose the 'tokenize' (default) or 'ast' engine, and set 'records' to store
+    compact ModuleInfo records instead of dictionaries
+    Modules of scan_options['large_module_bytes'] or more are streamed and scanned as large_module_policy says"""
 
-        pattern = re.compile(r"""(?:^__all__\s*=\s*)(\[[^\[\]]*\]$)""", re.MULTILINE)
+    if scan_options is None:
 
-        with open(str(init_path), 'r') as init_file:
+        scan_options = {}
 
-            logging.getLogger('GUM Dispenser').info('Found __init__.py')
+    start_time = time.perf_counter()
 
-            init_contents = init_file.read()
+    module_path = module_file_path(package_path, current_module)
 
-            # Grab the capturing group
+    # We have already checked that the module exists
+    # So proceed with the read as normal. The file is read once as bytes and scanned in place
 
-            init_results = [current_match.group(1).strip() for current_match in pattern.finditer(init_contents)
-                            if not current_match.group(1) is None and
-                            not (current_match.group(1).isspace() or current_match.group(1) == '')]
+    with open_source(str(module_path), stream_threshold=scan_options.get('large_module_bytes',
+                                                                         DEFAULT_LARGE_MODULE_BYTES)) as \
+            (module_bytes, module_stat):
 
-            logging.getLogger('GUM Dispenser').debug(init_results)
+        logging.getLogger('GUM Dispenser').info('Reading ' + str(module_stat.st_size) + ' bytes from module ' +
+                                                current_module)
 
-            if len(init_results) > 0:
+        module_data = scan_module_source(current_package, current_module, module_path, module_bytes, module_stat,
+                                         scan_options, start_time)
 
-                logging.getLogger('GUM Dispenser').info('Found __all__ declaration. Using ' +
-                                                        str(init_results[-1]) + ' as module list')
+    # Construct our output appropriately for if we are in a package or simply checking a set of modules
 
-                package_modules = ast.literal_eval(init_results[-1])
+    if current_package != 'None':
 
+        current_data_dict['packages'][current_package]['modules'][current_module] = module_data
 
-                # Make sure specified modules exist before we go further
+    else:
 
-                ensure_modules_exist(package_modules, init_path.parent)
+        current_data_dict['modules'][current_module] = module_data
 
-            else:
+    if logging.getLogger('GUM Dispenser').isEnabledFor(logging.DEBUG):
 
-                logging.getLogger('GUM Dispenser').warning('__init__.py __all__ definition was not found for package ' +
-                                                           name + '. Treating all same level .py files' +
-                                                                  ' as included modules...')
+        logging.getLogger('GUM Dispenser').debug('Dictionary data after processing ' + current_module +
+                                                 ': ' + str(current_data_dict))
 
-    # Safely handle case where __init__ does not exist
-    except FileNotFoundError:
+    return current_data_dict
 
-        logging.getLogger('GUM Dispenser').warning('__init__.py does not exist for package ' + name +
-                                                   '. Treating all same level .py files as included modules...')
 
-    if len(package_modules) == 0:
+def scan_module_source(current_package: str, current_module: str, module_path: 'Path', module_bytes: bytes,
+                       module_stat: 'os.stat_result', scan_options: dict, start_time: float) -> 'ModuleInfo | dict':
+    """Find a module's dependencies and declarations from its source bytes, using the scan cache when possible
+    Returns a ModuleInfo record if scan_options has 'records' set, or the legacy dictionary form otherwise"""
 
-        # Grab all .py files in package directory
+    setup_size = module_stat.st_size
 
-        src_dir = init_path.parent
+    scan_engine = scan_options.get('engine', 'tokenize')
 
-        logging.getLogger('GUM Dispenser').debug('Parent directory: ' + str(src_dir))
+    # Bound memory for huge, usually generated, modules by keeping less of them
 
-        os.chdir(src_dir)
+    if is_source_stream(module_bytes):
 
-        package_modules = glob.glob('*.py')
+        large_module_message = (current_module + ' is ' + str(setup_size) + ' bytes, over the large module limit of ' +
+                                str(scan_options.get('large_module_bytes', DEFAULT_LARGE_MODULE_BYTES)) + ' bytes')
 
-        package_modules = [name.rstrip('.py') for name in package_modules]
+        if scan_options.get('large_module_policy', 'top-level') == 'skip':
 
+            logging.getLogger('GUM Dispenser').warning('Skipping module ' + large_module_message)
 
-    return package_modules
+            module_info = ModuleInfo()
 
+            if scan_options.get('profile') is not None:
 
-# Requires dev_dir path, module name, current_data_dict
+                record_module(scan_options['profile'], current_package, current_module, setup_size, None,
+                              time.perf_counter() - start_time)
 
-def describe_module(current_package : str, current_module : str, package_path : 'Path', current_data_dict : dict):
-    """Get all information we need from a module in order to represent it in NOMNOML
-    This includes all function and class declarations, properly nested and
-    external package dependencies and internal module dependencies
-    i.e. If a dependency is in the same package, store the module name. Otherwise, store the package name"""
+            return module_info if scan_options.get('records') else module_info.as_dict()
 
-    module_path = package_path.joinpath(current_module + '.py')
+        logging.getLogger('GUM Dispenser').warning('Only scanning top level declarations because module ' +
+                                                   large_module_message)
 
-    # Construct our output appropriately for if we are in a package or simply checking a set of modules
+        scan_engine = 'top-level'
 
-    if current_package != 'None':
+    # Reuse an earlier result if this exact file has been scanned before
+
+    cache_key = None
+
+    if scan_options.get('cache_dir'):
+
+        cache_key = module_cache_key(str(module_path), module_stat, module_bytes, current_package, scan_engine)
+
+        cached_data = load_cached_module(scan_options['cache_dir'], cache_key)
+
+        if cached_data is not None:
+
+            logging.getLogger('GUM Dispenser').info('Using cached scan for module ' + current_module)
+
+            if scan_options.get('profile') is not None:
+
+                record_module(scan_options['profile'], current_package, current_module, setup_size, None,
+                              time.perf_counter() - start_time, cached=True)
 
-        # Initialize data for current module
-        current_data_dict['packages'][current_package]['modules'][current_module] = {}
+            if scan_options.get('records'):
 
-        module_data = current_data_dict['packages'][current_package]['modules'][current_module]
+                return as_module_info(cached_data)
+
+            return {'dependencies' : cached_data['dependencies'], 'declarations' : cached_data['declarations']}
+
+    # Only collect trace events when a trace file was requested and debugging is on
+
+    trace_lines = None
+
+    if scan_options.get('trace_path') and logging.getLogger('GUM Dispenser').isEnabledFor(logging.DEBUG):
+
+        trace_lines = []
+
+    # Read dependencies and declarations with the chosen engine
+
+    if scan_engine == 'top-level':
+
+        module_info = scan_module_top_level(module_bytes, current_package, current_module, trace_lines)
+
+    elif scan_engine == 'ast':
+
+        try:
+
+            module_info = scan_module_ast(module_bytes, current_package, current_module, trace_lines)
+
+        # The tokenize engine is more forgiving of code that does not compile
+
+        except SyntaxError as err:
+
+            logging.getLogger('GUM Dispenser').warning('Unable to parse ' + current_module + ' (' + str(err) +
+                                                       '). Falling back to the tokenize engine')
+
+            module_info = scan_module_tokens(module_bytes, current_package, current_module, trace_lines)
 
     else:
 
-        current_data_dict['modules'][current_module] = {}
+        module_info = scan_module_tokens(module_bytes, current_package, current_module, trace_lines)
 
-        module_data = current_data_dict['modules'][current_module]
+    if trace_lines is not None:
 
-    # Grab file text
+        write_trace(scan_options['trace_path'], trace_lines)
 
-    module_data['dependencies'] = []
-    module_data['declarations'] = []
+    module_data = None
 
-    setup_size = os.stat(str(module_path)).st_size
+    if cache_key is not None:
 
-    logging.getLogger('GUM Dispenser').info('Reading ' + str(setup_size) + ' bytes from module ' + current_module)
+        module_data = module_info.as_dict()
 
-    # We have already checked that the module exists
-    # So proceed with the read as normal
+        store_cached_module(scan_options['cache_dir'], cache_key, module_data)
 
-    with open(str(module_path), 'r') as module_file:
+    if scan_options.get('profile') is not None:
 
-        module_text = module_file.read(setup_size)
+        record_module(scan_options['profile'], current_package, current_module, setup_size,
+                      module_info.token_count, time.perf_counter() - start_time)
 
-    # Tokenize is a generator, so we must iterate line by line over the text to get the tokenized version
-    tokens = tokenize(BytesIO(module_text.encode('utf-8')).readline)
+    if scan_options.get('records'):
+
+        return module_info
 
-    # Split the line by whitespace, punctuation, 'from' and 'import'
+    return module_data if module_data is not None else module_info.as_dict()
 
-    split_import_statement = re.compile(r'''(\s|[.,]|from|import)+''')
+
+def scan_module_tokens(module_bytes: bytes, current_package: str, current_module: str,
+                       trace_lines: list = None) -> dict:
+    """Walk the tokens of a module's source to find its dependencies and nested declarations
+    Returns a ModuleInfo record
+    Token and scope events are appended to trace_lines if it is given"""
+
+    module_info = ModuleInfo()
+
+    # Signatures declared anywhere in the module. A set keeps duplicate checks constant time
+
+    declared_signatures = set()
+
+    # Tokenize is a generator, so we must iterate line by line over the text to get the tokenized version
+    tokens = tokenize(source_readline(module_bytes))
 
     # Catch import aliases
 
     import_aliases = []
 
-    # Store scope of current token
-    scope_tree = {}
-
     # Track scope level
 
-    current_scope_level = scope_tree
+    current_scope_level = module_info
 
     # Change number for every indent
 
@@ -250,7 +583,7 @@ def describe_module(current_package : str, current_module : str, package_path :
 
     # Keep backward references for when we exit inner scope levels
 
-    parent_dict = {current_module : {'dict': scope_tree, 'parent' : current_module}}
+    parent_dict = {current_module : {'scope': module_info, 'parent' : current_module}}
 
     # Store if we are reading a multi-line declaration
 
@@ -258,15 +591,33 @@ def describe_module(current_package : str, current_module : str, package_path :
 
     multiline_declaration_string = ''
 
+    # Look up our logger and its level once instead of for every token
+    # Debug messages are only built when they will actually be emitted
+
+    scan_logger = logging.getLogger('GUM Dispenser')
+
+    debug_enabled = scan_logger.isEnabledFor(logging.DEBUG)
+
+    token_count = 0
+
 
     # Read tokens from every line
 
     for token_type, token_str, start, end, line_text in tokens:
 
+        token_count += 1
+
         token_name = token.tok_name[token_type]
 
-        logging.getLogger('GUM Dispenser').debug(str(start) + ',' + str(end) + ':\t' + token_name +
-                                                 '\t' + ' (' + line_text.strip() + ')')
+        if debug_enabled:
+
+            scan_logger.debug(str(start) + ',' + str(end) + ':\t' + token_name +
+                              '\t' + ' (' + line_text.strip() + ')')
+
+        if trace_lines is not None:
+
+            trace_event(trace_lines, 'token', module=current_module, type=token_name, string=token_str,
+                        start=start, end=end)
 
         # Ignore comments
 
@@ -281,22 +632,33 @@ def describe_module(current_package : str, current_module : str, package_path :
 
                 if token_name == 'DEDENT':
 
-                    logging.getLogger('GUM Dispenser').debug('Found DEDENT token before ' + line_text)
+                    # Printing the whole tree is expensive, so only build these messages when they are shown
+
+                    if debug_enabled:
+
+                        scan_logger.debug('Found DEDENT token before ' + line_text)
+
+                        scan_logger.debug('Current tree before DEDENT: ' + str(module_info))
+
+                        scan_logger.debug('Exiting scope: ' + parent_scope)
 
-                    logging.getLogger('GUM Dispenser').debug('Current tree before DEDENT: ' + str(scope_tree))
+                    if trace_lines is not None:
 
-                    logging.getLogger('GUM Dispenser').debug('Exiting scope: ' + parent_scope)
+                        trace_event(trace_lines, 'scope_exit', module=current_module, scope=parent_scope,
+                                    line=start[0])
 
                     # Exit our previous scope and put this new declaration under its parent
                     # IOW, new scope will be a sibling to previous scope
 
                     parent_scope = parent_dict[parent_scope]['parent']
 
-                    current_scope_level = parent_dict[parent_scope]['dict']
+                    current_scope_level = parent_dict[parent_scope]['scope']
 
                     nesting_level -= 1
 
-                    logging.getLogger('GUM Dispenser').debug('Decremented nesting level: ' + str(nesting_level))
+                    if debug_enabled:
+
+                        scan_logger.debug('Decremented nesting level: ' + str(nesting_level))
 
                 # End of multiline statements have the token type NEWLINE
 
@@ -309,28 +671,35 @@ def describe_module(current_package : str, current_module : str, package_path :
 
                     # Log the name of the function/class we just added
 
-                    logging.getLogger('GUM Dispenser').info('Finished multiline declaration')
+                    scan_logger.info('Finished multiline declaration')
+
+                    if trace_lines is not None:
+
+                        trace_event(trace_lines, 'scope_enter', module=current_module, scope=signature,
+                                    parent=parent_scope, line=start[0])
 
                     # Store the declaration
 
-                    module_data['declarations'].append(signature)
+                    declared_signatures.add(signature)
 
-                    logging.getLogger('GUM Dispenser').debug('Inserted multiline declaration: \n' + signature)
+                    if debug_enabled:
+
+                        scan_logger.debug('Inserted multiline declaration: \n' + signature)
 
                     # Store current parent and scope level for future
 
                     parent_dict[signature] = {'parent': parent_scope,
-                                              'dict': current_scope_level}
+                                              'scope': current_scope_level}
 
                     # Make this function/class the parent until we exit its scope
 
                     parent_scope = signature
 
                     # Enter the scope of this new function/class
+                    # The current token is the end of the statement, so take the name from the signature
 
-                    current_scope_level[signature] = {'current_scope_name': token_str}
-
-                    current_scope_level = current_scope_level[parent_scope]
+                    current_scope_level = current_scope_level.add_declaration(
+                        signature, declaration_name_pattern().match(signature).group(1))
 
                     multiline_declaration_string = ''
 
@@ -353,59 +722,7 @@ def describe_module(current_package : str, current_module : str, package_path :
             elif token_name != 'STRING' and ('import ' == line_text.strip()[:7] or
                                              (' import ' in line_text.lower() and line_text.strip()[0] != '#')):
 
-                # Import statements should not contain string literals
-                # Ignore if this line of code is printing keywords as literals e.g. 'import ......'
-
-                if "'" not in line_text and '"' not in line_text:
-
-                    # Remove punctuation, whitespace, 'from' and 'import'
-
-                    import_keywords = [import_name for import_name in split_import_statement.split(line_text.strip())
-                                       if not import_name.isspace() and import_name != '' and import_name != '.']
-
-                    # If an alias is used in a subsequent import, it would logically be the first keyword in the line
-                    # No sense in making an alias if you are still referencing it with its parent...
-
-                    # Update: removing condition 'if import_keywords[0] not in import_aliases'
-                    # Python import aliasing makes an alias for the module object, not an import path
-                    # This means that aliases cannot be referenced in subsequent import statements as parents
-                    # Reference: https://stackoverflow.com/questions/42459939/import-modules-using-an-alias
-
-                    # External dependency
-                    # We want to store the package dependency
-
-                    if current_package not in import_keywords:
-
-                        logging.getLogger('GUM Dispenser').debug('External dependency line: ' + str(import_keywords))
-
-                        dependency = import_keywords[0]
-
-
-                    # The dependency is defined in our current source package
-
-                    else:
-
-                        logging.getLogger('GUM Dispenser').debug('Internal dependency line: ' + str(import_keywords))
-
-                        dependency = import_keywords[1]
-
-
-                    # Do not store duplicate dependencies
-
-                    if dependency not in module_data['dependencies']:
-
-                        module_data['dependencies'].append(dependency)
-
-                        if len(import_keywords) > 2 and import_keywords[-2] == 'as':
-
-                            if import_keywords[-1] not in import_aliases:
-
-                                import_aliases.append(import_keywords[-1])
-
-                            else:
-
-                                logging.getLogger('GUM Dispenser').error('You used the same import alias twice ' +
-                                                                         'for two different imports...')
+                store_import_dependency(module_info, line_text, current_package, import_aliases)
 
 
             # Catch if we are at a function or class declaration
@@ -417,22 +734,33 @@ def describe_module(current_package : str, current_module : str, package_path :
 
                 if token_name == 'DEDENT':
 
-                    logging.getLogger('GUM Dispenser').debug('Found DEDENT token before ' + line_text)
+                    # Printing the whole tree is expensive, so only build these messages when they are shown
+
+                    if debug_enabled:
 
-                    logging.getLogger('GUM Dispenser').debug('Current tree before DEDENT: ' + str(scope_tree))
+                        scan_logger.debug('Found DEDENT token before ' + line_text)
 
-                    logging.getLogger('GUM Dispenser').debug('Exiting scope: ' + parent_scope)
+                        scan_logger.debug('Current tree before DEDENT: ' + str(module_info))
+
+                        scan_logger.debug('Exiting scope: ' + parent_scope)
+
+                    if trace_lines is not None:
+
+                        trace_event(trace_lines, 'scope_exit', module=current_module, scope=parent_scope,
+                                    line=start[0])
 
                     # Exit our previous scope and put this new declaration under its parent
                     # IOW, new scope will be a sibling to previous scope
 
                     parent_scope = parent_dict[parent_scope]['parent']
 
-                    current_scope_level = parent_dict[parent_scope]['dict']
+                    current_scope_level = parent_dict[parent_scope]['scope']
 
                     nesting_level -= 1
 
-                    logging.getLogger('GUM Dispenser').debug('Decremented nesting level: ' + str(nesting_level))
+                    if debug_enabled:
+
+                        scan_logger.debug('Decremented nesting level: ' + str(nesting_level))
 
                 # Handle multiline declarations
 
@@ -454,20 +782,25 @@ def describe_module(current_package : str, current_module : str, package_path :
                     # Do not store duplicates
                     # We should only enter this block once per unique declaration
 
-                    if signature not in module_data['declarations']:
+                    if signature not in declared_signatures:
 
                         # Log the name of the function/class we just added
 
-                        logging.getLogger('GUM Dispenser').info('Caught declaration for ' + token_str)
+                        scan_logger.info('Caught declaration for %s', token_str)
+
+                        if trace_lines is not None:
+
+                            trace_event(trace_lines, 'scope_enter', module=current_module, scope=signature,
+                                        parent=parent_scope, line=start[0])
 
                         # Store the declaration
 
-                        module_data['declarations'].append(signature)
+                        declared_signatures.add(signature)
 
                         # Store current parent and scope level for future
 
                         parent_dict[signature] = {'parent' : parent_scope,
-                                                  'dict' : current_scope_level}
+                                                  'scope' : current_scope_level}
 
                         # Make this function/class the parent until we exit its scope
 
@@ -475,9 +808,7 @@ def describe_module(current_package : str, current_module : str, package_path :
 
                         # Enter the scope of this new function/class
 
-                        current_scope_level[signature] = {'current_scope_name' : token_str}
-
-                        current_scope_level = current_scope_level[parent_scope]
+                        current_scope_level = current_scope_level.add_declaration(signature, token_str)
 
 
 
@@ -491,8 +822,10 @@ def describe_module(current_package : str, current_module : str, package_path :
 
                 nesting_level -= 1
 
-                logging.getLogger('GUM Dispenser').debug('Decremented nesting level: ' + str(nesting_level) +
-                                                         ' at line ' + line_text)
+                if debug_enabled:
+
+                    scan_logger.debug('Decremented nesting level: ' + str(nesting_level) +
+                                      ' at line ' + line_text)
 
 
             # INDENTs always occur after we will have recorded our named scope
@@ -502,17 +835,178 @@ def describe_module(current_package : str, current_module : str, package_path :
 
                 nesting_level += 1
 
-                logging.getLogger('GUM Dispenser').debug('Incremented nesting level: ' + str(nesting_level) +
-                                                         ' at line ' + line_text)
+                if debug_enabled:
 
-    # Use our correctly leveled dictionary that shows nesting instead of a list of declarations
+                    scan_logger.debug('Incremented nesting level: ' + str(nesting_level) +
+                                      ' at line ' + line_text)
 
-    module_data['declarations'] = scope_tree
+    module_info.token_count = token_count
 
-    logging.getLogger('GUM Dispenser').debug('Dictionary data after processing ' + current_module +
-                                             ': ' + str(current_data_dict))
+    return module_info
 
-    return current_data_dict
 
+def scan_module_top_level(module_bytes: 'bytes | mmap.mmap | BinaryIO', current_package: str,
+                          current_module: str, trace_lines: list = None) -> 'ModuleInfo':
+    """Find a module's dependencies and top level declarations in one pass over a stream of its lines
+    Nested declarations are not kept, so memory use only grows with the number of top level declarations
+    Returns a ModuleInfo record with the same dependencies and top level declarations as scan_module_tokens"""
+
+    module_info = ModuleInfo()
+
+    import_aliases = []
+
+    nesting_level = 0
+
+    # Lines of the top level declaration being read, which may span several lines
+
+    declaration_lines = None
+
+    # Nesting level of the body of the top level declaration we are in, if any
+    # Blocks like if and try do not start a body, so declarations inside them are still top level
+
+    body_level = None
+
+    body_pending = False
+
+    token_count = 0
+
+    for token_type, token_str, start, end, line_text in tokenize(source_readline(module_bytes)):
+
+        token_count += 1
+
+        token_name = token.tok_name[token_type]
+
+        if trace_lines is not None:
+
+            trace_event(trace_lines, 'token', module=current_module, type=token_name, string=token_str,
+                        start=start, end=end)
+
+        if token_name == 'COMMENT':
+
+            continue
+
+        if declaration_lines is not None:
+
+            # A declaration ends with its logical line
+
+            if token_name == 'NEWLINE':
+
+                signature = ' '.join(declaration_lines).strip().rstrip(':')
+
+                if module_info.get_declaration(signature) is None:
+
+                    if trace_lines is not None:
+
+                        trace_event(trace_lines, 'scope_enter', module=current_module, scope=signature,
+                                    parent=current_module, line=start[0])
+
+                    module_info.add_declaration(signature, declaration_name_pattern().match(signature).group(1))
+
+                declaration_lines = None
+
+                body_pending = True
+
+            elif token_name != 'NL' and line_text.strip() not in ' '.join(declaration_lines):
+
+                declaration_lines.append(line_text.strip())
+
+        elif token_name == 'INDENT':
+
+            nesting_level += 1
+
+            if body_pending:
+
+                body_level = nesting_level
+
+        elif token_name == 'DEDENT':
+
+            nesting_level -= 1
+
+            if body_level is not None and nesting_level < body_level:
+
+                body_level = None
+
+        elif token_name != 'STRING' and ('import ' == line_text.strip()[:7] or
+                                         (' import ' in line_text.lower() and line_text.strip()[0] != '#')):
+
+            store_import_dependency(module_info, line_text, current_package, import_aliases)
+
+        elif body_level is None and (line_text.strip()[:4] == 'def ' or line_text.strip()[:6] == 'class '):
+
+            declaration_lines = [line_text.strip()]
+
+        # Only the first token after a declaration can start its body
+
+        if token_name not in ('NEWLINE', 'NL', 'COMMENT'):
+
+            body_pending = False
+
+    module_info.token_count = token_count
+
+    return module_info
+
+
+def store_import_dependency(module_info: 'ModuleInfo', line_text: str, current_package: str,
+                            import_aliases: list) -> None:
+    """Store the dependency named by an import line
+    For a dependency in the current package, store the module name. Otherwise, store the package name"""
+
+    scan_logger = logging.getLogger('GUM Dispenser')
+
+    debug_enabled = scan_logger.isEnabledFor(logging.DEBUG)
+
+    # Import statements should not contain string literals
+    # Ignore if this line of code is printing keywords as literals e.g. 'import ......'
+
+    if "'" not in line_text and '"' not in line_text:
+
+        # Remove punctuation, whitespace, 'from' and 'import'
+
+        import_keywords = [import_name for import_name in split_import_pattern().split(line_text.strip())
+                           if not import_name.isspace() and import_name != '' and import_name != '.']
+
+        # If an alias is used in a subsequent import, it would logically be the first keyword in the line
+        # No sense in making an alias if you are still referencing it with its parent...
+
+        # Update: removing condition 'if import_keywords[0] not in import_aliases'
+        # Python import aliasing makes an alias for the module object, not an import path
+        # This means that aliases cannot be referenced in subsequent import statements as parents
+        # Reference: https://stackoverflow.com/questions/42459939/import-modules-using-an-alias
+
+        # External dependency
+        # We want to store the package dependency
+
+        if current_package not in import_keywords:
+
+            if debug_enabled:
+
+                scan_logger.debug('External dependency line: ' + str(import_keywords))
+
+            dependency = import_keywords[0]
+
+
+        # The dependency is defined in our current source package
+
+        else:
+
+            if debug_enabled:
+
+                scan_logger.debug('Internal dependency line: ' + str(import_keywords))
+
+            dependency = import_keywords[1]
+
+
+        # Do not store duplicate dependencies
+
+        if module_info.add_dependency(dependency):
+
+            if len(import_keywords) > 2 and import_keywords[-2] == 'as':
+
+                if import_keywords[-1] not in import_aliases:
+
+                    import_aliases.append(import_keywords[-1])
 
+                else:
 
+                    scan_logger.error('You used the same import alias twice ' +
+                                      'for two different imports...')
@@ -0,0 +1,229 @@
+
+import ast
+
+import os
+
+import re
+
+import logging
+
+from functools import lru_cache
+
+from pathlib import Path
+
+from GUM_Dispenser.GUM_Exceptions import SourceModuleNotFoundError
+
+
+# Directories that never hold package source
+
+IGNORED_DIRECTORIES = {'__pycache__'}
+
+
+@lru_cache(maxsize=None)
+def init_all_pattern() -> 're.Pattern':
+    """Matches __all__ global variable assignments in __init__.py. Compiled on first use"""
+
+    return re.compile(r"""(?:^__all__\s*=\s*)(\[[^\[\]]*\]$)""", re.MULTILINE)
+
+
+def module_file_path(package_path: 'Path', module_name: str) -> 'Path':
+    """Get the source file for a module name, which may be dotted for modules in subpackages"""
+
+    module_parts = module_name.split('.')
+
+    return Path(package_path).joinpath(*module_parts[:-1], module_parts[-1] + '.py')
+
+
+def list_source_directory(directory: str, listing_cache: dict = None) -> dict:
+    """List the .py modules and subdirectories of a directory with a single scandir call
+    Listings are stored in listing_cache, keyed by directory, so no directory is read twice"""
+
+    if listing_cache is not None and directory in listing_cache:
+
+        return listing_cache[directory]
+
+    listing = {'modules': [], 'directories': []}
+
+    try:
+
+        with os.scandir(directory) as directory_entries:
+
+            for entry in directory_entries:
+
+                # Directory entries know their own type, so no stat calls are needed here
+
+                if entry.name.endswith('.py') and entry.is_file():
+
+                    listing['modules'].append(entry.name[:-3])
+
+                elif entry.is_dir() and not entry.name.startswith('.') and entry.name not in IGNORED_DIRECTORIES:
+
+                    listing['directories'].append(entry.name)
+
+    except (FileNotFoundError, NotADirectoryError):
+
+        pass
+
+    # A symbolic link loop or an unreadable directory should not stop the rest of the walk
+
+    except OSError as err:
+
+        logging.getLogger('GUM Dispenser').warning('Skipping directory ' + directory + ': ' + str(err))
+
+    # Directory order depends on the file system, so sort for repeatable output
+
+    listing['modules'].sort()
+
+    listing['directories'].sort()
+
+    if listing_cache is not None:
+
+        listing_cache[directory] = listing
+
+    return listing
+
+
+def read_init_all(init_path: str) -> list:
+    """Return the modules named by the last __all__ assignment in an __init__.py, or None if there is none"""
+
+    with open(init_path, 'r') as init_file:
+
+        logging.getLogger('GUM Dispenser').info('Found __init__.py')
+
+        init_contents = init_file.read()
+
+    # Grab the capturing group
+
+    init_results = [current_match.group(1).strip() for current_match in init_all_pattern().finditer(init_contents)
+                    if not current_match.group(1) is None and
+                    not (current_match.group(1).isspace() or current_match.group(1) == '')]
+
+    logging.getLogger('GUM Dispenser').debug(init_results)
+
+    if len(init_results) == 0:
+
+        return None
+
+    logging.getLogger('GUM Dispenser').info('Found __all__ declaration. Using ' + str(init_results[-1]) +
+                                            ' as module list')
+
+    return ast.literal_eval(init_results[-1])
+
+
+def directory_identity(directory: 'Path') -> tuple:
+    """Get the (device, inode) pair that identifies a directory however it was reached, or None if it is gone"""
+
+    try:
+
+        directory_stat = os.stat(str(directory))
+
+    except OSError:
+
+        return None
+
+    return directory_stat.st_dev, directory_stat.st_ino
+
+
+def discover_package_modules(name: str, package_path: 'Path', listing_cache: dict = None,
+                             walked_packages: set = None) -> list:
+    """List every module in a package, including modules of its subpackages as dotted names like 'sub.mod'
+    Each package's __init__.py __all__ decides what it includes. Packages without one include all of
+    their .py files and every subdirectory holding an __init__.py
+    The dotted names of the package and every subpackage it includes are added to walked_packages if given
+    Walks the tree once without changing the working directory. A directory reached again, e.g. through a
+    symbolic link back up the tree, is skipped"""
+
+    if listing_cache is None:
+
+        listing_cache = {}
+
+    package_path = Path(package_path)
+
+    package_modules = []
+
+    # Walk iteratively so deep trees cannot exhaust the recursion limit
+
+    pending_packages = [(name, package_path, '')]
+
+    # (device, inode) of every package directory walked so far
+
+    walked_directories = set()
+
+    while len(pending_packages) > 0:
+
+        current_name, current_path, module_prefix = pending_packages.pop()
+
+        directory_key = directory_identity(current_path)
+
+        if directory_key is not None:
+
+            if directory_key in walked_directories:
+
+                logging.getLogger('GUM Dispenser').warning('Skipping package ' + current_name + ' at ' +
+                                                           str(current_path) + ', its directory was already walked')
+
+                continue
+
+            walked_directories.add(directory_key)
+
+        if walked_packages is not None:
+
+            walked_packages.add(current_name)
+
+        listing = list_source_directory(str(current_path), listing_cache)
+
+        init_modules = None
+
+        if '__init__' in listing['modules']:
+
+            init_modules = read_init_all(str(current_path.joinpath('__init__.py')))
+
+            if init_modules is None:
+
+                logging.getLogger('GUM Dispenser').warning('__init__.py __all__ definition was not found for ' +
+                                                           'package ' + current_name + '. Treating all same ' +
+                                                           'level .py files as included modules...')
+
+        else:
+
+            logging.getLogger('GUM Dispenser').warning('__init__.py does not exist for package ' + current_name +
+                                                       '. Treating all same level .py files as included modules...')
+
+        if init_modules is None or len(init_modules) == 0:
+
+            init_modules = listing['modules'] + [directory_name for directory_name in listing['directories']
+                                                 if is_package_directory(current_path.joinpath(directory_name),
+                                                                         listing_cache)]
+
+        subpackages = []
+
+        for module_name in init_modules:
+
+            if module_name in listing['modules']:
+
+                package_modules.append(module_prefix + module_name)
+
+            elif module_name in listing['directories'] and is_package_directory(current_path.joinpath(module_name),
+                                                                                listing_cache):
+
+                subpackages.append((current_name + '.' + module_name, current_path.joinpath(module_name),
+                                    module_prefix + module_name + '.'))
+
+            else:
+
+                raise SourceModuleNotFoundError('The module named ' + module_name + ', specified in __init__.py, ' +
+                                                'does not exist')
+
+        # Subpackages are listed after their parent's modules, in the order they were named
+
+        pending_packages.extend(reversed(subpackages))
+
+    logging.getLogger('GUM Dispenser').info('All specified modules exist')
+
+    return package_modules
+
+
+def is_package_directory(directory: 'Path', listing_cache: dict) -> bool:
+    """Check whether a directory is a regular package holding an __init__.py"""
+
+    return '__init__' in list_source_directory(str(directory), listing_cache)['modules']
@@ -3,21 +3,33 @@ import argparse
 
 import os
 
+import sys
+
+import time
+
 from pathlib import Path
 
 from GUM_Dispenser.GUM_Exceptions import InvalidSourcePathError, ConfigurationNotFoundError, PackageNotFoundError
 
-from GUM_Dispenser.GUM_Exceptions import SourceModuleNotFoundError, UserConfirmedInvalidSetup
+from GUM_Dispenser.GUM_Exceptions import SourceModuleNotFoundError, UserConfirmedInvalidSetup, SetupSizeLimitError
 
-from GUM_Dispenser.GUM_setup_parser import parse_setup
+from GUM_Dispenser.GUM_Exceptions import InvalidIRError
 
-from GUM_Dispenser.GUM_Describe_Source import describe_project
+# Defaults come from the import-free GUM_Defaults. The scanner, renderers and server are imported by the
+# functions that use them, so --help, argument errors and light runs do not load them
 
-from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+from GUM_Dispenser.GUM_Defaults import DEFAULT_SETUP_SIZE_LIMIT, SETUP_SIZE_POLICIES, DEFAULT_LARGE_MODULE_BYTES
+from GUM_Dispenser.GUM_Defaults import LARGE_MODULE_POLICIES, DEFAULT_WRAP_WIDTH, DEFAULT_BREAK_WIDTH
+from GUM_Dispenser.GUM_Defaults import DEFAULT_CACHE_MAX_BYTES, OUTPUT_FORMATS, IR_ENCODINGS, SPLIT_MODES
+from GUM_Dispenser.GUM_Defaults import DEFAULT_SERVE_ADDRESS
 
 import logging
 
 
+# Name given to our console handler so initialize_log can find it again
+
+LOG_HANDLER_NAME = 'GUM Dispenser console'
+
 def define_arguments() -> 'ArgumentParser':
     """Define command line arguments for GUM Dispenser"""
 
@@ -32,20 +44,162 @@ def define_arguments() -> 'ArgumentParser':
                              + 'If not given, checks the value of --path and its immediate parent for setup.py',
                             default=None)
 
+    arg_parser.add_argument('--output', '-o', help='File to write the NOMNOML to. Default is stdout',
+                            default=None)
+
+    arg_parser.add_argument('--format', '-f', help='Output format, optionally followed by =PATH to write it to a ' +
+                            'file, e.g. dot=diagram.dot. Repeat to render several formats from one scan. ' +
+                            'Formats without a path go to stdout. Choose from ' + ', '.join(OUTPUT_FORMATS) +
+                            '. Default is nomnoml written to --output', action='append', default=None)
+
+    arg_parser.add_argument('--wrap-width', help='Break declaration blocks after this many characters. ' +
+                            'Default is ' + str(DEFAULT_WRAP_WIDTH), type=int, default=DEFAULT_WRAP_WIDTH)
+
+    arg_parser.add_argument('--break-width', help='Start the next declaration on a new line once a line reaches ' +
+                            'this many characters. Default is ' + str(DEFAULT_BREAK_WIDTH),
+                            type=int, default=DEFAULT_BREAK_WIDTH)
+
+    arg_parser.add_argument('--split-by', help='Write one NOMNOML file per package to --batch-output-dir, plus ' +
+                            'an index diagram of the packages and the imports between them. Shards are rendered ' +
+                            'in parallel with --workers. --output and --format are ignored', choices=SPLIT_MODES,
+                            default=None)
+
+    arg_parser.add_argument('--shard', help='With --split-by, only render the shard of this package again. ' +
+                            'Repeat to render several', action='append', default=None)
+
+    arg_parser.add_argument('--include', help='Only draw modules whose package.module path matches this glob, ' +
+                            "e.g. 'mypkg.core*'. Repeat to include several patterns", action='append', default=None)
+
+    arg_parser.add_argument('--exclude', help='Leave out modules whose package.module path matches this glob, ' +
+                            "along with edges to them, e.g. '*.tests*'. Repeat to exclude several patterns",
+                            action='append', default=None)
+
+    arg_parser.add_argument('--max-depth', help='Only draw declarations nested up to this many levels deep. ' +
+                            '1 keeps top level classes and functions, 0 draws modules without declarations',
+                            type=int, default=None)
+
+    arg_parser.add_argument('--collapse-external', help='Draw each external dependency once from the importing ' +
+                            'package instead of once from every module that imports it', action='store_true')
+
+    arg_parser.add_argument('--merge-edges', help='Draw dependency edges that repeat under the same names once, ' +
+                            'labeled with how many edges they stand for', action='store_true')
+
     arg_parser.add_argument('--debug', help='Flag to display debug level messages during execution',
                             action='store_true')
 
+    arg_parser.add_argument('--trace-file', help='With --debug, append a JSON line for every token and scope ' +
+                            'change seen while scanning modules to this file', default=None)
+
+    arg_parser.add_argument('--workers', '-w', help='Number of worker processes used to scan modules. ' +
+                            'Default is 1, which scans every module in this process',
+                            type=int, default=1)
+
+    arg_parser.add_argument('--engine', help='How modules are scanned. tokenize walks source tokens, ' +
+                            'ast parses each module with the ast module and is faster on large modules. ' +
+                            'Default is tokenize', choices=['tokenize', 'ast'], default='tokenize')
+
+    arg_parser.add_argument('--large-module-bytes', help='Modules of this many bytes or more are read as a stream ' +
+                            'and handled by --large-module-policy, so memory use stays bounded. Default is ' +
+                            str(DEFAULT_LARGE_MODULE_BYTES), type=int, default=DEFAULT_LARGE_MODULE_BYTES)
+
+    arg_parser.add_argument('--large-module-policy', help='How to scan modules over --large-module-bytes. ' +
+                            'top-level keeps their dependencies and top level declarations, skip leaves them ' +
+                            'empty with a warning. Default is top-level', choices=LARGE_MODULE_POLICIES,
+                            default='top-level')
+
+    arg_parser.add_argument('--cache-dir', help='Directory for storing module scan results between runs. ' +
+                            'Unchanged modules are read from here instead of being scanned again',
+                            default=None)
+
+    arg_parser.add_argument('--cache-max-bytes', help='Size budget for --cache-dir in bytes. Least recently used ' +
+                            'entries are removed when the cache grows past it. Default is ' +
+                            str(DEFAULT_CACHE_MAX_BYTES),
+                            type=int, default=DEFAULT_CACHE_MAX_BYTES)
+
+    arg_parser.add_argument('--watch', help='Keep running after the first diagram and print a new one whenever ' +
+                            'a scanned module changes. Only changed modules are rescanned',
+                            action='store_true')
+
+    arg_parser.add_argument('--watch-interval', help='Seconds between checks for changed modules in --watch mode. ' +
+                            'Default is 1', type=float, default=1.0)
+
+    arg_parser.add_argument('--setup-size-policy', help='What to do when setup.py is larger than ' +
+                            '--setup-size-limit. truncate reads only up to the limit. Default is to prompt when ' +
+                            'run from a terminal and to truncate otherwise', choices=SETUP_SIZE_POLICIES, default=None)
+
+    arg_parser.add_argument('--setup-size-limit', help='Size in bytes above which --setup-size-policy applies. ' +
+                            'Default is ' + str(DEFAULT_SETUP_SIZE_LIMIT), type=int, default=DEFAULT_SETUP_SIZE_LIMIT)
+
+    arg_parser.add_argument('--profile', help='Print time spent in each phase and the slowest modules to stderr',
+                            action='store_true')
+
+    arg_parser.add_argument('--import-report', help='Print import cycles, the most imported and most importing ' +
+                            'modules and their transitive dependents to stderr', action='store_true')
+
+    arg_parser.add_argument('--highlight-cycles', help='Color modules that are part of an import cycle in the ' +
+                            'NOMNOML output', action='store_true')
+
+    arg_parser.add_argument('--emit-ir', help='Write the scanned project to this intermediate representation ' +
+                            'file instead of rendering it, unless --format is also given. Render it later with ' +
+                            '--from-ir', default=None)
+
+    arg_parser.add_argument('--ir-encoding', help='Encoding for --emit-ir. json is readable, binary is zlib ' +
+                            'compressed. Default is json', choices=IR_ENCODINGS, default='json')
+
+    arg_parser.add_argument('--from-ir', help='Render an intermediate representation file written by --emit-ir ' +
+                            'instead of scanning. --path and setup.py are not read', default=None)
+
+    arg_parser.add_argument('--serve', help='Keep running as a local server that renders projects on request, ' +
+                            'e.g. GET /render?path=PROJECT&format=dot. Scans stay in memory and files are checked ' +
+                            'by stat before answering, so repeated requests only rescan changed modules',
+                            action='store_true')
+
+    arg_parser.add_argument('--serve-address', help='Where --serve listens, as a localhost HOST:PORT or as ' +
+                            'unix:PATH for a Unix socket. Default is ' + DEFAULT_SERVE_ADDRESS,
+                            default=DEFAULT_SERVE_ADDRESS)
+
+    arg_parser.add_argument('--batch', help='Manifest file listing several projects to describe, one per line as ' +
+                            'a project path and an optional setup.py path. Every project is scanned by the same ' +
+                            'worker pool and written to its own file. --path and --setup_file are ignored',
+                            default=None)
+
+    arg_parser.add_argument('--batch-output-dir', help='Directory that --batch, --per-distribution and --split-by ' +
+                            'write their .nomnoml files to. Default is current working directory', default=os.getcwd())
+
+    arg_parser.add_argument('--recursive-setups', help='Treat --path as a monorepo root and describe every ' +
+                            'distribution with a setup.py below it, skipping version control, virtualenv and ' +
+                            'build directories. Writes one combined diagram to --output unless --per-distribution ' +
+                            'is given', action='store_true')
+
+    arg_parser.add_argument('--per-distribution', help='With --recursive-setups, write one diagram per ' +
+                            'distribution to --batch-output-dir instead of one combined diagram',
+                            action='store_true')
+
     return arg_parser
 
 
 def initialize_log(arguments_received : dict) -> None:
-    """Set up logging components and bind them together"""
+    """Set up logging components and bind them together
+    Calling this again only updates the logging level, so handlers are never duplicated"""
 
     # Use our custom formatter
     main_formatter = logging.Formatter(fmt='%(asctime)s %(module)s.py: %(levelname)s - %(message)s')
 
-    # Set up our handler
-    main_handler = logging.StreamHandler()
+    # Set up our handler, reusing the one from an earlier call if there is one
+
+    main_logger = logging.getLogger('GUM Dispenser')
+
+    existing_handlers = [handler for handler in main_logger.handlers if handler.get_name() == LOG_HANDLER_NAME]
+
+    if len(existing_handlers) > 0:
+
+        main_handler = existing_handlers[0]
+
+    else:
+
+        main_handler = logging.StreamHandler()
+
+        main_handler.set_name(LOG_HANDLER_NAME)
 
     level_string = ''
 
@@ -59,93 +213,207 @@ def initialize_log(arguments_received : dict) -> None:
     main_handler.setFormatter(main_formatter)
 
     # Set up our logger
-    main_logger = logging.getLogger('GUM Dispenser')
 
     if arguments_received['debug']:
         main_logger.setLevel(level_string)
     else:
         main_logger.setLevel(level_string)
-    main_logger.addHandler(main_handler)
+
+    if len(existing_handlers) == 0:
+
+        main_logger.addHandler(main_handler)
 
     logging.getLogger('GUM Dispenser').info('Welcome to GUM Dispenser!')
     logging.getLogger('GUM Dispenser').info('Logging level: ' + level_string)
 
 
-def check_for_setup(arguments_received: dict) -> str:
-    """Get the path to a nearby or specified setup.py file as a string"""
+def build_scan_options(arguments_received: dict) -> dict:
+    """Collect the command line options that change how modules are scanned"""
 
-    setup_path_str = None
+    # Scan results only feed the generator here, so keep them as compact records
 
-    # Check user supplied setup path if it is present
+    scan_options = {'engine': arguments_received.get('engine', 'tokenize'), 'records': True,
+                    'large_module_bytes': arguments_received.get('large_module_bytes', DEFAULT_LARGE_MODULE_BYTES),
+                    'large_module_policy': arguments_received.get('large_module_policy', 'top-level')}
 
-    if arguments_received['setup_file'] is not None and arguments_received['setup_file'] != '':
+    if arguments_received.get('cache_dir'):
 
-        setup_path_str = arguments_received['setup_file']
+        scan_options['cache_dir'] = str(Path(arguments_received['cache_dir']).resolve())
 
-        setup_path = Path(setup_path_str)
+        scan_options['cache_max_bytes'] = arguments_received.get('cache_max_bytes', DEFAULT_CACHE_MAX_BYTES)
 
-        if setup_path.exists():
+    if arguments_received.get('trace_file'):
 
-            # Find a setup.py file at or near the given path
+        if arguments_received.get('debug'):
 
-            if setup_path.name == 'setup.py':
+            scan_options['trace_path'] = str(Path(arguments_received['trace_file']).resolve())
 
-                logging.getLogger('GUM Dispenser').info('Setup found in given directory: ' + str(setup_path.parent))
+        else:
 
-                setup_path_str = str(setup_path.parent)
+            logging.getLogger('GUM Dispenser').warning('--trace-file is only written with --debug')
 
-            elif setup_path.is_dir():
+    return scan_options
 
-                if Path(setup_path).joinpath('setup.py').exists():
 
-                    logging.getLogger('GUM Dispenser').info("Setup found in given directory: " + str(setup_path))
+def build_render_options(arguments_received: dict) -> dict:
+    """Collect the command line options that change how markup is generated"""
 
-        else:
+    return {'wrap_width': arguments_received.get('wrap_width', DEFAULT_WRAP_WIDTH),
+            'break_width': arguments_received.get('break_width', DEFAULT_BREAK_WIDTH)}
+
+
+def build_reduce_options(arguments_received: dict) -> dict:
+    """Collect the command line options that shrink the diagram before it is rendered"""
+
+    return {'include': arguments_received.get('include') or [],
+            'exclude': arguments_received.get('exclude') or [],
+            'max_depth': arguments_received.get('max_depth'),
+            'collapse_external': arguments_received.get('collapse_external', False),
+            'merge_edges': arguments_received.get('merge_edges', False)}
+
+
+def build_setup_options(arguments_received: dict) -> dict:
+    """Collect the command line options that change how setup.py files are read"""
+
+    return {'size_policy': arguments_received.get('setup_size_policy'),
+            'size_limit': arguments_received.get('setup_size_limit', DEFAULT_SETUP_SIZE_LIMIT)}
+
+
+def emit_nomnoml(uml_data: dict, entry_points: list, output_path: str = None, render_options: dict = None) -> None:
+    """Stream NOMNOML to the given output file, or to stdout if no file is given
+    Markup is written module by module as it is generated"""
+
+    from GUM_Dispenser.GUM_Generate_NOMNOML import write_project_nomnoml
+
+    if output_path is None:
+
+        write_project_nomnoml(uml_data, entry_points, sys.stdout, render_options)
+
+        sys.stdout.write('\n')
+
+        sys.stdout.flush()
+
+    else:
+
+        with open(output_path, 'w') as output_file:
+
+            write_project_nomnoml(uml_data, entry_points, output_file, render_options)
+
+            output_file.write('\n')
 
-            logging.getLogger('GUM Dispenser').error('Given explicit setup.py path ' + str(setup_path) +
-                                                     ' does not exist. Checking near development directory instead...')
 
-            setup_path_str = None
+def analyze_imports(uml_data: dict, arguments_received: dict, render_options: dict) -> dict:
+    """Print the import report and mark import cycles for rendering when they were requested
+    Returns the render options to use"""
 
+    from GUM_Dispenser.GUM_Import_Graph import build_import_graph, format_import_report, cycle_module_keys
 
-    # User did not specify setup.py location or no file found near given path
+    if not arguments_received.get('import_report') and not arguments_received.get('highlight_cycles'):
 
-    if setup_path_str is None:
+        return render_options
 
-        logging.getLogger('GUM Dispenser').info('No explicit input directory for setup.py. ' +
-                                                'Checking near development directory...')
+    import_graph = build_import_graph(uml_data)
 
+    if arguments_received.get('import_report'):
 
-        # Check given directory and one level up for the setup file
+        print(format_import_report(import_graph), file=sys.stderr)
 
-        if Path(arguments_received['path']).joinpath('setup.py').exists():
+    if arguments_received.get('highlight_cycles'):
 
-            logging.getLogger('GUM Dispenser').info("Setup found in base development directory: " +
-                                                    arguments_received['path'])
+        return dict(render_options, cycle_modules=cycle_module_keys(import_graph))
 
-            setup_path_str = arguments_received['path']
+    return render_options
 
-        elif Path(arguments_received['path']).parent.joinpath('setup.py').exists():
 
-            logging.getLogger('GUM Dispenser').info("Setup found in base development directory: " +
-                                                    str(Path(arguments_received['path']).parent))
+def reduce_for_rendering(uml_data: dict, entry_points: list, arguments_received: dict, render_options: dict) -> tuple:
+    """Apply the requested reduction filters to a copy of the scan before it is rendered
+    Entry points are resolved against the full scan first, so filtered out entry points are not reported missing
+    Returns (source data, entry points, render options) to render with"""
 
-            setup_path_str = str(Path(arguments_received['path']).parent)
+    from GUM_Dispenser.GUM_Reduce import reduce_project, reduction_requested
 
+    from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index
 
-    # Require presence of a setup.py file
-    if setup_path_str is None:
+    reduce_options = build_reduce_options(arguments_received)
 
-        raise ConfigurationNotFoundError
+    if not reduction_requested(reduce_options):
 
+        return uml_data, entry_points, render_options
 
-    return setup_path_str
+    entry_index = build_entry_point_index(uml_data, entry_points)
+
+    reduced_data, edge_weights = reduce_project(uml_data, reduce_options)
+
+    return reduced_data, entry_index, dict(render_options, edge_weights=edge_weights)
+
+
+def emit_project(uml_data: dict, entry_points: list, format_outputs: list, output_path: str = None,
+                 render_options: dict = None) -> None:
+    """Write every requested output format, or NOMNOML to output_path if no formats were requested"""
+
+    from GUM_Dispenser.GUM_Render import render_formats
+
+    if format_outputs:
+
+        render_formats(uml_data, entry_points, format_outputs, render_options)
+
+    else:
+
+        emit_nomnoml(uml_data, entry_points, output_path, render_options)
+
+
+def split_project(uml_data: dict, entry_points: list, arguments_received: dict, render_options: dict) -> None:
+    """Write one diagram per package and an index diagram to --batch-output-dir"""
+
+    from GUM_Dispenser.GUM_Shard import write_shards
+
+    if arguments_received.get('format') or arguments_received.get('output'):
+
+        logging.getLogger('GUM Dispenser').warning('--split-by writes NOMNOML to --batch-output-dir. ' +
+                                                   '--output and --format are ignored')
+
+    written_files = write_shards(uml_data, entry_points, arguments_received.get('batch_output_dir', os.getcwd()),
+                                 workers=arguments_received.get('workers', 1), render_options=render_options,
+                                 packages=arguments_received.get('shard'))
+
+    logging.getLogger('GUM Dispenser').info('Wrote ' + str(len(written_files['shards'])) + ' shards and the index ' +
+                                            written_files['index'])
 
 
 def dispense_gum(arguments_received: dict) -> None:
 
+    from GUM_Dispenser.GUM_Render import parse_format_option
+
     try:
 
+        # Check requested formats before doing any work
+
+        format_outputs = [parse_format_option(format_option) for format_option in
+                          arguments_received.get('format') or []]
+
+        # Render an earlier scan without touching the source tree
+
+        if arguments_received.get('from_ir'):
+
+            from GUM_Dispenser.GUM_IR import read_ir
+
+            uml_data, entry_points = read_ir(arguments_received['from_ir'])
+
+            render_data, entry_points, render_options = reduce_for_rendering(
+                uml_data, entry_points, arguments_received,
+                analyze_imports(uml_data, arguments_received, build_render_options(arguments_received)))
+
+            if arguments_received.get('split_by'):
+
+                split_project(render_data, entry_points, arguments_received, render_options)
+
+            else:
+
+                emit_project(render_data, entry_points, format_outputs, arguments_received.get('output'),
+                             render_options)
+
+            return
+
         development_directory = Path(arguments_received['path']).resolve()  # Expand symbolic links
 
         # Input should be a directory
@@ -154,23 +422,110 @@ def dispense_gum(arguments_received: dict) -> None:
 
             raise InvalidSourcePathError
 
-        setup_path = check_for_setup(arguments_received)
+        from GUM_Dispenser.GUM_setup_parser import check_for_setup, parse_setup
+
+        from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+        # profile_phase does nothing without a profile. The scanner imports GUM_Profile anyway
+
+        from GUM_Dispenser.GUM_Profile import profile_phase
+
+        profile = None
+
+        if arguments_received.get('profile'):
+
+            from GUM_Dispenser.GUM_Profile import new_profile
+
+            profile = new_profile()
+
+        with profile_phase(profile, 'setup'):
 
+            setup_path = check_for_setup(arguments_received)
 
-        # Read list of attributes and values used in setup.py, ignoring comments
 
-        setup_distro_defs = parse_setup(setup_path)
+            # Read list of attributes and values used in setup.py, ignoring comments
+
+            setup_distro_defs = parse_setup(setup_path, arguments_received.get('setup_size_policy'),
+                                            arguments_received.get('setup_size_limit', DEFAULT_SETUP_SIZE_LIMIT))
 
         logging.getLogger('GUM Dispenser').debug(setup_distro_defs)
 
 
         # Get a dictionary full of relevant data for UML text generation
 
-        uml_data = describe_project(setup_distro_defs, development_directory)
+        scan_options = build_scan_options(arguments_received)
+
+        scan_options['profile'] = profile
+
+        describe_start = time.perf_counter()
+
+        uml_data = describe_project(setup_distro_defs, development_directory,
+                                    workers=arguments_received.get('workers', 1), scan_options=scan_options)
+
+        # Discovery is timed inside describe_project, everything else it does is scanning
+
+        if profile is not None:
+
+            from GUM_Dispenser.GUM_Profile import record_phase
+
+            record_phase(profile, 'scanning', time.perf_counter() - describe_start -
+                         profile['phases'].get('discovery', 0.0))
 
         logging.getLogger('GUM Dispenser').debug(uml_data)
 
-        print(generate_project_nomnoml(uml_data, setup_distro_defs['entry_points']))
+        render_options = build_render_options(arguments_received)
+
+        def publish_project(current_data: dict) -> None:
+            """Write the scan as IR so it can be rendered elsewhere with --from-ir, and render it
+            With --emit-ir, rendering only happens when formats were requested"""
+
+            current_render_options = analyze_imports(current_data, arguments_received, render_options)
+
+            if arguments_received.get('emit_ir'):
+
+                from GUM_Dispenser.GUM_IR import write_ir
+
+                write_ir(arguments_received['emit_ir'], current_data, setup_distro_defs['entry_points'],
+                         arguments_received.get('ir_encoding', 'json'))
+
+            if not arguments_received.get('emit_ir') or format_outputs:
+
+                # The IR keeps the full scan, reduction filters only change what is drawn
+
+                render_data, entry_points, current_render_options = reduce_for_rendering(
+                    current_data, setup_distro_defs['entry_points'], arguments_received, current_render_options)
+
+                if arguments_received.get('split_by'):
+
+                    split_project(render_data, entry_points, arguments_received, current_render_options)
+
+                else:
+
+                    emit_project(render_data, entry_points, format_outputs, arguments_received.get('output'),
+                                 current_render_options)
+
+        with profile_phase(profile, 'generation'):
+
+            publish_project(uml_data)
+
+        if profile is not None:
+
+            from GUM_Dispenser.GUM_Profile import format_profile_report
+
+            print(format_profile_report(profile), file=sys.stderr)
+
+            # Watch rescans are not part of the report
+
+            scan_options['profile'] = None
+
+        # Keep the scan in memory and only rescan modules as they change
+
+        if arguments_received.get('watch'):
+
+            from GUM_Dispenser.GUM_Watch_Source import watch_project
+
+            watch_project(uml_data, development_directory, publish_project, scan_options=scan_options,
+                          interval=arguments_received.get('watch_interval', 1.0))
 
 
 
@@ -200,6 +555,17 @@ def dispense_gum(arguments_received: dict) -> None:
         logging.getLogger('GUM Dispenser').exception('User requested program termination. Goodbye')
 
 
+    except InvalidIRError as err:
+
+        logging.getLogger('GUM Dispenser').exception('Could not read intermediate representation file. ' + str(err))
+
+
+    except SetupSizeLimitError as err:
+
+        logging.getLogger('GUM Dispenser').exception(str(err) + '. Use --setup-size-policy accept or raise ' +
+                                                     '--setup-size-limit to read it anyway')
+
+
     except Exception as err:
 
         logging.getLogger('GUM Dispenser').exception('Error: ' + str(err))
@@ -207,6 +573,101 @@ def dispense_gum(arguments_received: dict) -> None:
 
 
 
+def dispense_batch(arguments_received: dict) -> bool:
+    """Describe every project listed in a --batch manifest and print a summary to stderr
+    Returns True if every project succeeded"""
+
+    from GUM_Dispenser.GUM_Batch import read_batch_manifest, run_batch, format_batch_summary
+
+    try:
+
+        batch_projects = read_batch_manifest(arguments_received['batch'])
+
+    except (OSError, ValueError) as err:
+
+        logging.getLogger('GUM Dispenser').exception('Could not read batch manifest. ' + str(err))
+
+        return False
+
+    batch_results = run_batch(batch_projects, arguments_received.get('batch_output_dir', os.getcwd()),
+                              workers=arguments_received.get('workers', 1),
+                              scan_options=build_scan_options(arguments_received),
+                              render_options=build_render_options(arguments_received),
+                              setup_options=build_setup_options(arguments_received))
+
+    print(format_batch_summary(batch_results), file=sys.stderr)
+
+    return all(batch_result['status'] == 'ok' for batch_result in batch_results)
+
+
+def dispense_monorepo(arguments_received: dict) -> bool:
+    """Describe every distribution below --path and print a summary to stderr
+    Returns True if every distribution succeeded"""
+
+    from GUM_Dispenser.GUM_Monorepo import run_monorepo
+
+    from GUM_Dispenser.GUM_Batch import format_batch_summary
+
+    root_directory = Path(arguments_received['path']).resolve()
+
+    if not root_directory.is_dir():
+
+        logging.getLogger('GUM Dispenser').error('The given source path ' + str(root_directory) +
+                                                 ' is not a directory')
+
+        return False
+
+    monorepo_options = {'workers': arguments_received.get('workers', 1),
+                        'scan_options': build_scan_options(arguments_received),
+                        'render_options': build_render_options(arguments_received),
+                        'setup_options': build_setup_options(arguments_received)}
+
+    if arguments_received.get('per_distribution'):
+
+        batch_results = run_monorepo(str(root_directory), arguments_received.get('batch_output_dir', os.getcwd()),
+                                     **monorepo_options)
+
+    elif arguments_received.get('output') is None:
+
+        batch_results = run_monorepo(str(root_directory), output_stream=sys.stdout, **monorepo_options)
+
+        sys.stdout.flush()
+
+    else:
+
+        with open(arguments_received['output'], 'w') as output_file:
+
+            batch_results = run_monorepo(str(root_directory), output_stream=output_file, **monorepo_options)
+
+    print(format_batch_summary(batch_results), file=sys.stderr)
+
+    return all(batch_result['status'] == 'ok' for batch_result in batch_results)
+
+
+def dispense_server(arguments_received: dict) -> bool:
+    """Serve render requests until interrupted
+    Returns False if the server could not start"""
+
+    from GUM_Dispenser.GUM_Serve import serve
+
+    try:
+
+        serve(arguments_received.get('serve_address', DEFAULT_SERVE_ADDRESS),
+              scan_options=build_scan_options(arguments_received),
+              render_options=build_render_options(arguments_received),
+              setup_options=build_setup_options(arguments_received),
+              workers=arguments_received.get('workers', 1))
+
+    except (OSError, ValueError) as err:
+
+        logging.getLogger('GUM Dispenser').error('Unable to serve on ' +
+                                                 str(arguments_received.get('serve_address')) + ': ' + str(err))
+
+        return False
+
+    return True
+
+
 def main():
 
     input_parser = define_arguments()
@@ -215,4 +676,24 @@ def main():
 
     initialize_log(vars(arguments_received))
 
-    dispense_gum(vars(arguments_received))
+    if vars(arguments_received).get('serve'):
+
+        if not dispense_server(vars(arguments_received)):
+
+            sys.exit(1)
+
+    elif vars(arguments_received).get('batch'):
+
+        if not dispense_batch(vars(arguments_received)):
+
+            sys.exit(1)
+
+    elif vars(arguments_received).get('recursive_setups'):
+
+        if not dispense_monorepo(vars(arguments_received)):
+
+            sys.exit(1)
+
+    else:
+
+        dispense_gum(vars(arguments_received))
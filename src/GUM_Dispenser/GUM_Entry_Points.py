@@ -0,0 +1,157 @@
+
+import logging
+
+from GUM_Dispenser.GUM_Scan_Model import as_module_info
+
+
+def parse_entry_point(entry_point: str) -> tuple:
+    """Split an entry point value like 'pkg.module:Class.method [extra]' into (module path, qualified name)
+    The qualified name is None when no object is named"""
+
+    # Drop any extras, which do not change what is run
+
+    entry_point = entry_point.split('[')[0].strip()
+
+    if ':' not in entry_point:
+
+        return entry_point, None
+
+    module_path, qualified_name = entry_point.split(':', 1)
+
+    return module_path.strip(), qualified_name.strip()
+
+
+def iter_project_modules(source_data: dict) -> 'Iterator[tuple]':
+    """Yield (package, module name, module data) for every scanned module
+    The package is '' for projects made of individual modules"""
+
+    if 'packages' in source_data:
+
+        for package, package_data in source_data['packages'].items():
+
+            for module_name, module_data in package_data['modules'].items():
+
+                yield package, module_name, module_data
+
+    else:
+
+        for module_name, module_data in source_data['modules'].items():
+
+            yield '', module_name, module_data
+
+
+def find_qualified_declaration(module_data: 'ModuleInfo | dict', qualified_name: str) -> bool:
+    """Check whether a module declares the dotted qualified name, e.g. 'Outer.method'"""
+
+    current_scope = as_module_info(module_data)
+
+    for scope_name in qualified_name.split('.'):
+
+        current_scope = next((declaration for signature, declaration in current_scope.iter_declarations()
+                              if declaration.scope_name == scope_name), None)
+
+        if current_scope is None:
+
+            return False
+
+    return True
+
+
+def build_entry_point_index(source_data: dict, entry_points: list, report_unmatched: bool = True) -> dict:
+    """Resolve entry points against the scanned modules once, before generation
+    Returns {'entries' : {(package, module, qualified name) : entry point}, 'unmatched' : [entry points]}
+    Module entry points use None as their qualified name. Unmatched entry points are logged as warnings
+    if report_unmatched is set"""
+
+    entry_index = {'entries' : {}, 'unmatched' : []}
+
+    if len(entry_points) == 0:
+
+        return entry_index
+
+    # Map every importable module path to the module it names
+
+    module_lookup = {}
+
+    package_modules = {}
+
+    for package, module_name, module_data in iter_project_modules(source_data):
+
+        if package == '':
+
+            module_lookup[module_name] = (package, module_name, module_data)
+
+            continue
+
+        package_modules.setdefault(package, {})[module_name] = module_data
+
+        module_path = package + '.' + module_name
+
+        # A package's own functions live in its __init__ module
+
+        if module_path.endswith('.__init__'):
+
+            module_path = module_path[:-len('.__init__')]
+
+        module_lookup[module_path] = (package, module_name, module_data)
+
+    for entry_point in entry_points:
+
+        module_path, qualified_name = parse_entry_point(entry_point)
+
+        entry_keys = []
+
+        if module_path in module_lookup:
+
+            package, module_name, module_data = module_lookup[module_path]
+
+            if qualified_name is None:
+
+                entry_keys.append((package, module_name, None))
+
+            elif find_qualified_declaration(module_data, qualified_name):
+
+                entry_keys.append((package, module_name, qualified_name))
+
+        # 'package:module' marks a whole module of a package as an entry point
+
+        if module_path in package_modules and qualified_name in package_modules[module_path]:
+
+            entry_keys.append((module_path, qualified_name, None))
+
+        if len(entry_keys) == 0:
+
+            entry_index['unmatched'].append(entry_point)
+
+            if report_unmatched:
+
+                logging.getLogger('GUM Dispenser').warning('Entry point ' + entry_point +
+                                                           ' does not match any scanned module or declaration')
+
+        for entry_key in entry_keys:
+
+            entry_index['entries'][entry_key] = entry_point
+
+    return entry_index
+
+
+def iter_marked_declarations(module_data: 'ModuleInfo | dict', entry_points: dict, current_package: str,
+                             current_module: str) -> 'Iterator[tuple]':
+    """Yield (nesting depth, signature, is entry point) for every declaration of a module, parents first
+    entry_points is an index from build_entry_point_index"""
+
+    # Walk iteratively so deeply nested declarations cannot exhaust the recursion limit
+
+    pending_declarations = [(0, signature, declaration, declaration.scope_name) for signature, declaration in
+                            reversed(list(as_module_info(module_data).iter_declarations()))]
+
+    while len(pending_declarations) > 0:
+
+        depth, signature, declaration, qualified_name = pending_declarations.pop()
+
+        yield depth, signature, (current_package, current_module, qualified_name) in entry_points['entries']
+
+        pending_declarations.extend((depth + 1, nested_signature, nested_declaration,
+                                     qualified_name + '.' + nested_declaration.scope_name)
+                                    for nested_signature, nested_declaration in
+                                    reversed(list(declaration.iter_declarations())))
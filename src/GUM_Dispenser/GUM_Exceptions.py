@@ -17,3 +17,11 @@ class SourceModuleNotFoundError(Exception):
 
 class UserConfirmedInvalidSetup(Exception):
     pass
+
+
+class SetupSizeLimitError(Exception):
+    pass
+
+
+class InvalidIRError(Exception):
+    pass
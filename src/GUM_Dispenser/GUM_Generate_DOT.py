@@ -0,0 +1,97 @@
+
+from html import escape
+
+from GUM_Dispenser.GUM_Scan_Model import as_module_info
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index, iter_project_modules, iter_marked_declarations
+
+from GUM_Dispenser.GUM_Reduce import iter_package_dependencies, edge_weight
+
+
+# Fill color for entry points, matching the NOMNOML entry style
+
+DOT_ENTRY_COLOR = '#88ff88'
+
+
+def dot_id(name: str) -> str:
+    """Quote a module, package or dependency name as a Graphviz node ID"""
+
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def iter_project_dot(source_data: dict, entry_points: list, render_options: dict = None) -> 'Iterator[str]':
+    """Convert our stored source dictionary data into Graphviz DOT one module at a time
+    Modules are nodes listing their declarations, packages are linked to their modules
+    and dependencies are dashed edges. Nodes share names with the NOMNOML output
+    entry_points may be the list from setup.py or an index from build_entry_point_index"""
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points)
+
+    yield 'digraph GUM {\n    node [shape=plaintext fontname="Helvetica"];\n\n'
+
+    for current_package, current_module, module_data in iter_project_modules(source_data):
+
+        yield generate_module_dot(module_data, entry_points, current_package, current_module, render_options)
+
+        if current_package != '':
+
+            yield '    ' + dot_id(current_package) + ' -> ' + dot_id(current_module) + ' [arrowhead=none];\n\n'
+
+        else:
+
+            yield '\n'
+
+    # External dependencies collapsed onto packages by GUM_Reduce
+
+    for current_package, dependency in iter_package_dependencies(source_data):
+
+        yield dot_dependency(current_package, dependency, render_options)
+
+    yield '}\n'
+
+
+def generate_module_dot(module_data: 'ModuleInfo | dict', entry_points: dict, current_package: str,
+                        current_module: str, render_options: dict = None) -> str:
+    """Generate a DOT node for a module with one table row per declaration, plus its dependency edges"""
+
+    module_info = as_module_info(module_data)
+
+    module_color = ''
+
+    if (current_package, current_module, None) in entry_points['entries']:
+
+        module_color = ' BGCOLOR="' + DOT_ENTRY_COLOR + '"'
+
+    module_pieces = ['    ' + dot_id(current_module) + ' [label=<<TABLE BORDER="0" CELLBORDER="1" CELLSPACING="0">',
+                     '<TR><TD' + module_color + '><B>' + escape(current_module) + '</B></TD></TR>']
+
+    for depth, declaration, is_entry in iter_marked_declarations(module_info, entry_points, current_package,
+                                                                 current_module):
+
+        module_pieces.append('<TR><TD ALIGN="LEFT"' + (' BGCOLOR="' + DOT_ENTRY_COLOR + '"' if is_entry else '') +
+                             '>' + '&nbsp;&nbsp;' * depth + escape(declaration) + '</TD></TR>')
+
+    module_pieces.append('</TABLE>>];\n')
+
+    for dependency in module_info.dependencies:
+
+        module_pieces.append(dot_dependency(current_module, dependency, render_options))
+
+    return ''.join(module_pieces)
+
+
+def dot_dependency(source_name: str, dependency: str, render_options: dict = None) -> str:
+    """Generate a dashed dependency edge, labeled with its weight when it stands for several merged edges"""
+
+    weight = edge_weight(render_options, source_name, dependency)
+
+    return '    ' + dot_id(source_name) + ' -> ' + dot_id(dependency) + ' [style=dashed' + \
+        (' label="' + str(weight) + '"' if weight > 1 else '') + '];\n'
+
+
+def generate_project_dot(source_data: dict, entry_points: list, render_options: dict = None) -> str:
+    """Convert our stored source dictionary data into Graphviz DOT"""
+
+    return ''.join(iter_project_dot(source_data, entry_points, render_options))
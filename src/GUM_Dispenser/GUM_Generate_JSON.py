@@ -0,0 +1,70 @@
+
+import json
+
+from GUM_Dispenser.GUM_Scan_Model import as_module_dict
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index
+
+
+def iter_project_json(source_data: dict, entry_points: list, render_options: dict = None) -> 'Iterator[str]':
+    """Convert our stored source dictionary data into a JSON document one module at a time
+    The document holds the resolved entry points and the scanned packages or modules in their
+    legacy dictionary form, with one module per line
+    entry_points may be the list from setup.py or an index from build_entry_point_index"""
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points)
+
+    matched_entries = [{'package' : package, 'module' : module_name, 'qualified_name' : qualified_name,
+                        'entry_point' : entry_point}
+                       for (package, module_name, qualified_name), entry_point in entry_points['entries'].items()]
+
+    yield '{"entry_points": ' + json.dumps({'matched' : matched_entries, 'unmatched' : entry_points['unmatched']})
+
+    if 'packages' in source_data:
+
+        yield ',\n "packages": {'
+
+        for package_index, (package, package_data) in enumerate(source_data['packages'].items()):
+
+            yield (',' if package_index > 0 else '') + '\n  ' + json.dumps(package) + ': {"modules": {'
+
+            yield from iter_modules_json(package_data['modules'], '   ')
+
+            # External dependencies collapsed onto the package by GUM_Reduce
+
+            if 'dependencies' in package_data:
+
+                yield '}, "dependencies": ' + json.dumps(package_data['dependencies']) + '}'
+
+            else:
+
+                yield '}}'
+
+        yield '}'
+
+    else:
+
+        yield ',\n "modules": {'
+
+        yield from iter_modules_json(source_data['modules'], '  ')
+
+        yield '}'
+
+    yield '}\n'
+
+
+def iter_modules_json(modules_data: dict, indent: str) -> 'Iterator[str]':
+    """Yield the members of a JSON object mapping module names to their scan results"""
+
+    for module_index, (module_name, module_data) in enumerate(modules_data.items()):
+
+        yield (',' if module_index > 0 else '') + '\n' + indent + json.dumps(module_name) + ': ' + \
+            json.dumps(as_module_dict(module_data))
+
+
+def generate_project_json(source_data: dict, entry_points: list, render_options: dict = None) -> str:
+    """Convert our stored source dictionary data into a JSON document"""
+
+    return ''.join(iter_project_json(source_data, entry_points, render_options))
@@ -3,13 +3,55 @@ import re
 
 import logging
 
+from functools import lru_cache
 
-def generate_project_nomnoml(source_data: dict, entry_points: list) -> str:
-    """Convert our stored source dictionary data into NOMNOML"""
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo, as_module_info
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index
+
+from GUM_Dispenser.GUM_Reduce import edge_weight
+
+from GUM_Dispenser.GUM_Defaults import DEFAULT_WRAP_WIDTH, DEFAULT_BREAK_WIDTH
+
+
+# Class directive that colors entry points, written once at the top of every diagram
+
+ENTRY_STYLE_DIRECTIVE = '#.entry: fill=#8f8\n'
+
+# Class directive for modules in an import cycle, written when render_options has cycle_modules
+
+CYCLE_STYLE_DIRECTIVE = '#.cycle: fill=#f88\n'
+
+
+@lru_cache(maxsize=None)
+def declaration_word_pattern() -> 're.Pattern':
+    """Match the words of a declaration block, which we do not want to break before. Compiled on first use
+    A 'word' in this case may include a trailing colon. Also catch separators and function annotations with ->"""
+
+    return re.compile(r"""(\|)|(\[[^\s|]+)|([\w:'",]+[\])]*\s*->)|([\w:'",]+[\])]*)""", re.MULTILINE)
+
+
+def iter_project_nomnoml(source_data: dict, entry_points: list, render_options: dict = None) -> 'Iterator[str]':
+    """Convert our stored source dictionary data into NOMNOML one module at a time
+    Only one module's markup is held in memory, so output can be written as it is produced
+    render_options may hold wrap_width and break_width for declaration blocks, cycle_modules,
+    a set of (package, module) keys from GUM_Import_Graph.cycle_module_keys to color, and edge_weights
+    from GUM_Reduce.reduce_project to label merged edges with
+    entry_points may be the list from setup.py or an index from build_entry_point_index"""
+
+    # Resolve entry points once so every lookup while generating is a single hash
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points)
 
     # Make an object class to color our entry points in NOMNOML
 
-    pkg_nomnoml = '#.entry: fill=#8f8\n'
+    yield ENTRY_STYLE_DIRECTIVE
+
+    if render_options is not None and render_options.get('cycle_modules'):
+
+        yield CYCLE_STYLE_DIRECTIVE
 
     # Handle if our code is organized with packages
 
@@ -24,13 +66,21 @@ def generate_project_nomnoml(source_data: dict, entry_points: list) -> str:
             for module_name in package_data['modules']:
 
                 # Generate NOMNOML from inside the module files to have entry points declared before references
+                # Then display the relationship between modules and packages
+
+                yield generate_module_nomnoml(package_data['modules'][module_name], entry_points, package,
+                                              module_name, render_options) + \
+                    '[' + package + ']-[' + module_name + ']\n\n'
+
+            # External dependencies collapsed onto the package by GUM_Reduce
 
-                pkg_nomnoml = pkg_nomnoml + generate_module_nomnoml(package_data['modules'][module_name],
-                                                                    entry_points, package, module_name)
+            for dependency in package_data.get('dependencies', []):
 
-                # Display the relationship between modules and packages
+                yield nomnoml_dependency(package, dependency, render_options)
 
-                pkg_nomnoml = pkg_nomnoml + '[' + package + ']-[' + module_name + ']\n\n'
+            if 'dependencies' in package_data:
+
+                yield '\n'
 
 
     # Handle if we only have individual modules
@@ -39,201 +89,260 @@ def generate_project_nomnoml(source_data: dict, entry_points: list) -> str:
 
         for module_name in source_data['modules']:
 
-            pkg_nomnoml = pkg_nomnoml + generate_module_nomnoml(source_data['modules'][module_name],
-                                                                entry_points, '', module_name) + '\n'
+            yield generate_module_nomnoml(source_data['modules'][module_name], entry_points, '', module_name,
+                                          render_options) + '\n'
+
+
+def generate_project_nomnoml(source_data: dict, entry_points: list, render_options: dict = None) -> str:
+    """Convert our stored source dictionary data into NOMNOML"""
+
+    return ''.join(iter_project_nomnoml(source_data, entry_points, render_options))
+
+
+def write_project_nomnoml(source_data: dict, entry_points: list, output_stream: 'TextIO',
+                          render_options: dict = None) -> int:
+    """Stream NOMNOML for our stored source dictionary data to a writable text stream
+    Returns the number of characters written"""
+
+    # GUM_Render imports this module to register NOMNOML, so it is imported here instead of at the top
+
+    from GUM_Dispenser.GUM_Render import write_rendered
+
+    return write_rendered(output_stream, iter_project_nomnoml(source_data, entry_points, render_options))
+
+
+def module_entry_index(module_data: 'ModuleInfo | dict', entry_points: list, current_package: str,
+                       current_module: str) -> dict:
+    """Resolve a list of entry points against a single module, as build_entry_point_index does for a project"""
+
+    if current_package != '':
+
+        module_source = {'packages' : {current_package : {'modules' : {current_module : module_data}}}}
 
+    else:
 
+        module_source = {'modules' : {current_module : module_data}}
 
-    return pkg_nomnoml
+    return build_entry_point_index(module_source, entry_points, report_unmatched=False)
 
 
-def generate_module_nomnoml(module_data: dict, entry_points: list, current_package: str, current_module: str) -> str:
+def generate_module_nomnoml(module_data: 'ModuleInfo | dict', entry_points: list, current_package: str,
+                            current_module: str, render_options: dict = None) -> str:
     """Generate NOMNOML for a Python module
        Color entry points
-       Show inter-module and external package dependencies"""
+       Show inter-module and external package dependencies
+       module_data may be a ModuleInfo record or the legacy dictionary form"""
+
+    if render_options is None:
+
+        render_options = {}
+
+    # Entry points given as a list are only resolved against this module
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = module_entry_index(module_data, entry_points, current_package, current_module)
+
+    entry_index = entry_points['entries']
+
+    module_info = as_module_info(module_data)
 
-    module_nomnoml = ''
+    # Collect pieces and join once so the cost stays linear in the size of the module
+
+    module_pieces = []
 
     # Catch if our module itself is an entry point i.e. meant to be run as a script
 
-    if (current_package == '' and current_module in entry_points) or \
-            current_package + ':' + current_module in entry_points:
+    if (current_package, current_module, None) in entry_index:
+
+        module_pieces.append('[<entry>' + current_module)
+
+    # Modules in an import cycle are colored unless they are entry points
 
-        module_nomnoml = module_nomnoml + '[<entry>' + current_module
+    elif (current_package, current_module) in render_options.get('cycle_modules', ()):
+
+        module_pieces.append('[<cycle>' + current_module)
 
     # Begin non-colored block
 
     else:
 
-        module_nomnoml = module_nomnoml + '[' + current_module
+        module_pieces.append('[' + current_module)
 
     # Always process declarations first to ensure entry points are colored before their blocks are referenced
 
-    if len(module_data['declarations']) > 0:
+    if module_info.declarations:
 
-        for declaration in module_data['declarations']:
+        for declaration, declaration_data in module_info.iter_declarations():
 
             # Generate NOMNOML for this declaration using the | separator in NOMNOML
 
-            module_nomnoml = module_nomnoml + '|' + process_declaration(module_data['declarations'][declaration],
-                                                                        declaration, entry_points,
-                                                                        current_package, current_module, '')
+            module_pieces.append('|')
+
+            module_pieces.append(process_declaration(declaration_data, declaration,
+                                                     entry_points, current_package, current_module, '',
+                                                     declaration_data.scope_name))
 
         # Close our module declaration block
 
-        module_nomnoml = module_nomnoml + ']\n'
+        module_pieces.append(']\n')
 
         # Make our blocks a consistent size for visual clarity
 
-        module_nomnoml = beautify_declaration_markup(module_nomnoml)
+        module_pieces = [beautify_declaration_markup(''.join(module_pieces),
+                                                     render_options.get('wrap_width', DEFAULT_WRAP_WIDTH),
+                                                     render_options.get('break_width', DEFAULT_BREAK_WIDTH))]
 
-        # Use the --> NOMNOML dependency connector to show a dependency for the current module
+    # If we don't have any function or class declarations in this module
+    else:
 
-        for dependency in module_data['dependencies']:
+        module_pieces.append(']\n')
 
-            module_nomnoml = module_nomnoml + '[' + current_module + ']-->[' + dependency + ']\n'
+    # Use the --> NOMNOML dependency connector to show a dependency for the current module
 
+    for dependency in module_info.dependencies:
 
-    # If we don't have any function or class declarations in this module
-    else:
+        module_pieces.append(nomnoml_dependency(current_module, dependency, render_options))
 
-        # Process all of our dependencies using the --> separator
+    return ''.join(module_pieces)
 
-        module_nomnoml = module_nomnoml + ']\n'
 
-        for index, dependency in enumerate(module_data['dependencies']):
+def nomnoml_dependency(source_name: str, dependency: str, render_options: dict = None) -> str:
+    """Generate a --> dependency connector, labeled with its weight when it stands for several merged edges"""
 
-            module_nomnoml = module_nomnoml + '[' + current_module + ']-->[' + dependency + ']\n'
+    weight = edge_weight(render_options, source_name, dependency)
 
-    return module_nomnoml
+    return '[' + source_name + ']-->' + (str(weight) if weight > 1 else '') + '[' + dependency + ']\n'
 
 
-def process_declaration(declaration_data: dict, declaration: str, entry_points: list, current_package: str,
+def process_declaration(declaration_data: 'Declaration | dict', declaration: str, entry_points: 'list | dict',
+                        current_package: str,
                         # Test
-                        current_module: str, declaration_nomnoml: str) -> str:
+                        current_module: str, declaration_nomnoml: str, qualified_name: str = None) -> str:
     """Generate NOMNOML for the current object's declaration
-       Make a recursive call if we encounter a nested declaration inside of the original scope"""
+       Make a recursive call if we encounter a nested declaration inside of the original scope
+       declaration_data may be a Declaration record or the legacy dictionary form
+       entry_points is an index from build_entry_point_index or a list of entry points, which are resolved
+       as if the declaration were declared at the top of its module
+       qualified_name is the dotted path of scope names leading to this declaration. Default is its own scope name"""
 
-    logging.getLogger('GUM Dispenser').debug('Processing declaration data: ' + str(declaration_data))
+    if isinstance(declaration_data, dict):
 
-    # Read in the name of our scope and check if it is an entry point
+        declaration_data = as_module_info({'declarations' : {declaration : declaration_data},
+                                           'dependencies' : []}).get_declaration(declaration)
 
-    scope_name = declaration_data['current_scope_name']
+    if not isinstance(entry_points, dict):
 
-    # Entry point checking for packaged code
+        declaration_module = ModuleInfo()
 
-    if current_package != '':
+        declaration_module.declarations = {declaration : declaration_data}
 
-        if current_package + '.' + current_module + ':' + scope_name in entry_points:
+        entry_points = module_entry_index(declaration_module, entry_points, current_package, current_module)
 
-            declaration_nomnoml = declaration_nomnoml + '[<entry>' + declaration + '|'
+    if qualified_name is None:
 
-        else:
+        qualified_name = declaration_data.scope_name
 
-            declaration_nomnoml = declaration_nomnoml + '[' + declaration + '|'
+    # Printing nested data is expensive, so skip it unless debug messages are shown
 
-    # Entry point checking for unpackaged code
-    else:
+    debug_enabled = logging.getLogger('GUM Dispenser').isEnabledFor(logging.DEBUG)
 
-        if current_module + ':' + scope_name in entry_points:
+    if debug_enabled:
 
-            declaration_nomnoml = declaration_nomnoml + '[<entry>' + declaration + '|'
+        logging.getLogger('GUM Dispenser').debug('Processing declaration data: ' + str(declaration_data))
 
-        else:
+    # Check if our qualified name is an entry point
 
-            declaration_nomnoml = declaration_nomnoml + '[' + declaration + '|'
+    declaration_pieces = [declaration_nomnoml]
 
-    # Search for and handle any nested declarations
-    for key, value in declaration_data.items():
+    if (current_package, current_module, qualified_name) in entry_points['entries']:
 
-        if type(value) == dict:
+        declaration_pieces.append('[<entry>' + declaration)
 
-            logging.getLogger('GUM Dispenser').debug('Found nested declaration: ' + key)
-
-            declaration_nomnoml = declaration_nomnoml + '['
+    else:
 
-            declaration_nomnoml = declaration_nomnoml + process_declaration(value, key, entry_points,
-                                                                            current_package, current_module, '') + '|'
+        declaration_pieces.append('[' + declaration)
 
-    # Remove trailing separator characters
-    if declaration_nomnoml[-1] == '|':
+    # Search for and handle any nested declarations, each behind a | separator
+    for key, value in declaration_data.iter_declarations():
 
-        declaration_nomnoml = declaration_nomnoml[:-1]
+        if debug_enabled:
 
-    # Close our declaration
-    return declaration_nomnoml + ']'
+            logging.getLogger('GUM Dispenser').debug('Found nested declaration: ' + key)
 
+        declaration_pieces.append('|[')
 
-def beautify_declaration_markup(markup : str) -> str:
-    """Format our function and class declarations in NOMNOML to be a consistent size"""
+        declaration_pieces.append(process_declaration(value, key, entry_points, current_package,
+                                                      current_module, '', qualified_name + '.' + value.scope_name))
 
-    # We do not want to break before separators or before the end of a word
-    # A 'word' in this case may include a trailing colon
-    # Also catch function annotations with ->
+    # Close our declaration
+    declaration_pieces.append(']')
 
-    logging.getLogger('GUM Dispenser').debug('Beginning to beautify: ' + markup)
+    return ''.join(declaration_pieces)
 
-    pattern = re.compile(r"""(\|)|(\[[^\s|]+)|([\w:'",]+[\])]*\s*->)|([\w:'",]+[\])]*)""", re.MULTILINE)
 
-    # Track how many characters we have read after last \n was inserted
-    characters_read_in_current_line = 0
+def beautify_declaration_markup(markup : str, wrap_width: int = DEFAULT_WRAP_WIDTH,
+                                break_width: int = DEFAULT_BREAK_WIDTH) -> str:
+    """Format our function and class declarations in NOMNOML to be a consistent size
+    Lines are broken after wrap_width characters, or after break_width characters at the end of a declaration"""
 
-    # Track how many \n characters we have added
-    new_lines_added = 0
+    debug_enabled = logging.getLogger('GUM Dispenser').isEnabledFor(logging.DEBUG)
 
-    for match in re.finditer(pattern, markup):
+    if debug_enabled:
 
-        # Ignore empty string matches
+        logging.getLogger('GUM Dispenser').debug('Beginning to beautify: ' + markup)
 
-        if match.group() != '':
+    # Collect slices of the original markup with line breaks between them and join once at the end
 
-            # Get how long the current match string is
+    markup_pieces = []
 
-            current_match_bounds = match.span()
+    # Track where the next unwritten slice of markup begins
 
-            # Break if we have read 60 or more characters and we are not at a separator
+    piece_start = 0
 
-            if characters_read_in_current_line > 59 and match.group() != '|':
+    # Track how many characters we have read after last \n was inserted
+    characters_read_in_current_line = 0
 
-                logging.getLogger('GUM Dispenser').debug('Inserting new line after ' + match.group())
+    for match in declaration_word_pattern().finditer(markup):
 
-                markup = markup[:current_match_bounds[1] + new_lines_added] + '\n' + \
-                              markup[current_match_bounds[1] + new_lines_added:]
+        match_text = match.group()
 
-                # Reset our read characters
+        # Ignore empty string matches
 
-                characters_read_in_current_line = 0
+        if match_text == '':
 
-                # Store that we have added a new line
+            continue
 
-                new_lines_added += 1
+        match_start, match_end = match.span()
 
+        # Break if we have read a full line and we are not at a separator
+        # If we have finished a declaration and are most of the way to a full line
+        # Begin the next declaration on a new line
 
-            else:
+        if (characters_read_in_current_line >= wrap_width and match_text != '|') or \
+                (match_text == '|' and characters_read_in_current_line >= break_width):
 
-                # If we have finished a declaration and are more than two thirds of the way to 60 characters
-                # Begin the next declaration on a new line
+            if debug_enabled:
 
-                if match.group() == '|' and characters_read_in_current_line > 39:
+                logging.getLogger('GUM Dispenser').debug('Inserting new line after ' + match_text)
 
-                    logging.getLogger('GUM Dispenser').debug('Inserting new line after ' + match.group())
+            markup_pieces.append(markup[piece_start:match_end])
 
-                    markup = markup[:current_match_bounds[1] + new_lines_added] + '\n' + \
-                             markup[current_match_bounds[1] + new_lines_added:]
+            markup_pieces.append('\n')
 
-                    # Reset our read characters
+            piece_start = match_end
 
-                    characters_read_in_current_line = 0
+            # Reset our read characters
 
-                    # Store that we have added a new line
+            characters_read_in_current_line = 0
 
-                    new_lines_added += 1
+        else:
 
-                else:
+            # We have not reached either width yet
+            # Track our progress in reading the string
 
-                    # We have not reached 60 characters or 40 characters and the end of a declaration
-                    # Track our progress in reading the string
+            characters_read_in_current_line += match_end - match_start
 
-                    characters_read_in_current_line += (current_match_bounds[1] - current_match_bounds[0])
+    markup_pieces.append(markup[piece_start:])
 
-    return markup
+    return ''.join(markup_pieces)
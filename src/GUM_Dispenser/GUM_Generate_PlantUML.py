@@ -0,0 +1,104 @@
+
+from GUM_Dispenser.GUM_Scan_Model import as_module_info
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index, iter_project_modules, iter_marked_declarations
+
+from GUM_Dispenser.GUM_Reduce import iter_package_dependencies, edge_weight
+
+
+# Fill color for entry points, matching the NOMNOML entry style
+
+PLANTUML_ENTRY_COLOR = '#88ff88'
+
+# PlantUML strips leading spaces from class members, so nested declarations are indented with no-break spaces
+
+PLANTUML_INDENT = '\u00a0\u00a0'
+
+
+def plantuml_name(name: str) -> str:
+    """Quote a module, package or dependency name for PlantUML"""
+
+    return '"' + name.replace('"', "'") + '"'
+
+
+def iter_project_plantuml(source_data: dict, entry_points: list, render_options: dict = None) -> 'Iterator[str]':
+    """Convert our stored source dictionary data into PlantUML one module at a time
+    Modules are classes listing their declarations, packages are linked to their modules
+    and dependencies are dotted arrows. Names match the NOMNOML output
+    entry_points may be the list from setup.py or an index from build_entry_point_index"""
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points)
+
+    # Dotted module names are kept whole instead of being split into namespaces
+
+    yield '@startuml\nset namespaceSeparator none\nhide empty members\n' + \
+        'skinparam class {\n    BackgroundColor<<entry>> ' + PLANTUML_ENTRY_COLOR + '\n}\n\n'
+
+    for current_package, current_module, module_data in iter_project_modules(source_data):
+
+        yield generate_module_plantuml(module_data, entry_points, current_package, current_module, render_options)
+
+        if current_package != '':
+
+            yield plantuml_name(current_package) + ' -- ' + plantuml_name(current_module) + '\n\n'
+
+        else:
+
+            yield '\n'
+
+    # External dependencies collapsed onto packages by GUM_Reduce
+
+    for current_package, dependency in iter_package_dependencies(source_data):
+
+        yield plantuml_dependency(current_package, dependency, render_options)
+
+    yield '@enduml\n'
+
+
+def generate_module_plantuml(module_data: 'ModuleInfo | dict', entry_points: dict, current_package: str,
+                             current_module: str, render_options: dict = None) -> str:
+    """Generate a PlantUML class for a module with one member per declaration, plus its dependency arrows"""
+
+    module_info = as_module_info(module_data)
+
+    module_stereotype = ''
+
+    if (current_package, current_module, None) in entry_points['entries']:
+
+        module_stereotype = ' <<entry>>'
+
+    module_pieces = ['class ' + plantuml_name(current_module) + module_stereotype + ' {\n']
+
+    for depth, declaration, is_entry in iter_marked_declarations(module_info, entry_points, current_package,
+                                                                 current_module):
+
+        if is_entry:
+
+            declaration = '<back:' + PLANTUML_ENTRY_COLOR + '>' + declaration + '</back>'
+
+        module_pieces.append('    ' + PLANTUML_INDENT * depth + declaration + '\n')
+
+    module_pieces.append('}\n')
+
+    for dependency in module_info.dependencies:
+
+        module_pieces.append(plantuml_dependency(current_module, dependency, render_options))
+
+    return ''.join(module_pieces)
+
+
+def plantuml_dependency(source_name: str, dependency: str, render_options: dict = None) -> str:
+    """Generate a dotted dependency arrow, labeled with its weight when it stands for several merged edges"""
+
+    weight = edge_weight(render_options, source_name, dependency)
+
+    return plantuml_name(source_name) + ' ..> ' + plantuml_name(dependency) + \
+        (' : ' + str(weight) if weight > 1 else '') + '\n'
+
+
+def generate_project_plantuml(source_data: dict, entry_points: list, render_options: dict = None) -> str:
+    """Convert our stored source dictionary data into PlantUML"""
+
+    return ''.join(iter_project_plantuml(source_data, entry_points, render_options))
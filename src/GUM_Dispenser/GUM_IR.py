@@ -0,0 +1,167 @@
+
+import json
+
+import zlib
+
+from GUM_Dispenser.GUM_Exceptions import InvalidIRError
+
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo, as_module_info
+
+from GUM_Dispenser.GUM_Defaults import IR_ENCODINGS
+
+
+# Intermediate representation (IR) of a scanned project, so scanning and rendering can run on different hosts
+# Bump whenever the IR changes shape. Files from other versions are refused instead of misread
+
+IR_FORMAT_VERSION = 1
+
+# Binary IR is this header followed by zlib compressed JSON. JSON IR always starts with '{'
+
+IR_BINARY_MAGIC = b'GUMIR\x00'
+
+
+def encode_module_ir(module_data: 'ModuleInfo | dict') -> list:
+    """Encode a module's scan results as [dependencies, declarations]
+    Each declaration is [signature, scope name, nested declarations...]"""
+
+    module_info = as_module_info(module_data)
+
+    return [list(module_info.dependencies), [encode_declaration_ir(signature, declaration) for signature, declaration
+                                             in module_info.iter_declarations()]]
+
+
+def encode_declaration_ir(signature: str, declaration: 'Declaration') -> list:
+    """Encode a declaration and the declarations nested inside it"""
+
+    return [signature, declaration.scope_name] + [encode_declaration_ir(nested_signature, nested_declaration)
+                                                  for nested_signature, nested_declaration in
+                                                  declaration.iter_declarations()]
+
+
+def decode_module_ir(module_ir: list) -> 'ModuleInfo':
+    """Rebuild scan records from the form written by encode_module_ir"""
+
+    module_info = ModuleInfo()
+
+    dependencies, declarations = module_ir
+
+    for dependency in dependencies:
+
+        module_info.add_dependency(dependency)
+
+    # Walk iteratively so deeply nested declarations cannot exhaust the recursion limit
+
+    pending_scopes = [(module_info, declarations)]
+
+    while len(pending_scopes) > 0:
+
+        current_scope, scope_ir = pending_scopes.pop()
+
+        for declaration_ir in scope_ir:
+
+            declaration = current_scope.add_declaration(declaration_ir[0], declaration_ir[1])
+
+            if len(declaration_ir) > 2:
+
+                pending_scopes.append((declaration, declaration_ir[2:]))
+
+    return module_info
+
+
+def build_ir(source_data: dict, entry_points: list) -> dict:
+    """Build the IR for a described project and the entry points from its setup.py"""
+
+    project_ir = {'version' : IR_FORMAT_VERSION, 'entry_points' : list(entry_points)}
+
+    if 'packages' in source_data:
+
+        project_ir['packages'] = {package : {module_name : encode_module_ir(module_data) for module_name, module_data
+                                             in package_data['modules'].items()}
+                                  for package, package_data in source_data['packages'].items()}
+
+    else:
+
+        project_ir['modules'] = {module_name : encode_module_ir(module_data) for module_name, module_data in
+                                 source_data['modules'].items()}
+
+    return project_ir
+
+
+def restore_ir(project_ir: dict) -> tuple:
+    """Turn IR back into (source data, entry points) ready for any renderer"""
+
+    if not isinstance(project_ir, dict) or project_ir.get('version') != IR_FORMAT_VERSION:
+
+        raise InvalidIRError('Expected IR version ' + str(IR_FORMAT_VERSION) + ', found ' +
+                             str(project_ir.get('version') if isinstance(project_ir, dict) else None))
+
+    try:
+
+        if 'packages' in project_ir:
+
+            source_data = {'packages' : {package : {'modules' : {module_name : decode_module_ir(module_ir)
+                                                                 for module_name, module_ir in package_ir.items()}}
+                                         for package, package_ir in project_ir['packages'].items()}}
+
+        else:
+
+            source_data = {'modules' : {module_name : decode_module_ir(module_ir) for module_name, module_ir in
+                                        project_ir['modules'].items()}}
+
+        return source_data, list(project_ir['entry_points'])
+
+    except (KeyError, TypeError, ValueError, IndexError) as err:
+
+        raise InvalidIRError('Malformed IR: ' + repr(err))
+
+
+def dump_ir(source_data: dict, entry_points: list, encoding: str = 'json') -> bytes:
+    """Serialize a described project to IR bytes in the given encoding"""
+
+    if encoding not in IR_ENCODINGS:
+
+        raise ValueError('Unknown IR encoding ' + encoding + '. Choose from ' + ', '.join(IR_ENCODINGS))
+
+    payload = json.dumps(build_ir(source_data, entry_points), separators=(',', ':')).encode('utf-8')
+
+    if encoding == 'binary':
+
+        return IR_BINARY_MAGIC + zlib.compress(payload, 9)
+
+    return payload
+
+
+def load_ir(ir_bytes: bytes) -> tuple:
+    """Read IR bytes in either encoding and return (source data, entry points)"""
+
+    try:
+
+        if ir_bytes.startswith(IR_BINARY_MAGIC):
+
+            ir_bytes = zlib.decompress(ir_bytes[len(IR_BINARY_MAGIC):])
+
+        project_ir = json.loads(ir_bytes.decode('utf-8'))
+
+    except (zlib.error, UnicodeDecodeError, ValueError) as err:
+
+        raise InvalidIRError('Unreadable IR: ' + str(err))
+
+    return restore_ir(project_ir)
+
+
+def write_ir(ir_path: str, source_data: dict, entry_points: list, encoding: str = 'json') -> int:
+    """Write a described project to an IR file. Returns the number of bytes written"""
+
+    ir_bytes = dump_ir(source_data, entry_points, encoding)
+
+    with open(ir_path, 'wb') as ir_file:
+
+        return ir_file.write(ir_bytes)
+
+
+def read_ir(ir_path: str) -> tuple:
+    """Read an IR file written by write_ir and return (source data, entry points)"""
+
+    with open(ir_path, 'rb') as ir_file:
+
+        return load_ir(ir_file.read())
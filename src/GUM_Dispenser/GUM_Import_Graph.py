@@ -0,0 +1,306 @@
+
+from GUM_Dispenser.GUM_Scan_Model import as_module_info
+
+from GUM_Dispenser.GUM_Entry_Points import iter_project_modules
+
+
+# Number of modules listed in each ranking of the import report
+
+DEFAULT_REPORT_SIZE = 10
+
+
+def build_import_graph(source_data: dict) -> dict:
+    """Build an indexed adjacency structure from the dependencies of every scanned module
+    Returns {'nodes' : [names], 'index' : {name : node}, 'modules' : [(package, module) or None],
+    'edges' : [[nodes imported]]}. Nodes are numbered, scanned modules first and then external dependencies
+    Scanned modules are named package.module, and a dependency naming a module of the importing package,
+    or failing that of any package, is linked to that module"""
+
+    import_graph = {'nodes' : [], 'index' : {}, 'modules' : [], 'edges' : []}
+
+    # Modules by their own name, both within each package and across the project
+
+    package_lookup = {}
+
+    module_lookup = {}
+
+    scanned_modules = []
+
+    for current_package, current_module, module_data in iter_project_modules(source_data):
+
+        node = add_graph_node(import_graph, current_package + '.' + current_module if current_package != ''
+                              else current_module, (current_package, current_module))
+
+        package_lookup.setdefault(current_package, {})[current_module] = node
+
+        module_lookup.setdefault(current_module, node)
+
+        scanned_modules.append((current_package, node, module_data))
+
+    for current_package, node, module_data in scanned_modules:
+
+        imported_nodes = {}
+
+        for dependency in as_module_info(module_data).dependencies:
+
+            imported_node = package_lookup[current_package].get(dependency, module_lookup.get(dependency))
+
+            if imported_node is None:
+
+                imported_node = import_graph['index'].get(dependency)
+
+                if imported_node is None:
+
+                    imported_node = add_graph_node(import_graph, dependency, None)
+
+            # Dictionaries keep the first import order and drop repeated edges
+
+            imported_nodes[imported_node] = None
+
+        import_graph['edges'][node] = list(imported_nodes)
+
+    return import_graph
+
+
+def add_graph_node(import_graph: dict, node_name: str, module_key: tuple) -> int:
+    """Add a node with no edges and return its number"""
+
+    node = len(import_graph['nodes'])
+
+    import_graph['nodes'].append(node_name)
+
+    import_graph['index'][node_name] = node
+
+    import_graph['modules'].append(module_key)
+
+    import_graph['edges'].append([])
+
+    return node
+
+
+def reverse_import_graph(import_graph: dict) -> list:
+    """Get the importers of every node, i.e. the edges reversed"""
+
+    importers = [[] for node_name in import_graph['nodes']]
+
+    for node, imported_nodes in enumerate(import_graph['edges']):
+
+        for imported_node in imported_nodes:
+
+            importers[imported_node].append(node)
+
+    return importers
+
+
+def strongly_connected_components(import_graph: dict) -> list:
+    """Find strongly connected components with Tarjan's algorithm in linear time
+    Returns lists of node numbers. Components come out in reverse topological order, so every
+    component is listed after the components it imports
+    The walk keeps its own stack, so long import chains cannot exhaust the recursion limit"""
+
+    edges = import_graph['edges']
+
+    node_count = len(edges)
+
+    visit_order = [None] * node_count
+
+    low_link = [0] * node_count
+
+    on_stack = [False] * node_count
+
+    component_stack = []
+
+    components = []
+
+    next_order = 0
+
+    for root_node in range(node_count):
+
+        if visit_order[root_node] is not None:
+
+            continue
+
+        # Each frame is (node, position of the next edge to follow)
+
+        walk_stack = [(root_node, 0)]
+
+        visit_order[root_node] = low_link[root_node] = next_order
+
+        next_order += 1
+
+        component_stack.append(root_node)
+
+        on_stack[root_node] = True
+
+        while len(walk_stack) > 0:
+
+            node, edge_position = walk_stack[-1]
+
+            if edge_position < len(edges[node]):
+
+                walk_stack[-1] = (node, edge_position + 1)
+
+                imported_node = edges[node][edge_position]
+
+                if visit_order[imported_node] is None:
+
+                    visit_order[imported_node] = low_link[imported_node] = next_order
+
+                    next_order += 1
+
+                    component_stack.append(imported_node)
+
+                    on_stack[imported_node] = True
+
+                    walk_stack.append((imported_node, 0))
+
+                elif on_stack[imported_node]:
+
+                    low_link[node] = min(low_link[node], visit_order[imported_node])
+
+                continue
+
+            # Every edge of this node has been followed
+
+            walk_stack.pop()
+
+            if len(walk_stack) > 0:
+
+                parent_node = walk_stack[-1][0]
+
+                low_link[parent_node] = min(low_link[parent_node], low_link[node])
+
+            if low_link[node] == visit_order[node]:
+
+                component = []
+
+                while True:
+
+                    member_node = component_stack.pop()
+
+                    on_stack[member_node] = False
+
+                    component.append(member_node)
+
+                    if member_node == node:
+
+                        break
+
+                components.append(sorted(component))
+
+    return components
+
+
+def find_import_cycles(import_graph: dict) -> list:
+    """Get the groups of modules that import each other, directly or through other modules
+    Returns lists of node names. A module importing itself is a cycle of one"""
+
+    return [[import_graph['nodes'][node] for node in component]
+            for component in strongly_connected_components(import_graph)
+            if len(component) > 1 or component[0] in import_graph['edges'][component[0]]]
+
+
+def transitive_dependents(import_graph: dict, node_name: str, importers: list = None) -> list:
+    """Get every node that imports node_name directly or through other modules, in linear time
+    importers may be given from reverse_import_graph to avoid reversing the graph for every query"""
+
+    if importers is None:
+
+        importers = reverse_import_graph(import_graph)
+
+    # A module only reaches itself, and so counts as its own dependent, when it is part of a cycle
+
+    seen_nodes = set()
+
+    pending_nodes = [import_graph['index'][node_name]]
+
+    while len(pending_nodes) > 0:
+
+        for importer_node in importers[pending_nodes.pop()]:
+
+            if importer_node not in seen_nodes:
+
+                seen_nodes.add(importer_node)
+
+                pending_nodes.append(importer_node)
+
+    return sorted(import_graph['nodes'][node] for node in seen_nodes)
+
+
+def rank_fan_in(import_graph: dict, importers: list = None) -> list:
+    """Get (node name, number of modules importing it) pairs, most imported first"""
+
+    if importers is None:
+
+        importers = reverse_import_graph(import_graph)
+
+    return rank_counts(import_graph, [len(importer_nodes) for importer_nodes in importers])
+
+
+def rank_fan_out(import_graph: dict) -> list:
+    """Get (node name, number of nodes it imports) pairs for scanned modules, most imports first"""
+
+    return rank_counts(import_graph, [len(imported_nodes) if import_graph['modules'][node] is not None else 0
+                                      for node, imported_nodes in enumerate(import_graph['edges'])])
+
+
+def rank_counts(import_graph: dict, node_counts: list) -> list:
+    """Pair node names with counts, largest first and ties in node order, leaving out zeros"""
+
+    ranked_nodes = sorted((node for node in range(len(node_counts)) if node_counts[node] > 0),
+                          key=lambda node: -node_counts[node])
+
+    return [(import_graph['nodes'][node], node_counts[node]) for node in ranked_nodes]
+
+
+def cycle_module_keys(import_graph: dict) -> set:
+    """Get the (package, module) keys of every scanned module that is part of an import cycle"""
+
+    return {import_graph['modules'][import_graph['index'][node_name]]
+            for import_cycle in find_import_cycles(import_graph) for node_name in import_cycle
+            if import_graph['modules'][import_graph['index'][node_name]] is not None}
+
+
+def format_import_report(import_graph: dict, report_size: int = DEFAULT_REPORT_SIZE) -> str:
+    """Format import cycles, the most imported and most importing modules, and the transitive
+    dependents of the most imported modules as a plain text report"""
+
+    importers = reverse_import_graph(import_graph)
+
+    module_count = sum(1 for module_key in import_graph['modules'] if module_key is not None)
+
+    report_lines = ['Import graph: ' + str(module_count) + ' modules, ' +
+                    str(len(import_graph['nodes']) - module_count) + ' external dependencies, ' +
+                    str(sum(len(imported_nodes) for imported_nodes in import_graph['edges'])) + ' imports']
+
+    import_cycles = find_import_cycles(import_graph)
+
+    report_lines.append('')
+
+    report_lines.append('Import cycles: ' + str(len(import_cycles)))
+
+    for import_cycle in import_cycles:
+
+        report_lines.append('  ' + ' <-> '.join(import_cycle))
+
+    fan_in = rank_fan_in(import_graph, importers)[:report_size]
+
+    report_lines.append('')
+
+    report_lines.append('Most imported (fan-in, transitive dependents):')
+
+    for node_name, importer_count in fan_in:
+
+        report_lines.append('  {:>5} {:>5}  {}'.format(importer_count,
+                                                      len(transitive_dependents(import_graph, node_name, importers)),
+                                                      node_name))
+
+    report_lines.append('')
+
+    report_lines.append('Most importing (fan-out):')
+
+    for node_name, import_count in rank_fan_out(import_graph)[:report_size]:
+
+        report_lines.append('  {:>5}  {}'.format(import_count, node_name))
+
+    return '\n'.join(report_lines)
@@ -0,0 +1,101 @@
+
+import os
+
+import logging
+
+from pathlib import Path
+
+from GUM_Dispenser.GUM_Batch import run_batch
+
+
+# Directories that never hold distributions of their own: version control, environments,
+# tool caches and build output
+
+MONOREPO_SKIPPED_DIRECTORIES = frozenset(['.git', '.hg', '.svn', '.tox', '.nox', '.eggs', '.mypy_cache',
+                                          '.pytest_cache', '__pycache__', 'node_modules', 'site-packages',
+                                          'venv', '.venv', 'build', 'dist'])
+
+# Every virtualenv has this file at its root, whatever the directory is called
+
+VIRTUALENV_MARKER = 'pyvenv.cfg'
+
+
+def is_skipped_directory(directory_entry: 'os.DirEntry') -> bool:
+    """Check whether a directory should be left out of the setup.py search"""
+
+    if directory_entry.name in MONOREPO_SKIPPED_DIRECTORIES or directory_entry.name.endswith('.egg-info'):
+
+        return True
+
+    return os.path.exists(os.path.join(directory_entry.path, VIRTUALENV_MARKER))
+
+
+def find_setup_directories(root_dir: str) -> list:
+    """Walk root_dir once and return every directory holding a setup.py, in sorted order
+    Symbolic links to directories are not followed, so a link back up the tree cannot loop"""
+
+    setup_directories = []
+
+    pending_directories = [str(Path(root_dir).resolve())]
+
+    while len(pending_directories) > 0:
+
+        current_directory = pending_directories.pop()
+
+        try:
+
+            with os.scandir(current_directory) as directory_entries:
+
+                for directory_entry in directory_entries:
+
+                    if directory_entry.is_dir(follow_symlinks=False):
+
+                        if not is_skipped_directory(directory_entry):
+
+                            pending_directories.append(directory_entry.path)
+
+                    elif directory_entry.name == 'setup.py' and directory_entry.is_file():
+
+                        setup_directories.append(current_directory)
+
+        # A directory removed during the walk or one we cannot read should not stop the rest of the walk
+
+        except OSError as err:
+
+            logging.getLogger('GUM Dispenser').warning('Skipping directory ' + current_directory + ': ' + str(err))
+
+    return sorted(setup_directories)
+
+
+def distribution_name(root_dir: str, setup_directory: str) -> str:
+    """Name a distribution after its path below the monorepo root, e.g. libs.core"""
+
+    relative_path = Path(setup_directory).relative_to(Path(root_dir).resolve())
+
+    if len(relative_path.parts) == 0:
+
+        return Path(setup_directory).name
+
+    return '.'.join(relative_path.parts)
+
+
+def run_monorepo(root_dir: str, output_dir: str = None, workers: int = 1, scan_options: dict = None,
+                 render_options: dict = None, setup_options: dict = None, output_stream: 'TextIO' = None) -> list:
+    """Describe every distribution with a setup.py under root_dir
+    Distributions are scanned together in one worker pool. With output_stream they are written to it as one
+    combined diagram, otherwise each is written to its own file in output_dir
+    Returns the batch result of every distribution, see run_batch"""
+
+    setup_directories = find_setup_directories(root_dir)
+
+    logging.getLogger('GUM Dispenser').info('Found ' + str(len(setup_directories)) + ' setup.py files under ' +
+                                            str(root_dir))
+
+    # Point straight at each setup.py so a distribution never picks up its parent's setup file
+
+    batch_projects = [{'path': setup_directory, 'setup_file': os.path.join(setup_directory, 'setup.py'),
+                       'name': distribution_name(root_dir, setup_directory)}
+                      for setup_directory in setup_directories]
+
+    return run_batch(batch_projects, output_dir, workers=workers, scan_options=scan_options,
+                     render_options=render_options, setup_options=setup_options, output_stream=output_stream)
@@ -0,0 +1,114 @@
+
+import time
+
+from contextlib import contextmanager
+
+
+# Phases of a run in the order they happen
+
+PROFILE_PHASES = ['setup', 'discovery', 'scanning', 'generation']
+
+
+def new_profile() -> dict:
+    """Make an empty profile to collect phase and module timings in"""
+
+    return {'phases': {}, 'modules': []}
+
+
+def record_phase(profile: dict, phase_name: str, seconds: float) -> None:
+    """Add time spent in a phase. Phases may be recorded more than once, e.g. once per package"""
+
+    profile['phases'][phase_name] = profile['phases'].get(phase_name, 0.0) + seconds
+
+
+@contextmanager
+def profile_phase(profile: dict, phase_name: str) -> 'Iterator[None]':
+    """Time the enclosed block as part of a phase. Does nothing if profile is None"""
+
+    if profile is None:
+
+        yield
+
+        return
+
+    start_time = time.perf_counter()
+
+    try:
+
+        yield
+
+    finally:
+
+        record_phase(profile, phase_name, time.perf_counter() - start_time)
+
+
+def record_module(profile: dict, current_package: str, current_module: str, byte_count: int, token_count: int,
+                  seconds: float, cached: bool = False) -> None:
+    """Record the size and scan time of one module
+    token_count is None when the module was not tokenized"""
+
+    profile['modules'].append({'package': current_package, 'module': current_module, 'bytes': byte_count,
+                               'tokens': token_count, 'seconds': seconds, 'cached': cached})
+
+
+def format_profile_report(profile: dict, slowest_count: int = 10) -> str:
+    """Format phase times, the slowest modules and scan throughput as a table"""
+
+    report_lines = ['GUM Dispenser profile', '', '{:<24}{:>12}'.format('Phase', 'Seconds')]
+
+    # Known phases first in run order, then anything else that was recorded
+
+    phase_names = [phase_name for phase_name in PROFILE_PHASES if phase_name in profile['phases']]
+
+    phase_names.extend(sorted(phase_name for phase_name in profile['phases'] if phase_name not in PROFILE_PHASES))
+
+    for phase_name in phase_names:
+
+        report_lines.append('{:<24}{:>12.4f}'.format(phase_name, profile['phases'][phase_name]))
+
+    report_lines.append('{:<24}{:>12.4f}'.format('total', sum(profile['phases'].values())))
+
+    module_records = profile['modules']
+
+    if len(module_records) > 0:
+
+        report_lines.extend(['', '{:<40}{:>12}{:>10}{:>12}'.format('Slowest modules', 'Bytes', 'Tokens', 'Seconds')])
+
+        for module_record in sorted(module_records, key=lambda record: record['seconds'], reverse=True)[:slowest_count]:
+
+            if module_record['package'] != 'None':
+
+                module_label = module_record['package'] + '.' + module_record['module']
+
+            else:
+
+                module_label = module_record['module']
+
+            if module_record['cached']:
+
+                module_label += ' (cached)'
+
+            report_lines.append('{:<40}{:>12}{:>10}{:>12.4f}'.format(
+                module_label, module_record['bytes'], '-' if module_record['tokens'] is None else module_record['tokens'],
+                module_record['seconds']))
+
+        # Throughput over the scanning phase, which is wall time even when workers scan in parallel
+
+        total_bytes = sum(module_record['bytes'] for module_record in module_records)
+
+        scan_seconds = profile['phases'].get('scanning', sum(module_record['seconds'] for module_record in
+                                                             module_records))
+
+        report_lines.append('')
+
+        if scan_seconds > 0:
+
+            report_lines.append('Scanned {} modules ({:.2f} MB) at {:.1f} files/s, {:.2f} MB/s'.format(
+                len(module_records), total_bytes / 1e6, len(module_records) / scan_seconds,
+                total_bytes / 1e6 / scan_seconds))
+
+        else:
+
+            report_lines.append('Scanned {} modules ({:.2f} MB)'.format(len(module_records), total_bytes / 1e6))
+
+    return '\n'.join(report_lines)
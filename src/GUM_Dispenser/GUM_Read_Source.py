@@ -0,0 +1,116 @@
+
+import hashlib
+
+import mmap
+
+import os
+
+from contextlib import contextmanager
+
+from io import BytesIO
+
+
+# Files at least this large are memory mapped instead of read into memory
+
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+# Streamed files are hashed in chunks of this many bytes
+
+DIGEST_CHUNK_BYTES = 1024 * 1024
+
+
+@contextmanager
+def open_source(source_path: str, mmap_threshold: int = MMAP_THRESHOLD_BYTES,
+                stream_threshold: int = None) -> 'Iterator[tuple]':
+    """Load a source file once as raw bytes and yield (source_buffer, source_stat)
+    Bytes are not decoded, so tokenize and ast can honor PEP 263 encoding cookies themselves
+    Files of mmap_threshold bytes or more are memory mapped. The map is closed when the block ends
+    Files of stream_threshold bytes or more are given as a binary stream instead, to be read a line at a time"""
+
+    source_fd = os.open(source_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+
+    try:
+
+        # Stat the open file so size and modification time match the bytes we read
+
+        source_stat = os.fstat(source_fd)
+
+        # Memory use stays the same however large the file is, since only one buffer of it is held at a time
+
+        if stream_threshold is not None and source_stat.st_size >= stream_threshold:
+
+            with open(source_fd, 'rb', closefd=False) as source_stream:
+
+                yield source_stream, source_stat
+
+            return
+
+        if source_stat.st_size >= mmap_threshold and source_stat.st_size > 0:
+
+            source_buffer = mmap.mmap(source_fd, 0, access=mmap.ACCESS_READ)
+
+            try:
+
+                yield source_buffer, source_stat
+
+            finally:
+
+                source_buffer.close()
+
+            return
+
+        source_chunks = []
+
+        while True:
+
+            source_chunk = os.read(source_fd, max(source_stat.st_size, 4096))
+
+            if source_chunk == b'':
+
+                break
+
+            source_chunks.append(source_chunk)
+
+        yield b''.join(source_chunks), source_stat
+
+    finally:
+
+        os.close(source_fd)
+
+
+def is_source_stream(source_buffer: 'bytes | mmap.mmap | BinaryIO') -> bool:
+    """Check whether a source buffer from open_source is a stream rather than bytes in memory"""
+
+    return not isinstance(source_buffer, (bytes, bytearray, mmap.mmap))
+
+
+def source_readline(source_buffer: 'bytes | mmap.mmap | BinaryIO') -> 'Callable':
+    """Get a readline function over a source buffer for tokenize, starting at its first line
+    Memory maps and streams are read in place and byte strings are shared with BytesIO rather than copied"""
+
+    if isinstance(source_buffer, (bytes, bytearray)):
+
+        return BytesIO(source_buffer).readline
+
+    source_buffer.seek(0)
+
+    return source_buffer.readline
+
+
+def source_digest(source_buffer: 'bytes | mmap.mmap | BinaryIO') -> str:
+    """Get the SHA-256 hex digest of a source buffer
+    Streams are hashed in DIGEST_CHUNK_BYTES chunks so they are never held in memory whole"""
+
+    if not is_source_stream(source_buffer):
+
+        return hashlib.sha256(source_buffer).hexdigest()
+
+    source_hash = hashlib.sha256()
+
+    source_buffer.seek(0)
+
+    for source_chunk in iter(lambda: source_buffer.read(DIGEST_CHUNK_BYTES), b''):
+
+        source_hash.update(source_chunk)
+
+    return source_hash.hexdigest()
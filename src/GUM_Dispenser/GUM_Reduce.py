@@ -0,0 +1,205 @@
+
+from fnmatch import fnmatchcase
+
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo, as_module_info
+
+from GUM_Dispenser.GUM_Entry_Points import iter_project_modules
+
+
+# Reduction filters shrink a described project before it is rendered, so huge projects lay out in seconds
+# reduce_options may hold:
+#   include, exclude: lists of glob patterns matched against 'package.module' (or the module name alone
+#                     for projects without packages)
+#   max_depth: deepest declaration level kept, 1 being top level declarations and 0 none at all
+#   collapse_external: link external dependencies to the importing package once instead of from every module
+#   merge_edges: draw edges that repeat under the same names once, labeled with how many they stand for
+
+REDUCE_OPTION_NAMES = ['include', 'exclude', 'max_depth', 'collapse_external', 'merge_edges']
+
+
+def reduction_requested(reduce_options: dict) -> bool:
+    """Check whether any reduction filter is set"""
+
+    # max_depth of 0 is a filter, so only None counts as unset for it
+
+    return reduce_options is not None and (reduce_options.get('max_depth') is not None or
+                                           any(reduce_options.get(option_name) for option_name in REDUCE_OPTION_NAMES
+                                               if option_name != 'max_depth'))
+
+
+def module_selected(module_path: str, include: list, exclude: list) -> bool:
+    """Check a dotted module path against include and exclude glob patterns
+    Every module is included when there are no include patterns. Exclusions win"""
+
+    if include and not any(fnmatchcase(module_path, pattern) for pattern in include):
+
+        return False
+
+    return not any(fnmatchcase(module_path, pattern) for pattern in exclude or [])
+
+
+def copy_declarations(source_scope: 'DeclarationScope', target_scope: 'DeclarationScope', max_depth: int) -> None:
+    """Copy declarations into another scope, leaving out those nested deeper than max_depth
+    max_depth of None copies every level"""
+
+    # Walk iteratively so deeply nested declarations cannot exhaust the recursion limit
+
+    pending_scopes = [(source_scope, target_scope, 1)]
+
+    while len(pending_scopes) > 0:
+
+        current_source, current_target, depth = pending_scopes.pop()
+
+        if max_depth is not None and depth > max_depth:
+
+            continue
+
+        for signature, declaration in current_source.iter_declarations():
+
+            pending_scopes.append((declaration, current_target.add_declaration(signature, declaration.scope_name),
+                                   depth + 1))
+
+
+def count_edge(edge_counts: dict, source_name: str, dependency: str) -> bool:
+    """Count one more edge between two node names. Returns True if the edge was not seen before"""
+
+    edge_key = (source_name, dependency)
+
+    first_seen = edge_key not in edge_counts
+
+    edge_counts[edge_key] = edge_counts.get(edge_key, 0) + 1
+
+    return first_seen
+
+
+def reduce_project(source_data: dict, reduce_options: dict) -> tuple:
+    """Apply reduction filters to described source data without changing it
+    Returns (reduced source data, edge weights). Edge weights map (source node name, dependency) to the number
+    of edges merged into one, for edges standing for more than one
+    With collapse_external, packages in the reduced data hold a 'dependencies' list of their external
+    dependencies, each drawn once from the package node"""
+
+    include = reduce_options.get('include') or []
+
+    exclude = reduce_options.get('exclude') or []
+
+    max_depth = reduce_options.get('max_depth')
+
+    collapse_external = reduce_options.get('collapse_external', False)
+
+    merge_edges = reduce_options.get('merge_edges', False)
+
+    # Anything not named by a scanned module or package is an external dependency
+
+    project_names = set()
+
+    kept_modules = []
+
+    excluded_names = set()
+
+    for current_package, current_module, module_data in iter_project_modules(source_data):
+
+        project_names.add(current_module)
+
+        if current_package != '':
+
+            project_names.add(current_package)
+
+            module_path = current_package + '.' + current_module
+
+        else:
+
+            module_path = current_module
+
+        if module_selected(module_path, include, exclude):
+
+            kept_modules.append((current_package, current_module, module_data))
+
+        else:
+
+            excluded_names.add(current_module)
+
+    # Dependencies on filtered out modules are dropped unless a kept module shares the name
+
+    excluded_names.difference_update(current_module for current_package, current_module, module_data in kept_modules)
+
+    edge_counts = {}
+
+    package_dependencies = {}
+
+    reduced_modules = {}
+
+    for current_package, current_module, module_data in kept_modules:
+
+        module_info = as_module_info(module_data)
+
+        reduced_info = ModuleInfo()
+
+        reduced_info.token_count = module_info.token_count
+
+        copy_declarations(module_info, reduced_info, max_depth)
+
+        for dependency in module_info.dependencies:
+
+            if dependency in excluded_names:
+
+                continue
+
+            if collapse_external and current_package != '' and dependency not in project_names:
+
+                package_dependencies.setdefault(current_package, {}).setdefault(dependency.split('.')[0], None)
+
+                count_edge(edge_counts, current_package, dependency.split('.')[0])
+
+                continue
+
+            # Without merging, every module keeps its own edge
+
+            if count_edge(edge_counts, current_module, dependency) or not merge_edges:
+
+                reduced_info.add_dependency(dependency)
+
+        reduced_modules.setdefault(current_package, {})[current_module] = reduced_info
+
+    if 'packages' in source_data:
+
+        reduced_data = {'packages' : {}}
+
+        for current_package, package_modules in reduced_modules.items():
+
+            reduced_data['packages'][current_package] = {'modules' : package_modules}
+
+            if current_package in package_dependencies:
+
+                reduced_data['packages'][current_package]['dependencies'] = list(package_dependencies[current_package])
+
+    else:
+
+        reduced_data = {'modules' : reduced_modules.get('', {})}
+
+    # Unmerged module edges are still drawn separately, so only merged edges carry a weight
+
+    edge_weights = {edge_key : edge_count for edge_key, edge_count in edge_counts.items()
+                    if edge_count > 1 and (merge_edges or edge_key[0] in package_dependencies)}
+
+    return reduced_data, edge_weights
+
+
+def iter_package_dependencies(source_data: dict) -> 'Iterator[tuple]':
+    """Yield (package, dependency) for the external dependencies collapsed onto packages by reduce_project"""
+
+    for package, package_data in source_data.get('packages', {}).items():
+
+        for dependency in package_data.get('dependencies', []):
+
+            yield package, dependency
+
+
+def edge_weight(render_options: dict, source_name: str, dependency: str) -> int:
+    """Get how many edges a drawn edge stands for, 1 unless edges were merged by reduce_project"""
+
+    if render_options is None:
+
+        return 1
+
+    return render_options.get('edge_weights', {}).get((source_name, dependency), 1)
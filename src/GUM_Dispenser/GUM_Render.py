@@ -0,0 +1,101 @@
+
+import sys
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import iter_project_nomnoml
+
+from GUM_Dispenser.GUM_Generate_DOT import iter_project_dot
+
+from GUM_Dispenser.GUM_Generate_PlantUML import iter_project_plantuml
+
+from GUM_Dispenser.GUM_Generate_JSON import iter_project_json
+
+
+# Output formats by name. Every renderer is a chunk iterator called as
+# renderer(source_data, entry_points, render_options) that yields the markup piece by piece
+
+RENDERERS = {'nomnoml' : iter_project_nomnoml,
+             'dot' : iter_project_dot,
+             'plantuml' : iter_project_plantuml,
+             'json' : iter_project_json}
+
+
+def register_renderer(format_name: str, renderer: 'Callable') -> None:
+    """Make a renderer available under a format name, replacing any renderer already using it"""
+
+    RENDERERS[format_name] = renderer
+
+
+def write_rendered(output: 'str | TextIO', chunks: 'Iterable[str]') -> int:
+    """Write rendered chunks to a file path or a writable text stream as they are generated
+    Returns the number of characters written"""
+
+    if isinstance(output, str):
+
+        with open(output, 'w') as output_file:
+
+            return write_rendered(output_file, chunks)
+
+    characters_written = 0
+
+    for chunk in chunks:
+
+        characters_written += output.write(chunk)
+
+    return characters_written
+
+
+def render_project(source_data: dict, entry_points: list, format_name: str, output: 'str | TextIO',
+                   render_options: dict = None) -> int:
+    """Write source data in the named format to a file path or a writable text stream
+    Returns the number of characters written"""
+
+    if format_name not in RENDERERS:
+
+        raise ValueError('Unknown output format ' + format_name + '. Choose from ' + ', '.join(sorted(RENDERERS)))
+
+    return write_rendered(output, RENDERERS[format_name](source_data, entry_points, render_options))
+
+
+def parse_format_option(format_option: str) -> tuple:
+    """Split a --format value like 'dot=diagram.dot' into (format name, output path)
+    The output path is None when only a format is named, meaning stdout"""
+
+    format_name, separator, output_path = format_option.partition('=')
+
+    format_name = format_name.strip().lower()
+
+    if format_name not in RENDERERS:
+
+        raise ValueError('Unknown output format ' + format_name + '. Choose from ' + ', '.join(sorted(RENDERERS)))
+
+    return format_name, output_path if separator and output_path != '' else None
+
+
+def render_formats(source_data: dict, entry_points: list, format_outputs: list, render_options: dict = None) -> None:
+    """Render the same source data in several formats, each to its own output path or to stdout
+    format_outputs holds (format name, output path) pairs from parse_format_option
+    Entry points are resolved once and shared by every renderer"""
+
+    if len([output_path for format_name, output_path in format_outputs if output_path is None]) > 1:
+
+        raise ValueError('Only one output format can be written to stdout. Give the others an output path')
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points)
+
+    for format_name, output_path in format_outputs:
+
+        if output_path is None:
+
+            render_project(source_data, entry_points, format_name, sys.stdout, render_options)
+
+            sys.stdout.write('\n')
+
+            sys.stdout.flush()
+
+        else:
+
+            render_project(source_data, entry_points, format_name, output_path, render_options)
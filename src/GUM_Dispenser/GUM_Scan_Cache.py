@@ -0,0 +1,183 @@
+
+import hashlib
+
+import json
+
+import os
+
+import tempfile
+
+import logging
+
+from GUM_Dispenser.GUM_Read_Source import source_digest
+
+from GUM_Dispenser.GUM_Defaults import DEFAULT_CACHE_MAX_BYTES
+
+
+# Bump whenever the stored module data changes shape, or a scan of the same source gives different results,
+# so stale entries are never reused
+# 2: declarations with a signature over several lines are named after their function or class
+
+CACHE_FORMAT_VERSION = 2
+
+
+def module_cache_key(module_path: str, module_stat: 'os.stat_result', module_bytes: 'bytes | mmap.mmap | BinaryIO',
+                     current_package: str, scan_engine: str = 'tokenize') -> str:
+    """Build a cache key from a module's path, size, modification time and content hash
+    module_bytes may be any source buffer from GUM_Read_Source.open_source
+    The package is part of the key because it decides how internal dependencies are named
+    The scan engine is part of the key because engines may differ on unusual source"""
+
+    content_hash = source_digest(module_bytes)
+
+    key_source = '\0'.join([str(CACHE_FORMAT_VERSION), os.path.abspath(module_path), str(module_stat.st_size),
+                            str(module_stat.st_mtime_ns), content_hash, current_package, scan_engine])
+
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+def cache_entry_path(cache_dir: str, cache_key: str) -> str:
+    """Get the file path for a cache entry"""
+
+    return os.path.join(cache_dir, cache_key + '.json')
+
+
+def load_cached_module(cache_dir: str, cache_key: str) -> dict:
+    """Return the stored dependencies and declarations for a key, or None on a miss"""
+
+    entry_path = cache_entry_path(cache_dir, cache_key)
+
+    try:
+
+        with open(entry_path, 'r', encoding='utf-8') as entry_file:
+
+            cached_data = json.load(entry_file)
+
+    except FileNotFoundError:
+
+        return None
+
+    # A damaged entry is treated as a miss and will be overwritten
+
+    except (OSError, ValueError):
+
+        logging.getLogger('GUM Dispenser').warning('Ignoring unreadable cache entry ' + entry_path)
+
+        return None
+
+    # Refresh the modification time so eviction treats this entry as recently used
+
+    try:
+
+        os.utime(entry_path)
+
+    except OSError:
+
+        pass
+
+    return cached_data
+
+
+def store_cached_module(cache_dir: str, cache_key: str, module_data: dict) -> None:
+    """Atomically write a module's dependencies and declarations to the cache
+    Entries are written to a temporary file and renamed so concurrent runs never see partial data"""
+
+    payload = json.dumps({'dependencies': module_data['dependencies'],
+                          'declarations': module_data['declarations']}, separators=(',', ':'))
+
+    try:
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        temp_fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix='.', suffix='.tmp')
+
+    except OSError as err:
+
+        logging.getLogger('GUM Dispenser').warning('Unable to write to cache directory ' + cache_dir + ': ' + str(err))
+
+        return
+
+    try:
+
+        with os.fdopen(temp_fd, 'w', encoding='utf-8') as temp_file:
+
+            temp_file.write(payload)
+
+        os.replace(temp_path, cache_entry_path(cache_dir, cache_key))
+
+    except OSError as err:
+
+        logging.getLogger('GUM Dispenser').warning('Unable to store cache entry ' + cache_key + ': ' + str(err))
+
+        try:
+
+            os.remove(temp_path)
+
+        except OSError:
+
+            pass
+
+
+def evict_cache_entries(cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> int:
+    """Remove least recently used entries until the cache fits within max_bytes
+    Returns the number of bytes removed"""
+
+    cache_entries = []
+
+    total_bytes = 0
+
+    try:
+
+        with os.scandir(cache_dir) as directory_entries:
+
+            for entry in directory_entries:
+
+                if not entry.name.endswith('.json'):
+
+                    continue
+
+                # Another run may have evicted this entry since we listed the directory
+
+                try:
+
+                    entry_stat = entry.stat()
+
+                except FileNotFoundError:
+
+                    continue
+
+                cache_entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+
+                total_bytes += entry_stat.st_size
+
+    except FileNotFoundError:
+
+        return 0
+
+    if total_bytes <= max_bytes:
+
+        return 0
+
+    removed_bytes = 0
+
+    # Oldest modification time first
+
+    for entry_mtime, entry_size, entry_path in sorted(cache_entries):
+
+        if total_bytes - removed_bytes <= max_bytes:
+
+            break
+
+        try:
+
+            os.remove(entry_path)
+
+        except FileNotFoundError:
+
+            pass
+
+        removed_bytes += entry_size
+
+    logging.getLogger('GUM Dispenser').info('Evicted ' + str(removed_bytes) + ' bytes from scan cache ' + cache_dir)
+
+    return removed_bytes
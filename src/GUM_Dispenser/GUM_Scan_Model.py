@@ -0,0 +1,167 @@
+
+
+# Compact records for scan results
+# Dictionaries keep insertion order, so they double as ordered sets with constant time membership checks
+
+
+class DeclarationScope(object):
+    """Holds nested declarations keyed by signature
+    The declarations dictionary is only created once the first declaration is added"""
+
+    __slots__ = ('declarations',)
+
+    def __init__(self) -> None:
+
+        self.declarations = None
+
+
+    def add_declaration(self, signature: str, scope_name: str) -> 'Declaration':
+        """Store a new declaration in this scope, replacing any earlier one with the same signature"""
+
+        if self.declarations is None:
+
+            self.declarations = {}
+
+        declaration = Declaration(signature, scope_name)
+
+        self.declarations[signature] = declaration
+
+        return declaration
+
+
+    def get_declaration(self, signature: str) -> 'Declaration':
+        """Return the declaration with the given signature in this scope, or None"""
+
+        if self.declarations is None:
+
+            return None
+
+        return self.declarations.get(signature)
+
+
+    def iter_declarations(self) -> 'Iterator[tuple]':
+        """Yield (signature, declaration) pairs in the order they were declared"""
+
+        if self.declarations is not None:
+
+            yield from self.declarations.items()
+
+
+class Declaration(DeclarationScope):
+    """A function or class declaration and the declarations nested inside it"""
+
+    __slots__ = ('signature', 'scope_name')
+
+    def __init__(self, signature: str, scope_name: str) -> None:
+
+        super().__init__()
+
+        self.signature = signature
+
+        self.scope_name = scope_name
+
+
+    def __repr__(self) -> str:
+
+        return 'Declaration(' + repr(self.signature) + ')'
+
+
+    def as_dict(self) -> dict:
+        """Convert to the legacy nested dictionary form"""
+
+        declaration_dict = {'current_scope_name' : self.scope_name}
+
+        for signature, declaration in self.iter_declarations():
+
+            declaration_dict[signature] = declaration.as_dict()
+
+        return declaration_dict
+
+
+class ModuleInfo(DeclarationScope):
+    """Dependencies and top level declarations found in one module
+    token_count is only known when the module was scanned by walking its tokens"""
+
+    __slots__ = ('dependencies', 'token_count')
+
+    def __init__(self) -> None:
+
+        super().__init__()
+
+        self.dependencies = {}
+
+        self.token_count = None
+
+
+    def __repr__(self) -> str:
+
+        return 'ModuleInfo(' + repr(self.as_dict()) + ')'
+
+
+    def add_dependency(self, dependency: str) -> bool:
+        """Store a dependency once. Returns True if it was not stored before"""
+
+        if dependency in self.dependencies:
+
+            return False
+
+        self.dependencies[dependency] = None
+
+        return True
+
+
+    def as_dict(self) -> dict:
+        """Convert to the legacy {'dependencies' : [...], 'declarations' : {...}} form"""
+
+        return {'dependencies' : list(self.dependencies),
+                'declarations' : {signature : declaration.as_dict() for signature, declaration in
+                                  self.iter_declarations()}}
+
+
+    @classmethod
+    def from_dict(cls, module_data: dict) -> 'ModuleInfo':
+        """Build records from the legacy dictionary form"""
+
+        module_info = cls()
+
+        for dependency in module_data['dependencies']:
+
+            module_info.add_dependency(dependency)
+
+        # Walk iteratively so deeply nested declarations cannot exhaust the recursion limit
+
+        pending_scopes = [(module_info, module_data['declarations'])]
+
+        while len(pending_scopes) > 0:
+
+            current_scope, scope_data = pending_scopes.pop()
+
+            for signature, declaration_data in scope_data.items():
+
+                if type(declaration_data) == dict:
+
+                    pending_scopes.append((current_scope.add_declaration(signature,
+                                                                         declaration_data['current_scope_name']),
+                                           declaration_data))
+
+        return module_info
+
+
+def as_module_info(module_data: 'ModuleInfo | dict') -> 'ModuleInfo':
+    """Accept scan results as records or in the legacy dictionary form and return records"""
+
+    if isinstance(module_data, ModuleInfo):
+
+        return module_data
+
+    return ModuleInfo.from_dict(module_data)
+
+
+def as_module_dict(module_data: 'ModuleInfo | dict') -> dict:
+    """Accept scan results as records or in the legacy dictionary form and return the dictionary form"""
+
+    if isinstance(module_data, ModuleInfo):
+
+        return module_data.as_dict()
+
+    return module_data
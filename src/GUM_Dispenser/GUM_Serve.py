@@ -0,0 +1,471 @@
+
+import io
+
+import os
+
+import json
+
+import stat
+
+import time
+
+import socket
+
+import logging
+
+import threading
+
+from pathlib import Path
+
+from urllib.parse import urlsplit, parse_qs
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+from GUM_Dispenser.GUM_Exceptions import InvalidSourcePathError
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup, check_for_setup, DEFAULT_SETUP_SIZE_LIMIT
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index
+
+from GUM_Dispenser.GUM_Render import render_project, RENDERERS
+
+from GUM_Dispenser.GUM_Watch_Source import module_source_paths, snapshot_modules, find_changed_modules
+from GUM_Dispenser.GUM_Watch_Source import refresh_modules, snapshot_directories, directories_changed, stat_path
+
+from GUM_Dispenser.GUM_Defaults import DEFAULT_SERVE_ADDRESS, DEFAULT_SERVE_MAX_PROJECTS
+
+
+# Long-lived daemon mode. Scans stay in memory between requests and files are revalidated by stat,
+# so a warm request only pays for a few stat calls and, if something changed, rescanning those modules
+
+# The daemon reads any project path it is asked for, so it only listens on loopback addresses
+
+LOOPBACK_HOSTS = ['127.0.0.1', 'localhost', '::1']
+
+# Addresses starting with this prefix name a Unix socket path instead of a host and port
+
+UNIX_ADDRESS_PREFIX = 'unix:'
+
+RENDER_CONTENT_TYPES = {'json' : 'application/json'}
+
+
+def parse_serve_address(serve_address: str) -> tuple:
+    """Split a --serve-address value into ('unix', socket path, None) or ('tcp', host, port)
+    Raises ValueError for hosts other than loopback"""
+
+    if serve_address.startswith(UNIX_ADDRESS_PREFIX):
+
+        return 'unix', serve_address[len(UNIX_ADDRESS_PREFIX):], None
+
+    host, separator, port = serve_address.rpartition(':')
+
+    if separator == '' or not port.isdigit():
+
+        raise ValueError('Expected HOST:PORT or unix:PATH for the serve address, found ' + serve_address)
+
+    host = host.strip('[]')
+
+    if host not in LOOPBACK_HOSTS:
+
+        raise ValueError('The server only listens on localhost. Choose from ' + ', '.join(LOOPBACK_HOSTS))
+
+    return 'tcp', host, int(port)
+
+
+def allowed_host(host_header: str, server_port: int = None) -> bool:
+    """Check that a request's Host header names a loopback host and the port we listen on
+    Web pages can make a browser send requests to localhost under a name they control (DNS rebinding),
+    so requests for any other name are refused. Unix socket servers have no port, so none may be given"""
+
+    if host_header is None:
+
+        return False
+
+    try:
+
+        request_host = urlsplit('//' + host_header)
+
+        request_port = request_host.port
+
+    except ValueError:
+
+        return False
+
+    if request_host.hostname not in LOOPBACK_HOSTS:
+
+        return False
+
+    if request_port is None:
+
+        return server_port is None or server_port == 80
+
+    return request_port == server_port
+
+
+def is_socket_file(file_path: str) -> bool:
+    """Check whether a path is a Unix socket, without following symbolic links"""
+
+    try:
+
+        return stat.S_ISSOCK(os.lstat(file_path).st_mode)
+
+    except FileNotFoundError:
+
+        return False
+
+
+def snapshot_layout(project_state: dict) -> dict:
+    """Record what decides which modules a project has: setup.py, every package and subpackage __init__.py
+    and the listing of every directory holding scanned modules"""
+
+    return {'files' : {project_state['setup_file'] : stat_path(project_state['setup_file'])},
+            'directories' : snapshot_directories(project_state['module_paths'])}
+
+
+def layout_changed(layout_snapshot: dict) -> bool:
+    """Check whether setup.py, an __init__.py or the set of modules in a directory changed
+    Only a different directory listing counts as a change, so saving through a temporary file does not"""
+
+    if any(stat_path(layout_file) != file_signature
+           for layout_file, file_signature in layout_snapshot['files'].items()):
+
+        return True
+
+    return directories_changed(layout_snapshot['directories'])
+
+
+def new_serve_state(scan_options: dict = None, render_options: dict = None, setup_options: dict = None,
+                    workers: int = 1, max_projects: int = DEFAULT_SERVE_MAX_PROJECTS) -> dict:
+    """Create the shared state of a server: its options and the projects kept in memory"""
+
+    return {'scan_options' : scan_options if scan_options is not None else {'records' : True},
+            'render_options' : render_options if render_options is not None else {},
+            'setup_options' : setup_options if setup_options is not None else {},
+            'workers' : workers, 'max_projects' : max_projects, 'projects' : {}, 'lock' : threading.Lock()}
+
+
+def load_project(project_state: dict, serve_state: dict) -> None:
+    """Read setup.py and scan every module of a project into its state"""
+
+    setup_options = serve_state['setup_options']
+
+    # Nobody can answer a prompt while serving, so oversized setup files are truncated unless accepted or rejected
+
+    size_policy = setup_options.get('size_policy')
+
+    if size_policy not in ('accept', 'reject'):
+
+        size_policy = 'truncate'
+
+    setup_dir = check_for_setup({'path' : project_state['path'], 'setup_file' : project_state['setup_hint']})
+
+    project_state['distro_defs'] = parse_setup(setup_dir, size_policy,
+                                               setup_options.get('size_limit', DEFAULT_SETUP_SIZE_LIMIT))
+
+    project_state['setup_file'] = str(Path(setup_dir).joinpath('setup.py'))
+
+    project_state['uml_data'] = describe_project(project_state['distro_defs'], Path(project_state['path']),
+                                                 workers=serve_state['workers'],
+                                                 scan_options=serve_state['scan_options'])
+
+    project_state['module_paths'] = module_source_paths(project_state['uml_data'], Path(project_state['path']))
+
+    project_state['module_snapshot'] = snapshot_modules(project_state['module_paths'])
+
+    project_state['layout_snapshot'] = snapshot_layout(project_state)
+
+    project_state['entry_index'] = build_entry_point_index(project_state['uml_data'],
+                                                           project_state['distro_defs']['entry_points'])
+
+    project_state['rendered'] = {}
+
+
+def revalidate_project(project_state: dict, serve_state: dict) -> str:
+    """Bring a project's scan up to date with its files, checked by stat
+    Returns 'cold' for a first scan, 'reloaded' when setup.py or the set of modules changed,
+    'rescanned' when only module files changed and 'warm' when nothing did"""
+
+    if 'uml_data' not in project_state:
+
+        load_project(project_state, serve_state)
+
+        return 'cold'
+
+    if layout_changed(project_state['layout_snapshot']):
+
+        load_project(project_state, serve_state)
+
+        return 'reloaded'
+
+    changed_modules = find_changed_modules(project_state['module_paths'], project_state['module_snapshot'])
+
+    if len(changed_modules) == 0:
+
+        return 'warm'
+
+    project_state['uml_data'] = refresh_modules(project_state['uml_data'], project_state['module_paths'],
+                                                changed_modules, serve_state['scan_options'])
+
+    project_state['entry_index'] = build_entry_point_index(project_state['uml_data'],
+                                                           project_state['distro_defs']['entry_points'],
+                                                           report_unmatched=False)
+
+    project_state['rendered'] = {}
+
+    return 'rescanned'
+
+
+def get_project_state(serve_state: dict, project_path: str, setup_file: str = None) -> dict:
+    """Find the in-memory state of a project, creating an empty one on first use
+    Each project has its own lock, so requests for different projects do not wait on each other
+    Projects are kept in order of use, and the least recently requested one is dropped past max_projects"""
+
+    project_path = str(Path(project_path).resolve())
+
+    if not Path(project_path).is_dir():
+
+        raise InvalidSourcePathError(project_path)
+
+    project_key = (project_path, setup_file)
+
+    with serve_state['lock']:
+
+        # Move the project to the end so the front holds the least recently requested one
+
+        project_state = serve_state['projects'].pop(project_key, None)
+
+        if project_state is None:
+
+            project_state = {'path' : project_path, 'setup_hint' : setup_file, 'lock' : threading.Lock()}
+
+        serve_state['projects'][project_key] = project_state
+
+        # A request still holding a dropped project finishes with it. It is scanned again if asked for later
+
+        while len(serve_state['projects']) > serve_state['max_projects']:
+
+            dropped_key = next(iter(serve_state['projects']))
+
+            del serve_state['projects'][dropped_key]
+
+            logging.getLogger('GUM Dispenser').info('Dropping ' + dropped_key[0] + ' from memory')
+
+        return project_state
+
+
+def render_request(serve_state: dict, query: dict) -> tuple:
+    """Answer a render request for query parameters path, and optionally setup_file and format
+    Returns (status code, content type, body text, extra headers)"""
+
+    if 'path' not in query:
+
+        return 400, 'text/plain', 'Give the project to render with ?path=', {}
+
+    format_name = query.get('format', 'nomnoml')
+
+    if format_name not in RENDERERS:
+
+        return 400, 'text/plain', 'Unknown output format ' + format_name + '. Choose from ' + \
+            ', '.join(sorted(RENDERERS)), {}
+
+    start_time = time.perf_counter()
+
+    try:
+
+        project_state = get_project_state(serve_state, query['path'], query.get('setup_file'))
+
+    except InvalidSourcePathError:
+
+        return 404, 'text/plain', 'No project directory at ' + query['path'], {}
+
+    with project_state['lock']:
+
+        try:
+
+            scan_state = revalidate_project(project_state, serve_state)
+
+        except Exception as err:
+
+            logging.getLogger('GUM Dispenser').exception('Unable to scan ' + project_state['path'])
+
+            # A failed first scan leaves nothing to keep. A failed refresh is retried on the next request
+
+            project_state.pop('uml_data', None)
+
+            return 500, 'text/plain', 'Unable to scan ' + project_state['path'] + ': ' + str(err), {}
+
+        # Unchanged projects are answered with the markup rendered last time
+
+        if format_name not in project_state['rendered']:
+
+            output_buffer = io.StringIO()
+
+            render_project(project_state['uml_data'], project_state['entry_index'], format_name, output_buffer,
+                           serve_state['render_options'])
+
+            project_state['rendered'][format_name] = output_buffer.getvalue()
+
+        rendered_text = project_state['rendered'][format_name]
+
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    logging.getLogger('GUM Dispenser').info('Rendered ' + project_state['path'] + ' as ' + format_name + ' (' +
+                                            scan_state + ') in ' + '{:.1f}'.format(elapsed_ms) + ' ms')
+
+    return 200, RENDER_CONTENT_TYPES.get(format_name, 'text/plain'), rendered_text, \
+        {'X-GUM-Scan' : scan_state, 'X-GUM-Elapsed-Ms' : '{:.1f}'.format(elapsed_ms)}
+
+
+def status_request(serve_state: dict) -> tuple:
+    """Answer a status request with the projects held in memory"""
+
+    with serve_state['lock']:
+
+        project_paths = [project_key[0] for project_key in serve_state['projects']]
+
+    return 200, 'application/json', json.dumps({'projects' : project_paths}), {}
+
+
+def make_request_handler(serve_state: dict) -> type:
+    """Build a request handler class bound to the given server state
+    GET /render?path=PROJECT[&format=FORMAT][&setup_file=PATH] renders a project, GET /status lists projects"""
+
+    class GUMRequestHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self) -> None:
+
+            request_url = urlsplit(self.path)
+
+            query = {name : values[-1] for name, values in parse_qs(request_url.query).items()}
+
+            # Unix socket servers are bound to a path instead of a (host, port) pair
+
+            server_port = self.server.server_address[1] if isinstance(self.server.server_address, tuple) else None
+
+            if not allowed_host(self.headers.get('Host'), server_port):
+
+                status, content_type, body_text, extra_headers = 403, 'text/plain', \
+                    'Requests must be addressed to ' + ', '.join(LOOPBACK_HOSTS), {}
+
+            elif request_url.path == '/render':
+
+                status, content_type, body_text, extra_headers = render_request(serve_state, query)
+
+            elif request_url.path == '/status':
+
+                status, content_type, body_text, extra_headers = status_request(serve_state)
+
+            else:
+
+                status, content_type, body_text, extra_headers = 404, 'text/plain', 'Try /render or /status', {}
+
+            body_bytes = body_text.encode('utf-8')
+
+            self.send_response(status)
+
+            self.send_header('Content-Type', content_type + '; charset=utf-8')
+
+            self.send_header('Content-Length', str(len(body_bytes)))
+
+            for header_name, header_value in extra_headers.items():
+
+                self.send_header(header_name, header_value)
+
+            self.end_headers()
+
+            self.wfile.write(body_bytes)
+
+
+        def address_string(self) -> str:
+
+            # Unix socket clients have no address
+
+            return self.client_address[0] if self.client_address else 'unix socket'
+
+
+        def log_message(self, format: str, *args) -> None:
+
+            logging.getLogger('GUM Dispenser').debug(self.address_string() + ' ' + format % args)
+
+    return GUMRequestHandler
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """Serve HTTP over a Unix socket, one thread per request"""
+
+    daemon_threads = True
+
+
+class ThreadingLocalHTTPServer(ThreadingHTTPServer):
+    """Serve HTTP on an IPv4 loopback host, one thread per request"""
+
+    daemon_threads = True
+
+
+class ThreadingLocalHTTP6Server(ThreadingLocalHTTPServer):
+    """Serve HTTP on the IPv6 loopback host, one thread per request"""
+
+    address_family = socket.AF_INET6
+
+
+def create_server(serve_state: dict, serve_address: str = DEFAULT_SERVE_ADDRESS) -> 'BaseServer':
+    """Bind a server for the given address. Port 0 picks a free port"""
+
+    address_kind, host, port = parse_serve_address(serve_address)
+
+    request_handler = make_request_handler(serve_state)
+
+    if address_kind == 'unix':
+
+        # A socket file left behind by an earlier server would stop us from binding.
+        # Anything else at that path is someone's file, so we never remove it
+
+        if is_socket_file(host):
+
+            os.remove(host)
+
+        elif os.path.lexists(host):
+
+            raise FileExistsError('Refusing to replace ' + host + ', which is not a Unix socket')
+
+        return ThreadingUnixHTTPServer(host, request_handler)
+
+    if ':' in host:
+
+        return ThreadingLocalHTTP6Server((host, port), request_handler)
+
+    return ThreadingLocalHTTPServer((host, port), request_handler)
+
+
+def serve(serve_address: str = DEFAULT_SERVE_ADDRESS, scan_options: dict = None, render_options: dict = None,
+          setup_options: dict = None, workers: int = 1, max_projects: int = DEFAULT_SERVE_MAX_PROJECTS) -> None:
+    """Answer render requests until interrupted, keeping the scans of the max_projects most recently
+    requested projects in memory"""
+
+    serve_state = new_serve_state(scan_options, render_options, setup_options, workers, max_projects)
+
+    server = create_server(serve_state, serve_address)
+
+    logging.getLogger('GUM Dispenser').info('Serving on ' + serve_address + '. Request /render?path=PROJECT')
+
+    try:
+
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+
+        logging.getLogger('GUM Dispenser').info('Stopped serving')
+
+    finally:
+
+        server.server_close()
+
+        socket_path = serve_address[len(UNIX_ADDRESS_PREFIX):]
+
+        if serve_address.startswith(UNIX_ADDRESS_PREFIX) and is_socket_file(socket_path):
+
+            os.remove(socket_path)
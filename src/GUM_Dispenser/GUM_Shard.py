@@ -0,0 +1,209 @@
+
+import os
+
+import logging
+
+from concurrent.futures import ProcessPoolExecutor
+
+from GUM_Dispenser.GUM_Entry_Points import build_entry_point_index
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import write_project_nomnoml, ENTRY_STYLE_DIRECTIVE
+
+from GUM_Dispenser.GUM_Import_Graph import build_import_graph
+
+from GUM_Dispenser.GUM_Defaults import SPLIT_MODES
+
+
+# File extension for every shard and the index
+
+SHARD_SUFFIX = '.nomnoml'
+
+# The index is named so it cannot clash with a package's shard
+
+INDEX_FILE_NAME = '__index__' + SHARD_SUFFIX
+
+# Shard name for projects made of individual modules, which have no packages to split by
+
+MODULES_SHARD_NAME = 'modules'
+
+
+def split_by_package(source_data: dict) -> dict:
+    """Split described source data into one project per package, keyed by package name
+    Projects made of individual modules become a single shard under the package name ''"""
+
+    if 'packages' not in source_data:
+
+        return {'' : source_data}
+
+    return {package : {'packages' : {package : package_data}}
+            for package, package_data in source_data['packages'].items()}
+
+
+def shard_file_name(package: str) -> str:
+    """Name the file a package's shard is written to"""
+
+    return (package if package != '' else MODULES_SHARD_NAME) + SHARD_SUFFIX
+
+
+def split_entry_point_index(entry_points: dict) -> dict:
+    """Group a project's entry point index by package, so each shard only resolves its own entry points
+    Unmatched entry points were already reported for the whole project and are left out"""
+
+    shard_entry_points = {}
+
+    for entry_key, entry_point in entry_points['entries'].items():
+
+        shard_entry_points.setdefault(entry_key[0], {'entries' : {}, 'unmatched' : []})['entries'][entry_key] = \
+            entry_point
+
+    return shard_entry_points
+
+
+def build_package_edges(source_data: dict) -> dict:
+    """Count the imports between packages
+    Returns {(importing package, imported package) : number of module imports}"""
+
+    if 'packages' not in source_data:
+
+        return {}
+
+    import_graph = build_import_graph(source_data)
+
+    package_edges = {}
+
+    for node, imported_nodes in enumerate(import_graph['edges']):
+
+        module_key = import_graph['modules'][node]
+
+        if module_key is None:
+
+            continue
+
+        for imported_node in imported_nodes:
+
+            imported_key = import_graph['modules'][imported_node]
+
+            # Imports of a package itself, e.g. 'import mypackage', name the package instead of a module
+
+            if imported_key is not None:
+
+                imported_package = imported_key[0]
+
+            elif import_graph['nodes'][imported_node] in source_data['packages']:
+
+                imported_package = import_graph['nodes'][imported_node]
+
+            else:
+
+                continue
+
+            if imported_package != module_key[0]:
+
+                package_edge = (module_key[0], imported_package)
+
+                package_edges[package_edge] = package_edges.get(package_edge, 0) + 1
+
+    return package_edges
+
+
+def generate_index_nomnoml(source_data: dict, entry_points: 'list | dict') -> str:
+    """Generate a small NOMNOML diagram of the packages alone and the imports between them
+    Packages holding an entry point are colored, and edges are labeled with how many imports they stand for"""
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points, report_unmatched=False)
+
+    entry_packages = {entry_key[0] for entry_key in entry_points['entries']}
+
+    index_pieces = [ENTRY_STYLE_DIRECTIVE]
+
+    for package in source_data.get('packages', {}):
+
+        index_pieces.append('[<entry>' + package + ']\n' if package in entry_packages else '[' + package + ']\n')
+
+    index_pieces.append('\n')
+
+    for (package, imported_package), import_count in build_package_edges(source_data).items():
+
+        index_pieces.append('[' + package + ']-->' + (str(import_count) if import_count > 1 else '') +
+                            '[' + imported_package + ']\n')
+
+    return ''.join(index_pieces)
+
+
+def render_shard(shard_data: dict, entry_points: dict, shard_path: str, render_options: dict = None) -> int:
+    """Write one shard's NOMNOML to its file. Runs in worker processes
+    Returns the number of characters written"""
+
+    with open(shard_path, 'w') as shard_file:
+
+        characters_written = write_project_nomnoml(shard_data, entry_points, shard_file, render_options)
+
+        shard_file.write('\n')
+
+    return characters_written
+
+
+def write_shards(source_data: dict, entry_points: 'list | dict', output_dir: str, workers: int = 1,
+                 render_options: dict = None, packages: list = None) -> dict:
+    """Write one NOMNOML file per package and an index diagram of the packages to output_dir
+    Shards are rendered independently, across worker processes when workers is more than 1
+    packages limits which shards are rendered again. The index is always rewritten
+    Returns {'index' : index path, 'shards' : {package : shard path}} for the files written"""
+
+    if not isinstance(entry_points, dict):
+
+        entry_points = build_entry_point_index(source_data, entry_points)
+
+    shards = split_by_package(source_data)
+
+    if packages:
+
+        unknown_packages = [package for package in packages if package not in shards]
+
+        if unknown_packages:
+
+            raise ValueError('No package named ' + ', '.join(unknown_packages) + ' to render. Choose from ' +
+                             ', '.join(shards))
+
+        shards = {package : shards[package] for package in packages}
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    shard_entry_points = split_entry_point_index(entry_points)
+
+    shard_jobs = [(shard_data, shard_entry_points.get(package, {'entries' : {}, 'unmatched' : []}),
+                   os.path.join(output_dir, shard_file_name(package)), package)
+                  for package, shard_data in shards.items()]
+
+    logging.getLogger('GUM Dispenser').info('Rendering ' + str(len(shard_jobs)) + ' shards with ' +
+                                            str(min(workers, len(shard_jobs))) + ' workers...')
+
+    if workers > 1 and len(shard_jobs) > 1:
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(shard_jobs))) as executor:
+
+            pending_shards = [executor.submit(render_shard, shard_data, shard_index, shard_path, render_options)
+                              for shard_data, shard_index, shard_path, package in shard_jobs]
+
+            # Surface the first failure, if any, once every shard has been tried
+
+            for pending_shard in pending_shards:
+
+                pending_shard.result()
+
+    else:
+
+        for shard_data, shard_index, shard_path, package in shard_jobs:
+
+            render_shard(shard_data, shard_index, shard_path, render_options)
+
+    index_path = os.path.join(output_dir, INDEX_FILE_NAME)
+
+    with open(index_path, 'w') as index_file:
+
+        index_file.write(generate_index_nomnoml(source_data, entry_points) + '\n')
+
+    return {'index' : index_path, 'shards' : {package : shard_path
+                                              for shard_data, shard_index, shard_path, package in shard_jobs}}
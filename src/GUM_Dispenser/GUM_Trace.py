@@ -0,0 +1,45 @@
+
+import json
+
+import os
+
+
+# Structured trace of scanner events, written as one JSON object per line
+# Events are collected per module and appended with a single write,
+# so worker processes sharing one trace file never interleave partial lines
+
+
+def trace_event(trace_lines: list, event: str, **event_fields) -> None:
+    """Record a trace event such as a token or a scope change"""
+
+    event_fields['event'] = event
+
+    trace_lines.append(json.dumps(event_fields))
+
+
+def write_trace(trace_path: str, trace_lines: list) -> None:
+    """Append collected trace events to the trace file"""
+
+    if len(trace_lines) == 0:
+
+        return
+
+    trace_bytes = ('\n'.join(trace_lines) + '\n').encode('utf-8')
+
+    trace_fd = os.open(trace_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    try:
+
+        os.write(trace_fd, trace_bytes)
+
+    finally:
+
+        os.close(trace_fd)
+
+
+def read_trace(trace_path: str) -> list:
+    """Load every event from a trace file"""
+
+    with open(trace_path, 'r', encoding='utf-8') as trace_file:
+
+        return [json.loads(trace_line) for trace_line in trace_file if trace_line.strip() != '']
@@ -0,0 +1,291 @@
+
+from GUM_Dispenser.GUM_Describe_Source import describe_module, collect_module_jobs
+
+from GUM_Dispenser.GUM_Discover_Source import module_file_path, list_source_directory
+
+import os
+
+import time
+
+import logging
+
+
+def module_source_paths(uml_data: dict, dev_directory: 'Path') -> dict:
+    """Map every scanned (package, module) pair to the directory its .py file lives in"""
+
+    module_paths = {}
+
+    if 'packages' in uml_data:
+
+        for package, package_data in uml_data['packages'].items():
+
+            for module_name in package_data['modules']:
+
+                module_paths[(package, module_name)] = dev_directory.joinpath(*package.split('.'))
+
+    else:
+
+        for module_name in uml_data['modules']:
+
+            module_paths[('None', module_name)] = dev_directory
+
+    return module_paths
+
+
+def stat_path(file_path: str) -> tuple:
+    """Get the (modification time, size) of a file or directory, or None if it is gone"""
+
+    try:
+
+        path_stat = os.stat(str(file_path))
+
+    except FileNotFoundError:
+
+        return None
+
+    return path_stat.st_mtime_ns, path_stat.st_size
+
+
+def stat_module(package_path: 'Path', module_name: str) -> tuple:
+    """Get the (modification time, size) of a module file, or None if it is gone"""
+
+    return stat_path(module_file_path(package_path, module_name))
+
+
+def snapshot_modules(module_paths: dict) -> dict:
+    """Record the stat signature of every module file"""
+
+    return {module_key: stat_module(package_path, module_key[1]) for module_key, package_path in module_paths.items()}
+
+
+def find_changed_modules(module_paths: dict, module_snapshot: dict) -> list:
+    """List modules whose modification time or size differs from the snapshot
+    The snapshot is updated in place"""
+
+    changed_modules = []
+
+    for module_key, package_path in module_paths.items():
+
+        current_stat = stat_module(package_path, module_key[1])
+
+        if current_stat != module_snapshot.get(module_key):
+
+            module_snapshot[module_key] = current_stat
+
+            changed_modules.append(module_key)
+
+    return changed_modules
+
+
+def module_directories(module_paths: dict) -> list:
+    """List every package directory and every directory holding a scanned module, subpackages included"""
+
+    return sorted({str(package_path) for package_path in module_paths.values()} |
+                  {str(module_file_path(package_path, module_key[1]).parent)
+                   for module_key, package_path in module_paths.items()})
+
+
+def snapshot_directories(module_paths: dict) -> dict:
+    """Record the stat signature and listing of every module directory, and the stat signature of its __init__.py
+    The listing and __all__ in __init__.py decide which modules and subpackages a package has"""
+
+    return {module_directory : (stat_path(module_directory), stat_path(os.path.join(module_directory, '__init__.py')),
+                                list_source_directory(module_directory))
+            for module_directory in module_directories(module_paths)}
+
+
+def directories_changed(directory_snapshot: dict) -> bool:
+    """Check whether an __init__.py or the set of .py files and subdirectories in a module directory changed
+    Editors that save by renaming a temporary file touch the directory on every save, so a changed
+    directory is only listed again, and only a different listing counts as a change
+    The snapshot is updated in place"""
+
+    layout_changed = False
+
+    for module_directory, (directory_signature, init_signature, listing) in directory_snapshot.items():
+
+        current_signature = stat_path(module_directory)
+
+        current_init_signature = stat_path(os.path.join(module_directory, '__init__.py'))
+
+        if current_signature == directory_signature and current_init_signature == init_signature:
+
+            continue
+
+        current_listing = list_source_directory(module_directory)
+
+        if current_init_signature != init_signature or current_listing != listing:
+
+            layout_changed = True
+
+        directory_snapshot[module_directory] = (current_signature, current_init_signature, current_listing)
+
+    return layout_changed
+
+
+def refresh_layout(uml_data: dict, dev_directory: 'Path', module_paths: dict, module_snapshot: dict,
+                   scan_options: dict = None) -> tuple:
+    """Find the modules of a package project again after modules or subpackages were added or removed
+    New modules are scanned, removed modules are dropped and every other module keeps its scan results
+    module_paths and module_snapshot are updated in place
+    Returns the updated uml_data and the (package, module) pairs that were added or removed"""
+
+    try:
+
+        layout_data, module_jobs = collect_module_jobs({'package_names' : list(uml_data['packages'])}, dev_directory,
+                                                       scan_options)
+
+    except Exception as err:
+
+        logging.getLogger('GUM Dispenser').error('Unable to find the modules of the project again: ' + str(err))
+
+        return uml_data, []
+
+    previous_modules = {(package, module_name) : module_data
+                        for package, package_data in uml_data['packages'].items()
+                        for module_name, module_data in package_data['modules'].items()}
+
+    found_modules = {(package, module_name) for package, module_name, package_path in module_jobs}
+
+    changed_modules = [module_key for module_key in previous_modules if module_key not in found_modules]
+
+    for module_key in changed_modules:
+
+        logging.getLogger('GUM Dispenser').warning('Module ' + module_key[1] + ' was removed')
+
+        module_snapshot.pop(module_key, None)
+
+    module_paths.clear()
+
+    for current_package, current_module, package_path in module_jobs:
+
+        module_key = (current_package, current_module)
+
+        module_paths[module_key] = package_path
+
+        # Modules keep the order a full scan would give them
+
+        if module_key in previous_modules:
+
+            layout_data['packages'][current_package]['modules'][current_module] = previous_modules[module_key]
+
+            continue
+
+        logging.getLogger('GUM Dispenser').info('Scanning new module ' + current_module)
+
+        changed_modules.append(module_key)
+
+        module_snapshot[module_key] = stat_module(package_path, current_module)
+
+        # A new module that does not tokenize yet is left out until its next save is rescanned
+
+        try:
+
+            layout_data = describe_module(current_package, current_module, package_path, layout_data, scan_options)
+
+        except Exception as err:
+
+            logging.getLogger('GUM Dispenser').error('Unable to scan new module ' + current_module + ': ' + str(err))
+
+    return layout_data, changed_modules
+
+
+def refresh_modules(uml_data: dict, module_paths: dict, changed_modules: list, scan_options: dict = None) -> dict:
+    """Rescan only the changed modules and splice their results back into uml_data
+    Deleted modules are dropped, and modules that fail to scan keep their previous data"""
+
+    for module_key in changed_modules:
+
+        current_package, current_module = module_key
+
+        if current_package != 'None':
+
+            package_modules = uml_data['packages'][current_package]['modules']
+
+        else:
+
+            package_modules = uml_data['modules']
+
+        if stat_module(module_paths[module_key], current_module) is None:
+
+            logging.getLogger('GUM Dispenser').warning('Module ' + current_module + ' was removed')
+
+            package_modules.pop(current_module, None)
+
+            del module_paths[module_key]
+
+            continue
+
+        logging.getLogger('GUM Dispenser').info('Rescanning changed module ' + current_module)
+
+        previous_data = package_modules.get(current_module)
+
+        # A file saved mid-edit may not tokenize yet. Keep the last good result until the next save
+
+        try:
+
+            uml_data = describe_module(current_package, current_module, module_paths[module_key], uml_data,
+                                       scan_options)
+
+        except Exception as err:
+
+            logging.getLogger('GUM Dispenser').error('Unable to rescan module ' + current_module + ': ' + str(err))
+
+            if previous_data is not None:
+
+                package_modules[current_module] = previous_data
+
+    return uml_data
+
+
+def watch_project(uml_data: dict, dev_directory: 'Path', render: 'Callable', scan_options: dict = None,
+                  interval: float = 1.0, max_polls: int = None, sleep: 'Callable' = time.sleep) -> dict:
+    """Poll the module files of an already scanned project and call render(uml_data) after every change
+    Only modules whose modification time or size changed are rescanned
+    The directories of package projects are polled too, so added and removed modules are picked up
+    Polling stops after max_polls checks if given, or on keyboard interrupt"""
+
+    module_paths = module_source_paths(uml_data, dev_directory)
+
+    module_snapshot = snapshot_modules(module_paths)
+
+    # Projects of individual modules list every module in setup.py, so only packages can gain modules
+
+    directory_snapshot = snapshot_directories(module_paths) if 'packages' in uml_data else {}
+
+    logging.getLogger('GUM Dispenser').info('Watching ' + str(len(module_paths)) + ' modules for changes...')
+
+    polls_done = 0
+
+    try:
+
+        while max_polls is None or polls_done < max_polls:
+
+            sleep(interval)
+
+            polls_done += 1
+
+            layout_modules = []
+
+            if directories_changed(directory_snapshot):
+
+                uml_data, layout_modules = refresh_layout(uml_data, dev_directory, module_paths, module_snapshot,
+                                                          scan_options)
+
+                directory_snapshot = snapshot_directories(module_paths)
+
+            changed_modules = find_changed_modules(module_paths, module_snapshot)
+
+            if len(changed_modules) > 0:
+
+                uml_data = refresh_modules(uml_data, module_paths, changed_modules, scan_options)
+
+            if len(layout_modules) > 0 or len(changed_modules) > 0:
+
+                render(uml_data)
+
+    except KeyboardInterrupt:
+
+        logging.getLogger('GUM Dispenser').info('Stopped watching for changes')
+
+    return uml_data
@@ -1,10 +1,14 @@
 
-from GUM_Dispenser.GUM_Exceptions import ConfigurationNotFoundError, UserConfirmedInvalidSetup
+from GUM_Dispenser.GUM_Exceptions import ConfigurationNotFoundError, UserConfirmedInvalidSetup, SetupSizeLimitError
+
+from GUM_Dispenser.GUM_Defaults import DEFAULT_SETUP_SIZE_LIMIT, SETUP_SIZE_POLICIES
 
 import re
 
 import os
 
+import sys
+
 import ast
 
 from pathlib import Path
@@ -13,11 +17,11 @@ import logging
 
 import token
 
-from tokenize import tokenize
+from tokenize import tokenize, TokenError
 from io import BytesIO
 
 
-def check_setup_size(setup_path : str) -> dict:
+def check_setup_size(setup_path : str, size_limit: int = DEFAULT_SETUP_SIZE_LIMIT) -> dict:
     """Ensure the size of our setup file is expected
     Avoid potential buffer overflows"""
 
@@ -32,8 +36,8 @@ def check_setup_size(setup_path : str) -> dict:
     setup_specs['size'] = setup_size
 
     # setup.py should be a small file
-    # Prompt to continue if > 2 KB
-    if setup_size > 2000:
+    # Apply the size policy if > 2 KB, or whatever limit was given
+    if setup_size > size_limit:
 
         setup_specs['valid_size'] = False
 
@@ -57,19 +61,67 @@ def handle_invalid_setup_size(setup_path : str) -> None:
         raise UserConfirmedInvalidSetup
 
 
+def resolve_setup_size_policy(size_policy: str = None) -> str:
+    """Choose a size policy when none was given
+    We only prompt when someone can answer, so runs without a terminal never block and read at most the limit"""
+
+    if size_policy is not None:
+
+        return size_policy
+
+    if sys.stdin is not None and sys.stdin.isatty():
+
+        return 'prompt'
+
+    return 'truncate'
+
+
+def tolerate_truncated_tokens(tokens: 'Iterator') -> 'Iterator':
+    """Yield tokens until the source ends mid-statement, as a setup.py cut off at the size limit may"""
+
+    try:
+
+        yield from tokens
+
+    except TokenError:
+
+        logging.getLogger('GUM Dispenser').warning('setup.py was cut off at the size limit. ' +
+                                                   'Using the definitions read before the limit')
+
+
 def read_setup_contents(setup_path: str, setup_specs: dict) -> dict:
     """Read the setup file and remove extraneous whitespace from token list"""
 
     project_info = {}
 
-    with open(setup_path + '/setup.py', 'r') as configFile:
+    # Look up our logger and its level once instead of for every token
+
+    setup_logger = logging.getLogger('GUM Dispenser')
+
+    debug_enabled = setup_logger.isEnabledFor(logging.DEBUG)
+
+    # Read raw bytes so tokenize can honor an encoding declaration in setup.py
+
+    with open(setup_path + '/setup.py', 'rb') as configFile:
 
         setup_contents = configFile.read(setup_specs['size'])
 
-        logging.getLogger('GUM Dispenser').debug('Setup contents: \n' + str(setup_contents))
+        # A cut at the size limit may split a character encoded in several bytes, so keep whole lines only
+
+        if setup_specs.get('truncated'):
+
+            setup_contents = setup_contents[:setup_contents.rfind(b'\n') + 1]
+
+        if debug_enabled:
+
+            setup_logger.debug('Setup contents: \n' + setup_contents.decode('utf-8', 'replace'))
 
     # Tokenize is a generator, so we must iterate line by line over the text to get the tokenized version
-    tokens = tokenize(BytesIO(setup_contents.encode('utf-8')).readline)
+    tokens = tokenize(BytesIO(setup_contents).readline)
+
+    if setup_specs.get('truncated'):
+
+        tokens = tolerate_truncated_tokens(tokens)
 
     current_assignment = ''
 
@@ -79,10 +131,11 @@ def read_setup_contents(setup_path: str, setup_specs: dict) -> dict:
 
         token_name = token.tok_name[token_type]
 
-        logging.getLogger('GUM Dispenser').debug(str(start) + ',' + str(end) + ':\t' + token_name +
-                                                 '\t' + line_text.strip())
+        if debug_enabled:
+
+            setup_logger.debug(str(start) + ',' + str(end) + ':\t' + token_name + '\t' + line_text.strip())
 
-        logging.getLogger('GUM Dispenser').debug('Current assignment: ' + current_assignment)
+            setup_logger.debug('Current assignment: ' + current_assignment)
 
         # Process found entry points
 
@@ -100,7 +153,7 @@ def read_setup_contents(setup_path: str, setup_specs: dict) -> dict:
 
                 found_entry_point = found_entry_point.split('=')[1].strip()
 
-                logging.getLogger('GUM Dispenser').info('Found entry point ' + found_entry_point)
+                setup_logger.info('Found entry point %s', found_entry_point)
 
                 project_info['entry_points'].append(found_entry_point)
 
@@ -137,7 +190,7 @@ def read_setup_contents(setup_path: str, setup_specs: dict) -> dict:
 
                 found_object_name = ast.literal_eval(token_str)
 
-                logging.getLogger('GUM Dispenser').info('Adding ' + found_object_name + ' to ' + current_assignment)
+                setup_logger.info('Adding %s to %s', found_object_name, current_assignment)
 
                 project_info[current_assignment].append(found_object_name)
 
@@ -146,7 +199,9 @@ def read_setup_contents(setup_path: str, setup_specs: dict) -> dict:
 
         elif (current_assignment == 'package_names' or current_assignment == 'module_names') and token_str == ']':
 
-            logging.getLogger('GUM Dispenser').debug('Resetting current assignment from ' + current_assignment)
+            if debug_enabled:
+
+                setup_logger.debug('Resetting current assignment from ' + current_assignment)
 
             current_assignment = ''
 
@@ -155,16 +210,46 @@ def read_setup_contents(setup_path: str, setup_specs: dict) -> dict:
     return project_info
 
 
-def parse_setup(setup_path: str) -> dict:
-    """Parses the given setup.py file"""
+def parse_setup(setup_path: str, size_policy: str = None, size_limit: int = DEFAULT_SETUP_SIZE_LIMIT) -> dict:
+    """Parses the given setup.py file
+    size_policy is one of SETUP_SIZE_POLICIES and decides what happens when setup.py is larger than size_limit.
+    If it is not given, we prompt when stdin is a terminal and truncate otherwise, reading only the first
+    size_limit bytes. A prompt without a terminal to answer it truncates too"""
 
     # Validate setup.py size
 
-    setup_specs = check_setup_size(setup_path)
+    setup_specs = check_setup_size(setup_path, size_limit)
 
     if not setup_specs['valid_size']:
 
-        handle_invalid_setup_size(setup_path)
+        size_policy = resolve_setup_size_policy(size_policy)
+
+        if size_policy == 'reject':
+
+            raise SetupSizeLimitError('setup.py is larger than ' + str(size_limit) + ' bytes')
+
+        elif size_policy == 'accept':
+
+            logging.getLogger('GUM Dispenser').warning('Accepting setup.py larger than ' + str(size_limit) +
+                                                       ' bytes')
+
+        elif size_policy == 'prompt' and sys.stdin is not None and sys.stdin.isatty():
+
+            handle_invalid_setup_size(setup_path)
+
+        else:
+
+            if size_policy == 'prompt':
+
+                logging.getLogger('GUM Dispenser').warning('Unable to prompt about a setup.py larger than ' +
+                                                           str(size_limit) + ' bytes without a terminal')
+
+            logging.getLogger('GUM Dispenser').warning('Reading only the first ' + str(size_limit) +
+                                                       ' bytes of setup.py')
+
+            setup_specs['size'] = size_limit
+
+            setup_specs['truncated'] = True
 
 
 
@@ -191,3 +276,74 @@ def parse_setup(setup_path: str) -> dict:
         setup_condensed['entry_points'] = []
 
     return setup_condensed
+
+
+def check_for_setup(arguments_received: dict) -> str:
+    """Get the path to a nearby or specified setup.py file as a string"""
+
+    setup_path_str = None
+
+    # Check user supplied setup path if it is present
+
+    if arguments_received['setup_file'] is not None and arguments_received['setup_file'] != '':
+
+        setup_path_str = arguments_received['setup_file']
+
+        setup_path = Path(setup_path_str)
+
+        if setup_path.exists():
+
+            # Find a setup.py file at or near the given path
+
+            if setup_path.name == 'setup.py':
+
+                logging.getLogger('GUM Dispenser').info('Setup found in given directory: ' + str(setup_path.parent))
+
+                setup_path_str = str(setup_path.parent)
+
+            elif setup_path.is_dir():
+
+                if Path(setup_path).joinpath('setup.py').exists():
+
+                    logging.getLogger('GUM Dispenser').info("Setup found in given directory: " + str(setup_path))
+
+        else:
+
+            logging.getLogger('GUM Dispenser').error('Given explicit setup.py path ' + str(setup_path) +
+                                                     ' does not exist. Checking near development directory instead...')
+
+            setup_path_str = None
+
+
+    # User did not specify setup.py location or no file found near given path
+
+    if setup_path_str is None:
+
+        logging.getLogger('GUM Dispenser').info('No explicit input directory for setup.py. ' +
+                                                'Checking near development directory...')
+
+
+        # Check given directory and one level up for the setup file
+
+        if Path(arguments_received['path']).joinpath('setup.py').exists():
+
+            logging.getLogger('GUM Dispenser').info("Setup found in base development directory: " +
+                                                    arguments_received['path'])
+
+            setup_path_str = arguments_received['path']
+
+        elif Path(arguments_received['path']).parent.joinpath('setup.py').exists():
+
+            logging.getLogger('GUM Dispenser').info("Setup found in base development directory: " +
+                                                    str(Path(arguments_received['path']).parent))
+
+            setup_path_str = str(Path(arguments_received['path']).parent)
+
+
+    # Require presence of a setup.py file
+    if setup_path_str is None:
+
+        raise ConfigurationNotFoundError
+
+
+    return setup_path_str
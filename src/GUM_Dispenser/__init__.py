@@ -1 +1,7 @@
-__all__ = ['GUM_Dispenser_Main', 'GUM_setup_parser', 'GUM_Describe_Source', 'GUM_Generate_NOMNOML', 'GUM_Exceptions']
+__all__ = ['GUM_Dispenser_Main', 'GUM_setup_parser', 'GUM_Describe_Source', 'GUM_Generate_NOMNOML', 'GUM_Exceptions',
+           'GUM_Scan_Cache', 'GUM_Watch_Source',
+           'GUM_Describe_AST', 'GUM_Trace', 'GUM_Profile', 'GUM_Read_Source',
+           'GUM_Discover_Source', 'GUM_Scan_Model', 'GUM_Entry_Points', 'GUM_Batch', 'GUM_Monorepo',
+           'GUM_Generate_DOT', 'GUM_Generate_PlantUML', 'GUM_Generate_JSON', 'GUM_Render', 'GUM_IR',
+           'GUM_Import_Graph', 'GUM_Reduce', 'GUM_Shard',
+           'GUM_Serve', 'GUM_Defaults']
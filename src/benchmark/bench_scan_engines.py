@@ -0,0 +1,128 @@
+
+import argparse
+
+import tempfile
+
+import time
+
+from pathlib import Path
+
+import logging
+
+from GUM_Dispenser.GUM_Describe_Source import describe_module
+
+
+# Compare the tokenize and ast scanning engines on large generated modules
+# Run from the src directory: python -m benchmark.bench_scan_engines
+# The tokenize engine keys declarations by their signature text, so classes whose methods share a signature
+# are merged into one entry. Timings are only like for like on the module with distinct signatures, where
+# both engines find every declaration. The module with shared signatures shows the difference in output
+
+
+def make_module_text(class_count: int, method_count: int, shared_signatures: bool = True) -> str:
+    """Build module source with many classes and methods
+    With shared_signatures every class declares the same methods, otherwise every signature is distinct"""
+
+    module_lines = ['import os', 'import sys', 'from collections import OrderedDict', '']
+
+    for class_index in range(class_count):
+
+        # Suffix for method names and arguments, empty when every class shares its signatures
+
+        signature_suffix = '' if shared_signatures else '_' + str(class_index)
+
+        module_lines.append('class Generated' + str(class_index) + '(object):')
+        module_lines.append('')
+        module_lines.append('    def __init__(self' + ('' if shared_signatures else ', seed' + signature_suffix) + '):')
+        module_lines.append('        self.values = OrderedDict()')
+
+        for method_index in range(method_count):
+
+            module_lines.append('')
+            module_lines.append('    def method_' + str(method_index) + signature_suffix + '(self, argument: int,')
+            module_lines.append('                  other: str = "default") -> int:')
+            module_lines.append('        # Keep some ordinary statements in the body')
+            module_lines.append('        if argument > 0:')
+            module_lines.append('            return argument + len(other)')
+            module_lines.append('        return 0')
+
+        module_lines.append('')
+
+    return '\n'.join(module_lines)
+
+
+def count_declarations(declarations: dict) -> int:
+    """Count every nested declaration in a scan result"""
+
+    return sum(1 + count_declarations(value) for value in declarations.values() if type(value) == dict)
+
+
+def time_engine(engine: str, module_dir: 'Path', repeats: int) -> tuple:
+    """Return the best scan time for an engine and the scan result"""
+
+    best_time = None
+
+    for repeat_index in range(repeats):
+
+        start_time = time.perf_counter()
+
+        scan_result = describe_module('None', 'generated', module_dir, {'modules' : {}}, {'engine' : engine})
+
+        elapsed_time = time.perf_counter() - start_time
+
+        if best_time is None or elapsed_time < best_time:
+
+            best_time = elapsed_time
+
+    return best_time, scan_result['modules']['generated']
+
+
+def main():
+
+    arg_parser = argparse.ArgumentParser(description='Compare the tokenize and ast scanning engines')
+
+    arg_parser.add_argument('--classes', type=int, default=200, help='Number of generated classes')
+
+    arg_parser.add_argument('--methods', type=int, default=20, help='Number of methods per class')
+
+    arg_parser.add_argument('--repeats', type=int, default=3, help='Best of this many runs is reported')
+
+    arguments_received = arg_parser.parse_args()
+
+    # Keep logging from dominating the measurement
+
+    logging.getLogger('GUM Dispenser').setLevel(logging.WARNING)
+
+    expected_declarations = arguments_received.classes * (arguments_received.methods + 2)
+
+    for shared_signatures, workload_name in [(False, 'Distinct signatures (same output, like for like)'),
+                                             (True, 'Shared signatures (tokenize merges repeated methods)')]:
+
+        with tempfile.TemporaryDirectory() as module_dir:
+
+            module_text = make_module_text(arguments_received.classes, arguments_received.methods, shared_signatures)
+
+            with open(str(Path(module_dir).joinpath('generated.py')), 'w') as module_file:
+
+                module_file.write(module_text)
+
+            print(workload_name + ': ' + str(len(module_text)) + ' bytes, ' + str(expected_declarations) +
+                  ' declarations')
+
+            engine_times = {}
+
+            for engine in ['tokenize', 'ast']:
+
+                engine_times[engine], module_data = time_engine(engine, Path(module_dir), arguments_received.repeats)
+
+                print('{:<10}{:>10.4f}s  {:>8} declarations found'.format(
+                    engine, engine_times[engine], count_declarations(module_data['declarations'])))
+
+            print('Speedup: {:.1f}x'.format(engine_times['tokenize'] / engine_times['ast']))
+
+            print()
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,297 @@
+
+import argparse
+
+import json
+
+import platform
+
+import sys
+
+import tempfile
+
+import time
+
+import tracemalloc
+
+from pathlib import Path
+
+import logging
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup, DEFAULT_SETUP_SIZE_LIMIT
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from benchmark.synthetic_project import generate_synthetic_project, SETUP_SHAPES
+
+
+# Time each phase of GUM Dispenser on synthetic projects and compare against earlier reports
+# Run from the src directory: python -m benchmark.run_benchmarks --output report.json
+
+REPORT_VERSION = 1
+
+# Metrics compared between reports. Lower is better for all of them
+
+COMPARED_METRICS = ['parse_setup_seconds', 'describe_project_seconds', 'generate_seconds',
+                    'parse_setup_peak_bytes', 'describe_project_peak_bytes', 'generate_peak_bytes']
+
+# Settings that change the measured work, so reports are only compared when they match.
+# Skipping the memory runs only leaves the peak metrics empty, and empty metrics are not compared
+
+MATCHED_SETTINGS = ['declarations', 'nesting_depth', 'import_fan_out', 'setup_shape', 'package_count', 'workers',
+                    'engine']
+
+
+def measure_phase(phase_function: 'Callable', track_memory: bool) -> tuple:
+    """Run one phase and return (result, seconds, peak traced bytes)
+    Timing comes from a run without tracemalloc, which would otherwise slow the phase down"""
+
+    start_time = time.perf_counter()
+
+    phase_result = phase_function()
+
+    elapsed_time = time.perf_counter() - start_time
+
+    peak_bytes = None
+
+    if track_memory:
+
+        tracemalloc.start()
+
+        phase_function()
+
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.stop()
+
+    return phase_result, elapsed_time, peak_bytes
+
+
+def benchmark_scale(module_count: int, settings: dict) -> dict:
+    """Generate a project with module_count modules and measure every phase on it"""
+
+    with tempfile.TemporaryDirectory() as project_dir:
+
+        project_info = generate_synthetic_project(project_dir, module_count, settings['declarations'],
+                                                  settings['nesting_depth'], settings['import_fan_out'],
+                                                  settings['setup_shape'], settings['package_count'])
+
+        project_path = Path(project_dir).resolve()
+
+        # Generated setup files list every module, so they are often larger than the default size limit.
+        # Raise the limit to the file's size so the whole file is timed and the size check never prompts
+
+        setup_size_limit = max(DEFAULT_SETUP_SIZE_LIMIT, project_path.joinpath('setup.py').stat().st_size)
+
+        scale_result = {'modules': module_count}
+
+        distro_defs, scale_result['parse_setup_seconds'], scale_result['parse_setup_peak_bytes'] = \
+            measure_phase(lambda: parse_setup(str(project_path), size_limit=setup_size_limit), settings['track_memory'])
+
+        uml_data, scale_result['describe_project_seconds'], scale_result['describe_project_peak_bytes'] = \
+            measure_phase(lambda: describe_project(distro_defs, project_path, workers=settings['workers'],
+                                                   scan_options={'engine': settings['engine']}),
+                          settings['track_memory'])
+
+        project_nomnoml, scale_result['generate_seconds'], scale_result['generate_peak_bytes'] = \
+            measure_phase(lambda: generate_project_nomnoml(uml_data, distro_defs['entry_points']),
+                          settings['track_memory'])
+
+        scale_result['source_bytes'] = sum(module_path.stat().st_size for module_path in
+                                           project_path.rglob('*.py'))
+
+        scale_result['output_bytes'] = len(project_nomnoml)
+
+        scale_result['package_count'] = len(project_info['package_names'])
+
+    return scale_result
+
+
+def report_mismatches(baseline_report: dict, current_report: dict) -> list:
+    """List the report version and MATCHED_SETTINGS that differ between two reports, as readable lines"""
+
+    mismatches = []
+
+    if baseline_report.get('version') != current_report.get('version'):
+
+        mismatches.append('version: ' + str(baseline_report.get('version')) + ' != ' +
+                          str(current_report.get('version')))
+
+    baseline_settings = baseline_report.get('settings', {})
+
+    current_settings = current_report.get('settings', {})
+
+    for setting in MATCHED_SETTINGS:
+
+        if baseline_settings.get(setting) != current_settings.get(setting):
+
+            mismatches.append(setting + ': ' + str(baseline_settings.get(setting)) + ' != ' +
+                              str(current_settings.get(setting)))
+
+    return mismatches
+
+
+def compare_reports(baseline_report: dict, current_report: dict, tolerance: float) -> list:
+    """List every metric that got worse than the baseline by more than the tolerance fraction
+    Scales are matched by module count. Raises ValueError if the reports were made with different settings"""
+
+    mismatches = report_mismatches(baseline_report, current_report)
+
+    if len(mismatches) > 0:
+
+        raise ValueError('Reports were made with different settings, ' + ', '.join(mismatches))
+
+    regressions = []
+
+    baseline_results = {scale_result['modules']: scale_result for scale_result in baseline_report['results']}
+
+    for scale_result in current_report['results']:
+
+        if scale_result['modules'] not in baseline_results:
+
+            continue
+
+        baseline_result = baseline_results[scale_result['modules']]
+
+        for metric in COMPARED_METRICS:
+
+            if baseline_result.get(metric) is None or scale_result.get(metric) is None:
+
+                continue
+
+            if scale_result[metric] > baseline_result[metric] * (1 + tolerance):
+
+                regressions.append({'modules': scale_result['modules'], 'metric': metric,
+                                    'baseline': baseline_result[metric], 'current': scale_result[metric]})
+
+    return regressions
+
+
+def format_results(report: dict) -> str:
+    """Format a report as a table"""
+
+    report_lines = ['{:>8} {:>12} {:>12} {:>12} {:>14} {:>14}'.format('modules', 'setup s', 'describe s',
+                                                                       'generate s', 'describe peak', 'output bytes')]
+
+    for scale_result in report['results']:
+
+        describe_peak = scale_result['describe_project_peak_bytes']
+
+        report_lines.append('{:>8} {:>12.4f} {:>12.4f} {:>12.4f} {:>14} {:>14}'.format(
+            scale_result['modules'], scale_result['parse_setup_seconds'], scale_result['describe_project_seconds'],
+            scale_result['generate_seconds'], '-' if describe_peak is None else describe_peak,
+            scale_result['output_bytes']))
+
+    return '\n'.join(report_lines)
+
+
+def define_arguments() -> 'ArgumentParser':
+    """Define command line arguments for the benchmark suite"""
+
+    arg_parser = argparse.ArgumentParser(description='Benchmark GUM Dispenser on synthetic projects')
+
+    arg_parser.add_argument('--scales', default='10,1000,10000',
+                            help='Comma separated module counts to benchmark. Default is 10,1000,10000')
+
+    arg_parser.add_argument('--declarations', type=int, default=10, help='Top level declarations per module')
+
+    arg_parser.add_argument('--nesting-depth', type=int, default=2, help='Depth of nested classes')
+
+    arg_parser.add_argument('--import-fan-out', type=int, default=3,
+                            help='Standard library and sibling imports per module')
+
+    arg_parser.add_argument('--setup-shape', choices=SETUP_SHAPES, default='packages',
+                            help='What setup.py declares. Default is packages')
+
+    arg_parser.add_argument('--package-count', type=int, default=4, help='Packages for the multi_package shape')
+
+    arg_parser.add_argument('--workers', type=int, default=1, help='Worker processes for describe_project')
+
+    arg_parser.add_argument('--engine', choices=['tokenize', 'ast'], default='tokenize', help='Scanning engine')
+
+    arg_parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak memory runs')
+
+    arg_parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+
+    arg_parser.add_argument('--compare', default=None, help='Compare against an earlier JSON report')
+
+    arg_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed fractional slowdown before a metric counts as a regression')
+
+    return arg_parser
+
+
+def main():
+
+    arguments_received = define_arguments().parse_args()
+
+    # Keep logging from dominating the measurement
+
+    logging.getLogger('GUM Dispenser').setLevel(logging.WARNING)
+
+    settings = {'declarations': arguments_received.declarations,
+                'nesting_depth': arguments_received.nesting_depth,
+                'import_fan_out': arguments_received.import_fan_out,
+                'setup_shape': arguments_received.setup_shape,
+                'package_count': arguments_received.package_count,
+                'workers': arguments_received.workers,
+                'engine': arguments_received.engine,
+                'track_memory': not arguments_received.no_memory}
+
+    report = {'version': REPORT_VERSION, 'python': platform.python_version(), 'platform': platform.platform(),
+              'settings': settings, 'results': []}
+
+    for module_count in [int(scale) for scale in arguments_received.scales.split(',')]:
+
+        print('Benchmarking ' + str(module_count) + ' modules...', file=sys.stderr)
+
+        report['results'].append(benchmark_scale(module_count, settings))
+
+    print(format_results(report))
+
+    if arguments_received.output is not None:
+
+        with open(arguments_received.output, 'w') as report_file:
+
+            json.dump(report, report_file, indent=2)
+
+    if arguments_received.compare is not None:
+
+        with open(arguments_received.compare, 'r') as baseline_file:
+
+            baseline_report = json.load(baseline_file)
+
+        try:
+
+            regressions = compare_reports(baseline_report, report, arguments_received.tolerance)
+
+        except ValueError as err:
+
+            print('Refusing to compare against ' + arguments_received.compare + '. ' + str(err), file=sys.stderr)
+
+            sys.exit(2)
+
+        baseline_scales = {scale_result['modules'] for scale_result in baseline_report['results']}
+
+        for scale_result in report['results']:
+
+            if scale_result['modules'] not in baseline_scales:
+
+                print('Warning: ' + arguments_received.compare + ' has no results for ' +
+                      str(scale_result['modules']) + ' modules, so they were not compared', file=sys.stderr)
+
+        for regression in regressions:
+
+            print('REGRESSION at {modules} modules: {metric} {baseline} -> {current}'.format(**regression))
+
+        if len(regressions) > 0:
+
+            sys.exit(1)
+
+        print('No regressions against ' + arguments_received.compare)
+
+
+if __name__ == '__main__':
+
+    main()
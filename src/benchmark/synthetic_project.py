@@ -0,0 +1,168 @@
+
+import random
+
+from pathlib import Path
+
+
+# Build synthetic source projects of any size for benchmarking GUM Dispenser
+
+SETUP_SHAPES = ['packages', 'modules', 'multi_package']
+
+STANDARD_IMPORTS = ['os', 'sys', 're', 'json', 'logging', 'collections', 'itertools', 'functools', 'pathlib',
+                    'typing']
+
+
+def write_module(module_path: 'Path', module_name: str, sibling_names: list, package_name: str,
+                 declaration_count: int, nesting_depth: int, import_fan_out: int, rng: 'random.Random') -> None:
+    """Write one synthetic module with imports, classes, functions and nested declarations"""
+
+    module_lines = ['"""Synthetic module ' + module_name + '"""', '']
+
+    # Standard library imports followed by imports of other modules in the same package
+
+    for import_name in rng.sample(STANDARD_IMPORTS, min(import_fan_out, len(STANDARD_IMPORTS))):
+
+        module_lines.append('import ' + import_name)
+
+    internal_candidates = [sibling for sibling in sibling_names if sibling != module_name]
+
+    for sibling in rng.sample(internal_candidates, min(import_fan_out, len(internal_candidates))):
+
+        if package_name is None:
+
+            module_lines.append('import ' + sibling)
+
+        else:
+
+            module_lines.append('from ' + package_name + ' import ' + sibling)
+
+    module_lines.append('')
+
+    for declaration_index in range(declaration_count):
+
+        module_lines.append('')
+
+        # Alternate between classes holding nested declarations and plain functions
+
+        if declaration_index % 2 == 0:
+
+            module_lines.extend(nested_declaration_lines('Generated' + str(declaration_index), nesting_depth, 0))
+
+        else:
+
+            module_lines.append('def function_' + str(declaration_index) + '(argument: int, other: str = "x",')
+            module_lines.append('        *remaining) -> int:')
+            module_lines.append('    # Ordinary statements between declarations')
+            module_lines.append('    total = argument + len(other)')
+            module_lines.append('    return total')
+
+    module_lines.append('')
+
+    with open(str(module_path), 'w') as module_file:
+
+        module_file.write('\n'.join(module_lines))
+
+
+def nested_declaration_lines(class_name: str, nesting_depth: int, indent_level: int) -> list:
+    """Build a class whose methods nest further classes down to the requested depth"""
+
+    indent = '    ' * indent_level
+
+    declaration_lines = [indent + 'class ' + class_name + '(object):', '',
+                         indent + '    def __init__(self, value: int = 0) -> None:',
+                         indent + '        self.value = value', '',
+                         indent + '    def describe(self) -> str:',
+                         indent + '        return str(self.value)']
+
+    if nesting_depth > 1:
+
+        declaration_lines.append('')
+
+        declaration_lines.extend(nested_declaration_lines(class_name + 'Inner', nesting_depth - 1, indent_level + 1))
+
+    return declaration_lines
+
+
+def write_setup(setup_dir: 'Path', setup_shape: str, package_names: list, module_names: list) -> None:
+    """Write a setup.py declaring either packages or top level modules"""
+
+    setup_lines = ['from setuptools import setup', '', 'setup(', "    name='synthetic',", "    version='0.1',"]
+
+    if setup_shape == 'modules':
+
+        setup_lines.append('    modules=[' + ', '.join("'" + module_name + "'" for module_name in module_names) +
+                           '],')
+
+        entry_point = module_names[0] + ':function_1'
+
+    else:
+
+        setup_lines.append('    packages=[' + ', '.join("'" + package_name + "'" for package_name in package_names) +
+                           '],')
+
+        entry_point = package_names[0] + '.' + module_names[0] + ':function_1'
+
+    setup_lines.extend(['    entry_points={', "        'console_scripts': [",
+                        "            'synthetic = " + entry_point + "'", '        ]', '    }', ')', ''])
+
+    with open(str(setup_dir.joinpath('setup.py')), 'w') as setup_file:
+
+        setup_file.write('\n'.join(setup_lines))
+
+
+def generate_synthetic_project(root_dir: str, module_count: int, declaration_count: int = 10,
+                               nesting_depth: int = 2, import_fan_out: int = 3, setup_shape: str = 'packages',
+                               package_count: int = 4, seed: int = 0) -> dict:
+    """Write a synthetic project under root_dir and describe what was written
+    setup_shape is one of SETUP_SHAPES. Modules are spread evenly over package_count packages
+    for the multi_package shape, or placed in one package or at the top level otherwise"""
+
+    if setup_shape not in SETUP_SHAPES:
+
+        raise ValueError('Unknown setup shape ' + setup_shape)
+
+    rng = random.Random(seed)
+
+    root_path = Path(root_dir)
+
+    module_names = ['module_' + str(module_index) for module_index in range(module_count)]
+
+    if setup_shape == 'modules':
+
+        package_names = []
+
+        for module_name in module_names:
+
+            write_module(root_path.joinpath(module_name + '.py'), module_name, module_names, None,
+                         declaration_count, nesting_depth, import_fan_out, rng)
+
+    else:
+
+        if setup_shape == 'packages':
+
+            package_count = 1
+
+        package_names = ['synthetic_' + str(package_index) for package_index in range(package_count)]
+
+        for package_index, package_name in enumerate(package_names):
+
+            package_path = root_path.joinpath(package_name)
+
+            package_path.mkdir(parents=True, exist_ok=True)
+
+            package_modules = module_names[package_index::package_count]
+
+            with open(str(package_path.joinpath('__init__.py')), 'w') as init_file:
+
+                init_file.write('__all__ = [' + ', '.join("'" + module_name + "'" for module_name in
+                                                          package_modules) + ']\n')
+
+            for module_name in package_modules:
+
+                write_module(package_path.joinpath(module_name + '.py'), module_name, package_modules,
+                             package_name, declaration_count, nesting_depth, import_fan_out, rng)
+
+    write_setup(root_path, setup_shape, package_names, module_names)
+
+    return {'root': str(root_path), 'package_names': package_names, 'module_count': module_count,
+            'setup_shape': setup_shape}
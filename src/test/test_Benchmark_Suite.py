@@ -0,0 +1,116 @@
+
+import unittest
+
+from pathlib import Path
+
+import tempfile
+
+from unittest.mock import patch, Mock
+
+from benchmark.synthetic_project import generate_synthetic_project
+
+from benchmark.run_benchmarks import benchmark_scale, compare_reports
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_generate_synthetic_project(self):
+        """Test benchmark.synthetic_project.generate_synthetic_project"""
+
+        for setup_shape, expected_key in [('packages', 'package_names'), ('multi_package', 'package_names'),
+                                          ('modules', 'module_names')]:
+
+            with tempfile.TemporaryDirectory() as project_dir:
+
+                generate_synthetic_project(project_dir, 6, declaration_count=3, nesting_depth=3,
+                                           setup_shape=setup_shape, package_count=2)
+
+                distro_defs = parse_setup(project_dir)
+
+                self.assertTrue(expected_key in distro_defs)
+
+                self.assertEqual(1, len(distro_defs['entry_points']))
+
+                uml_data = describe_project(distro_defs, Path(project_dir).resolve())
+
+            if setup_shape == 'modules':
+
+                module_data = uml_data['modules']['module_0']
+
+            else:
+
+                self.assertEqual(distro_defs['package_names'], list(uml_data['packages']))
+
+                module_data = uml_data['packages'][distro_defs['package_names'][0]]['modules']['module_0']
+
+            self.assertTrue('def function_1(argument: int, other: str = "x", *remaining) -> int' in
+                            module_data['declarations'])
+
+            self.assertTrue(len(module_data['dependencies']) > 3)
+
+
+    def test_benchmark_scale(self):
+        """Test benchmark.run_benchmarks.benchmark_scale and compare_reports"""
+
+        settings = {'declarations' : 2, 'nesting_depth' : 2, 'import_fan_out' : 2, 'setup_shape' : 'packages',
+                    'package_count' : 1, 'workers' : 1, 'engine' : 'ast', 'track_memory' : True}
+
+        scale_result = benchmark_scale(3, settings)
+
+        self.assertEqual(3, scale_result['modules'])
+
+        self.assertTrue(scale_result['describe_project_peak_bytes'] > 0)
+
+        # Only metrics that grow past the tolerance are reported
+
+        baseline_report = {'version' : 1, 'settings' : settings, 'results' : [dict(scale_result)]}
+
+        current_report = {'version' : 1, 'settings' : dict(settings, track_memory=False),
+                          'results' : [dict(scale_result)]}
+
+        current_report['results'][0]['generate_seconds'] = scale_result['generate_seconds'] * 2 + 1
+
+        self.assertEqual([], compare_reports(baseline_report, baseline_report, 0.25))
+
+        regressions = compare_reports(baseline_report, current_report, 0.25)
+
+        self.assertEqual(['generate_seconds'], [regression['metric'] for regression in regressions])
+
+        # Reports measuring different work are not compared
+
+        for changed_setting in [{'setup_shape' : 'modules'}, {'engine' : 'tokenize'}, {'declarations' : 3}]:
+
+            with self.assertRaises(ValueError):
+
+                compare_reports(baseline_report, dict(current_report, settings=dict(settings, **changed_setting)),
+                                0.25)
+
+
+    def test_benchmark_scale_large_setup(self):
+        """Test benchmark.run_benchmarks.benchmark_scale reads a setup.py over the size limit without prompting"""
+
+        settings = {'declarations' : 1, 'nesting_depth' : 1, 'import_fan_out' : 1, 'setup_shape' : 'modules',
+                    'package_count' : 1, 'workers' : 1, 'engine' : 'tokenize', 'track_memory' : False}
+
+        with patch('builtins.input', new=Mock(side_effect=AssertionError('prompted'))), \
+                patch('GUM_Dispenser.GUM_setup_parser.sys.stdin', new=Mock(isatty=Mock(return_value=True))):
+
+            scale_result = benchmark_scale(200, settings)
+
+        self.assertEqual(200, scale_result['modules'])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
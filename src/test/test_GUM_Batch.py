@@ -0,0 +1,125 @@
+
+import unittest
+
+from pathlib import Path
+
+import tempfile
+
+from GUM_Dispenser.GUM_Batch import read_batch_manifest, run_batch, format_batch_summary
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+from benchmark.synthetic_project import generate_synthetic_project
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMBatch(unittest.TestCase):
+
+    def setUp(self):
+
+        self.batch_context = tempfile.TemporaryDirectory()
+
+        self.batch_dir = Path(self.batch_context.name)
+
+
+    def tearDown(self):
+
+        self.batch_context.cleanup()
+
+
+    def test_read_batch_manifest(self):
+        """Test GUM_Dispenser.GUM_Batch.read_batch_manifest"""
+
+        manifest_path = self.batch_dir.joinpath('projects.txt')
+
+        with open(str(manifest_path), 'w') as manifest_file:
+
+            manifest_file.write('# Projects to describe\n\nfirst\n"second project" /tmp/setup.py\n')
+
+        self.assertEqual([{'path' : str(self.batch_dir.joinpath('first')), 'setup_file' : None},
+                          {'path' : str(self.batch_dir.joinpath('second project')), 'setup_file' : '/tmp/setup.py'}],
+                         read_batch_manifest(str(manifest_path)))
+
+        with open(str(manifest_path), 'w') as manifest_file:
+
+            manifest_file.write('first setup.py extra\n')
+
+        with self.assertRaises(ValueError):
+
+            read_batch_manifest(str(manifest_path))
+
+
+    def test_run_batch(self):
+        """Test GUM_Dispenser.GUM_Batch.run_batch writes one diagram per project and isolates failures"""
+
+        batch_projects = []
+
+        expected_nomnoml = []
+
+        for project_index, setup_shape in enumerate(['packages', 'modules']):
+
+            project_path = self.batch_dir.joinpath('project')
+
+            if project_index > 0:
+
+                project_path = self.batch_dir.joinpath('other').joinpath('project')
+
+            project_path.mkdir(parents=True)
+
+            generate_synthetic_project(str(project_path), 4 + project_index, setup_shape=setup_shape,
+                                       seed=project_index)
+
+            distro_defs = parse_setup(str(project_path), 'accept')
+
+            expected_nomnoml.append(generate_project_nomnoml(describe_project(distro_defs, project_path),
+                                                             distro_defs['entry_points']))
+
+            batch_projects.append({'path' : str(project_path), 'setup_file' : None})
+
+            # A missing project sits between the good ones
+
+            if project_index == 0:
+
+                batch_projects.append({'path' : str(self.batch_dir.joinpath('missing')), 'setup_file' : None})
+
+        for workers in [1, 2]:
+
+            output_dir = str(self.batch_dir.joinpath('output_' + str(workers)))
+
+            with self.assertLogs(logger='GUM Dispenser', level='ERROR'):
+
+                batch_results = run_batch(batch_projects, output_dir, workers=workers)
+
+            self.assertEqual(['ok', 'failed', 'ok'], [batch_result['status'] for batch_result in batch_results])
+
+            self.assertTrue('NotADirectoryError' in batch_results[1]['error'])
+
+            # Projects sharing a directory name get numbered output files
+
+            self.assertEqual(['project.nomnoml', 'missing.nomnoml', 'project_2.nomnoml'],
+                             [Path(batch_result['output']).name for batch_result in batch_results])
+
+            for batch_result, project_nomnoml in zip([batch_results[0], batch_results[2]], expected_nomnoml):
+
+                with open(batch_result['output'], 'r') as output_file:
+
+                    self.assertEqual(project_nomnoml, output_file.read())
+
+            self.assertEqual([4, 0, 5], [batch_result['modules'] for batch_result in batch_results])
+
+            self.assertTrue('2 of 3 projects succeeded' in format_batch_summary(batch_results))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,120 @@
+
+import unittest
+
+from pathlib import Path
+
+import sys
+
+import tempfile
+
+from GUM_Dispenser.GUM_Describe_AST import scan_module_ast, strip_line_comment
+
+from GUM_Dispenser.GUM_Describe_Source import describe_module
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMDescribeAST(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_pkg_dir = Path(sys.modules[__name__].__file__)
+
+        self.base_pkg_dir = self.base_pkg_dir.resolve().parent.parent.joinpath('GUM_Dispenser')
+
+
+    def test_strip_line_comment(self):
+        """Test GUM_Dispenser.GUM_Describe_AST.strip_line_comment"""
+
+        self.assertEqual('def run(): ', strip_line_comment('def run(): # Entry'))
+
+        self.assertEqual("def run(mark='#'):", strip_line_comment("def run(mark='#'):"))
+
+        self.assertEqual('def run(mark="\\"#"): ', strip_line_comment('def run(mark="\\"#"): # Entry'))
+
+
+    def test_matches_tokenize_engine(self):
+        """Test the ast engine agrees with the tokenize engine on single line declarations"""
+
+        for module_name in ['GUM_Exceptions', 'GUM_Dispenser_Main']:
+
+            tokenize_data = describe_module('GUM_Dispenser', module_name, self.base_pkg_dir,
+                                            {'packages' : {'GUM_Dispenser' : {'modules' : {}}}})
+
+            ast_data = describe_module('GUM_Dispenser', module_name, self.base_pkg_dir,
+                                       {'packages' : {'GUM_Dispenser' : {'modules' : {}}}}, {'engine' : 'ast'})
+
+            self.assertEqual(tokenize_data, ast_data)
+
+
+    def test_scan_module_ast(self):
+        """Test GUM_Dispenser.GUM_Describe_AST.scan_module_ast"""
+
+        module_bytes = b'\n'.join([b'import os, sys',
+                                   b'from pkg.sibling import helper as first',
+                                   b'from . import other',
+                                   b'',
+                                   b'class First:',
+                                   b'    def __init__(self):',
+                                   b'        pass',
+                                   b'',
+                                   b'class Second(',
+                                   b'        First):  # Multiline',
+                                   b'',
+                                   b'    """Docstring"""',
+                                   b'',
+                                   b'    def __init__(self):',
+                                   b'        import xml.etree as first',
+                                   b'',
+                                   b'def one_line(): return 1',
+                                   b''])
+
+        with self.assertLogs(logger='GUM Dispenser', level='ERROR') as log_context:
+
+            module_data = scan_module_ast(module_bytes, 'pkg', 'module').as_dict()
+
+        self.assertTrue('You used the same import alias twice' in log_context.output[0])
+
+        # Every imported name counts, and internal imports are named by module
+
+        self.assertEqual(['os', 'sys', 'sibling', 'other', 'xml'], module_data['dependencies'])
+
+        # Duplicate signatures are nested under their own classes
+
+        self.assertEqual({'class First' : {'current_scope_name' : 'First',
+                                           'def __init__(self)' : {'current_scope_name' : '__init__'}},
+                          'class Second( First)' : {'current_scope_name' : 'Second',
+                                                    'def __init__(self)' : {'current_scope_name' : '__init__'}},
+                          'def one_line()' : {'current_scope_name' : 'one_line'}},
+                         module_data['declarations'])
+
+        self.assertRaises(SyntaxError, scan_module_ast, b'def broken(:\n', 'pkg', 'module')
+
+
+    def test_describe_module_fallback(self):
+        """Test describe_module falls back to the tokenize engine for code that does not compile"""
+
+        with tempfile.TemporaryDirectory() as module_dir:
+
+            with open(str(Path(module_dir).joinpath('broken.py')), 'w') as module_file:
+
+                module_file.write('import os\n\ndef broken():\n    value = = 1\n')
+
+            with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+                module_data = describe_module('None', 'broken', Path(module_dir), {'modules' : {}},
+                                              {'engine' : 'ast'})
+
+        self.assertTrue(any('Falling back to the tokenize engine' in message for message in log_context.output))
+
+        self.assertEqual(['os'], module_data['modules']['broken']['dependencies'])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
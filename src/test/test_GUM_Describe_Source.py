@@ -9,12 +9,22 @@ from GUM_Dispenser.GUM_Exceptions import SourceModuleNotFoundError, PackageNotFo
 
 from GUM_Dispenser.GUM_Describe_Source import check_init_file, ensure_modules_exist, describe_module, describe_package
 
-from GUM_Dispenser.GUM_Describe_Source import describe_project
+from GUM_Dispenser.GUM_Describe_Source import describe_project, scan_module_tokens
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
 
 from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
 
 import sys
 
+import os
+
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark.synthetic_project import generate_synthetic_project
+
 
 def setUpModule():
 
@@ -113,7 +123,7 @@ class TestGUMDescribeSource(unittest.TestCase):
         self.assertTrue('GUM_Exceptions' in module_data['dependencies'])
 
         self.assertTrue('def describe_module(current_package : str, current_module : str, package_path : \'Path\', ' +
-                        'current_data_dict : dict)' in module_data['declarations'])
+                        'current_data_dict : dict, scan_options: dict = None)' in module_data['declarations'])
 
 
         # Ensure functionality is preserved if not identified as part of a package
@@ -130,7 +140,7 @@ class TestGUMDescribeSource(unittest.TestCase):
         self.assertTrue('GUM_Dispenser' in module_data['dependencies'])
 
         self.assertTrue('def describe_module(current_package : str, current_module : str, package_path : \'Path\', ' +
-                        'current_data_dict : dict)' in module_data['declarations'])
+                        'current_data_dict : dict, scan_options: dict = None)' in module_data['declarations'])
 
 
         # Test bad import aliasing: reusing an alias
@@ -148,6 +158,19 @@ class TestGUMDescribeSource(unittest.TestCase):
         self.assertTrue('You used the same import alias twice for two different imports...' in log_context.output[0])
 
 
+    def test_multiline_scope_name(self):
+        """Test declarations split over several lines are named after their function or class"""
+
+        module_info = scan_module_tokens(b'class Tool(\n        object):\n    def run(self,\n            fast):\n' +
+                                         b'        pass\n', 'None', 'multiline')
+
+        tool_declaration = module_info.get_declaration('class Tool( object)')
+
+        self.assertEqual('Tool', tool_declaration.scope_name)
+
+        self.assertEqual('run', tool_declaration.get_declaration('def run(self, fast)').scope_name)
+
+
 
 
     def test_describe_package(self):
@@ -214,7 +237,121 @@ class TestGUMDescribeSource(unittest.TestCase):
         self.assertTrue('GUM_Dispenser' in module_data['dependencies'])
 
         self.assertTrue('def describe_module(current_package : str, current_module : str, package_path : \'Path\', ' +
-                        'current_data_dict : dict)' in module_data['declarations'])
+                        'current_data_dict : dict, scan_options: dict = None)' in module_data['declarations'])
+
+
+    def test_describe_project_listed_subpackage(self):
+        """Test describe_project keeps a subpackage listed in setup.py that its parent's __all__ leaves out"""
+
+        with tempfile.TemporaryDirectory() as project_dir:
+
+            package_dir = Path(project_dir).joinpath('pkg')
+
+            package_dir.joinpath('sub').mkdir(parents=True)
+
+            for module_path, module_text in [('__init__.py', "__all__ = ['a']\n"), ('a.py', 'import os\n'),
+                                             ('sub/__init__.py', ''), ('sub/b.py', 'import sys\n')]:
+
+                package_dir.joinpath(module_path).write_text(module_text)
+
+            test_distro_defs = {'package_names' : ['pkg', 'pkg.sub']}
+
+            for workers in [1, 2]:
+
+                uml_data = describe_project(test_distro_defs, project_dir, workers=workers)
+
+                self.assertEqual(['pkg', 'pkg.sub'], list(uml_data['packages']))
+
+                self.assertEqual(['a'], list(uml_data['packages']['pkg']['modules']))
+
+                self.assertEqual(['__init__', 'b'], list(uml_data['packages']['pkg.sub']['modules']))
+
+            # A parent that includes the subpackage describes it once, as part of itself
+
+            package_dir.joinpath('__init__.py').write_text("__all__ = ['a', 'sub']\n")
+
+            uml_data = describe_project(test_distro_defs, project_dir)
+
+            self.assertEqual(['pkg'], list(uml_data['packages']))
+
+            self.assertEqual(['a', 'sub.__init__', 'sub.b'], list(uml_data['packages']['pkg']['modules']))
+
+
+    def test_describe_project_workers(self):
+        """Test GUM_Dispenser.GUM_Describe_Source.describe_project with a process pool"""
+
+        # Parallel scanning must produce the same data in the same order as the serial path
+
+        test_distro_defs = {'package_names' : ['GUM_Dispenser']}
+
+        serial_data = describe_project(test_distro_defs, self.base_pkg_dir.parent)
+
+        parallel_data = describe_project(test_distro_defs, self.base_pkg_dir.parent, workers=2)
+
+        self.assertEqual(serial_data, parallel_data)
+
+        self.assertEqual(list(serial_data['packages']['GUM_Dispenser']['modules']),
+                         list(parallel_data['packages']['GUM_Dispenser']['modules']))
+
+        self.assertEqual(generate_project_nomnoml(serial_data, []), generate_project_nomnoml(parallel_data, []))
+
+
+        # Unpackaged modules are merged the same way
+
+        test_distro_defs = {'module_names': ['GUM_Exceptions', 'GUM_Describe_Source']}
+
+        parallel_data = describe_project(test_distro_defs, self.base_pkg_dir, workers=2)
+
+        self.assertEqual(['GUM_Exceptions', 'GUM_Describe_Source'], list(parallel_data['modules']))
+
+        self.assertEqual(describe_project(test_distro_defs, self.base_pkg_dir), parallel_data)
+
+
+    def test_describe_project_threads(self):
+        """Test describe_project and generate_project_nomnoml give serial results when run from many threads"""
+
+        with tempfile.TemporaryDirectory() as projects_dir:
+
+            # Projects of different shapes and sizes, plus our own source given as a string path
+
+            project_jobs = [({'package_names' : ['GUM_Dispenser']}, str(self.base_pkg_dir.parent))]
+
+            for project_index, setup_shape in enumerate(['packages', 'modules', 'multi_package'] * 2):
+
+                project_path = Path(projects_dir).joinpath('project_' + str(project_index))
+
+                project_path.mkdir()
+
+                project_info = generate_synthetic_project(str(project_path), 5 + project_index, setup_shape=setup_shape,
+                                                          package_count=2, seed=project_index)
+
+                if setup_shape == 'modules':
+
+                    distro_defs = {'module_names' : ['module_' + str(module_index) for module_index in
+                                                     range(project_info['module_count'])]}
+
+                else:
+
+                    distro_defs = {'package_names' : project_info['package_names']}
+
+                project_jobs.append((distro_defs, project_path))
+
+            def describe_and_generate(project_job: tuple) -> str:
+
+                return generate_project_nomnoml(describe_project(*project_job), [])
+
+            serial_output = [describe_and_generate(project_job) for project_job in project_jobs]
+
+            working_directory = os.getcwd()
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+
+                threaded_output = list(executor.map(describe_and_generate, project_jobs * 4))
+
+            self.assertEqual(serial_output * 4, threaded_output)
+
+            self.assertEqual(working_directory, os.getcwd())
+
 
 
 
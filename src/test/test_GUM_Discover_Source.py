@@ -0,0 +1,192 @@
+
+import unittest
+
+from unittest.mock import patch
+
+from pathlib import Path
+
+import os
+
+import tempfile
+
+from GUM_Dispenser.GUM_Discover_Source import discover_package_modules, list_source_directory, module_file_path
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Exceptions import SourceModuleNotFoundError
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+def write_source(source_path: 'Path', source_text: str = 'import os\n') -> None:
+    """Write a small source file, creating its directory if needed"""
+
+    source_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(str(source_path), 'w') as source_file:
+
+        source_file.write(source_text)
+
+
+class TestGUMDiscoverSource(unittest.TestCase):
+
+    def setUp(self):
+
+        self.project_context = tempfile.TemporaryDirectory()
+
+        self.project_dir = Path(self.project_context.name).resolve()
+
+        self.package_dir = self.project_dir.joinpath('pkg')
+
+        # pkg has no __all__, pkg.sub lists only some of its modules and pkg.data is not a package
+
+        write_source(self.package_dir.joinpath('__init__.py'), '')
+
+        write_source(self.package_dir.joinpath('alpha.py'), 'from pkg.sub import listed\n')
+
+        write_source(self.package_dir.joinpath('sub', '__init__.py'), "__all__ = ['listed', 'deeper']\n")
+
+        write_source(self.package_dir.joinpath('sub', 'listed.py'), 'def listed_function():\n    pass\n')
+
+        write_source(self.package_dir.joinpath('sub', 'unlisted.py'))
+
+        write_source(self.package_dir.joinpath('sub', 'deeper', '__init__.py'), '')
+
+        write_source(self.package_dir.joinpath('sub', 'deeper', 'bottom.py'))
+
+        write_source(self.package_dir.joinpath('data', 'loose.py'))
+
+        write_source(self.package_dir.joinpath('__pycache__', 'cached.py'))
+
+
+    def tearDown(self):
+
+        self.project_context.cleanup()
+
+
+    def test_discover_package_modules(self):
+        """Test GUM_Dispenser.GUM_Discover_Source.discover_package_modules"""
+
+        working_directory = os.getcwd()
+
+        self.assertEqual(['__init__', 'alpha', 'sub.listed', 'sub.deeper.__init__', 'sub.deeper.bottom'],
+                         discover_package_modules('pkg', self.package_dir))
+
+        self.assertEqual(working_directory, os.getcwd())
+
+        self.assertEqual(self.package_dir.joinpath('sub', 'deeper', 'bottom.py'),
+                         module_file_path(self.package_dir, 'sub.deeper.bottom'))
+
+
+        # Every directory is listed once, even when it is checked more than once
+
+        listing_cache = {}
+
+        with patch('GUM_Dispenser.GUM_Discover_Source.os.scandir', wraps=os.scandir) as scandir_mock:
+
+            discover_package_modules('pkg', self.package_dir, listing_cache)
+
+            discover_package_modules('pkg', self.package_dir, listing_cache)
+
+        scanned_directories = [scandir_call[0][0] for scandir_call in scandir_mock.call_args_list]
+
+        self.assertEqual(sorted(set(scanned_directories)), sorted(scanned_directories))
+
+        self.assertEqual(['__init__', 'listed', 'unlisted'],
+                         list_source_directory(str(self.package_dir.joinpath('sub')), listing_cache)['modules'])
+
+
+        # Names in __all__ must be modules or subpackages
+
+        write_source(self.package_dir.joinpath('sub', '__init__.py'), "__all__ = ['listed', 'missing']\n")
+
+        self.assertRaises(SourceModuleNotFoundError, discover_package_modules, 'pkg', self.package_dir)
+
+
+    def test_list_source_directory_errors(self):
+        """Test GUM_Dispenser.GUM_Discover_Source.list_source_directory skips directories it cannot read"""
+
+        loop_path = self.package_dir.joinpath('loop')
+
+        os.symlink(str(loop_path), str(loop_path))
+
+        with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+            self.assertEqual({'modules' : [], 'directories' : []}, list_source_directory(str(loop_path)))
+
+        self.assertTrue('Skipping directory' in log_context.output[0])
+
+
+        # An unreadable directory does not stop the walk
+
+        real_scandir = os.scandir
+
+        def scandir_denied(directory: str) -> 'Iterator':
+
+            if directory == str(self.package_dir.joinpath('data')):
+
+                raise PermissionError(13, 'Permission denied', directory)
+
+            return real_scandir(directory)
+
+        with patch('GUM_Dispenser.GUM_Discover_Source.os.scandir', new=scandir_denied), \
+                self.assertLogs(logger='GUM Dispenser', level='WARNING'):
+
+            self.assertEqual(['__init__', 'alpha', 'sub.listed', 'sub.deeper.__init__', 'sub.deeper.bottom'],
+                             discover_package_modules('pkg', self.package_dir))
+
+
+    def test_discover_package_modules_symlink_loop(self):
+        """Test GUM_Dispenser.GUM_Discover_Source.discover_package_modules walks each package directory once"""
+
+        # A link from the bottom of the tree back to the package itself would otherwise be walked until ELOOP
+
+        os.symlink(str(self.package_dir), str(self.package_dir.joinpath('sub', 'deeper', 'back')))
+
+        walked_packages = set()
+
+        with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+            self.assertEqual(['__init__', 'alpha', 'sub.listed', 'sub.deeper.__init__', 'sub.deeper.bottom'],
+                             discover_package_modules('pkg', self.package_dir, walked_packages=walked_packages))
+
+        self.assertEqual(1, len([log_line for log_line in log_context.output if 'already walked' in log_line]))
+
+        self.assertEqual({'pkg', 'pkg.sub', 'pkg.sub.deeper'}, walked_packages)
+
+
+    def test_describe_project_subpackages(self):
+        """Test describe_project scans subpackage modules with dotted names"""
+
+        # Listing a subpackage beside its parent does not describe it twice
+
+        test_distro_defs = {'package_names' : ['pkg', 'pkg.sub']}
+
+        uml_data = describe_project(test_distro_defs, self.project_dir)
+
+        self.assertEqual(['pkg'], list(uml_data['packages']))
+
+        self.assertEqual(['__init__', 'alpha', 'sub.listed', 'sub.deeper.__init__', 'sub.deeper.bottom'],
+                         list(uml_data['packages']['pkg']['modules']))
+
+        self.assertTrue('def listed_function()' in uml_data['packages']['pkg']['modules']['sub.listed']['declarations'])
+
+        self.assertEqual(uml_data, describe_project(test_distro_defs, self.project_dir, workers=2))
+
+
+        # A subpackage may also be described on its own
+
+        uml_data = describe_project({'package_names' : ['pkg.sub']}, self.project_dir)
+
+        self.assertEqual(['listed', 'deeper.__init__', 'deeper.bottom'],
+                         list(uml_data['packages']['pkg.sub']['modules']))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -3,7 +3,11 @@ import unittest
 
 from unittest.mock import patch, Mock, DEFAULT
 
-from GUM_Dispenser.GUM_Dispenser_Main import check_for_setup, dispense_gum, main, initialize_log
+from GUM_Dispenser.GUM_Dispenser_Main import dispense_gum, main, initialize_log, emit_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import LOG_HANDLER_NAME
+
+from GUM_Dispenser.GUM_setup_parser import check_for_setup
 
 from pathlib import Path
 
@@ -13,6 +17,31 @@ from GUM_Dispenser.GUM_Exceptions import UserConfirmedInvalidSetup
 
 import sys
 
+import tempfile
+
+import os
+
+import logging
+
+import subprocess
+
+
+# Budget for importing the command line entry point, as a multiple of the time to import argparse and logging
+# alone, so slower machines get a larger budget. Measured with -X importtime, argparse and logging take about
+# 30ms together. Importing the entry point takes about 35ms with the scanner, renderers and server deferred,
+# and about 170ms when it imports them up front. A budget of 2.5 times the baseline passes the first with room
+# for noisy timings and still fails the second
+
+IMPORT_TIME_RATIO = 2.5
+
+IMPORT_BASELINE_MODULES = ['argparse', 'logging']
+
+# Modules only needed once a project is scanned, rendered or served
+
+DEFERRED_MODULES = ['ast', 'concurrent.futures', 'http.server', 'GUM_Dispenser.GUM_setup_parser',
+                    'GUM_Dispenser.GUM_Describe_Source', 'GUM_Dispenser.GUM_Generate_NOMNOML',
+                    'GUM_Dispenser.GUM_Render', 'GUM_Dispenser.GUM_Serve']
+
 
 class TestGumDispenserMain(unittest.TestCase):
 
@@ -43,6 +72,16 @@ class TestGumDispenserMain(unittest.TestCase):
         self.assertTrue('INFO' in log_context.output[1])
 
 
+        # Repeated calls reuse one handler
+
+        initialize_log(test_arguments)
+
+        initialize_log(test_arguments)
+
+        self.assertEqual(1, len([handler for handler in logging.getLogger('GUM Dispenser').handlers
+                                 if handler.get_name() == LOG_HANDLER_NAME]))
+
+
 
     def test_check_for_setup(self):
         """Test GUM_Dispenser.GUM_Dispenser.check_for_setup"""
@@ -104,7 +143,7 @@ class TestGumDispenserMain(unittest.TestCase):
         test_arguments = {'path' : self.base_pkg_dir}
 
 
-        with patch('GUM_Dispenser.GUM_Dispenser_Main.check_for_setup', new=Mock(side_effect=ConfigurationNotFoundError)):
+        with patch('GUM_Dispenser.GUM_setup_parser.check_for_setup', new=Mock(side_effect=ConfigurationNotFoundError)):
 
             with self.assertLogs(logger='GUM Dispenser', level='ERROR') as log_context:
 
@@ -113,7 +152,7 @@ class TestGumDispenserMain(unittest.TestCase):
             self.assertTrue("We couldn't find a complete project definition" in log_context.output[0])
 
 
-        with patch('GUM_Dispenser.GUM_Dispenser_Main.check_for_setup', new=Mock(side_effect=PackageNotFoundError(
+        with patch('GUM_Dispenser.GUM_setup_parser.check_for_setup', new=Mock(side_effect=PackageNotFoundError(
                 'nonexistent'))):
 
             with self.assertLogs(logger='GUM Dispenser', level='ERROR') as log_context:
@@ -123,7 +162,7 @@ class TestGumDispenserMain(unittest.TestCase):
             self.assertTrue("The package nonexistent specified in your setup.py doesn't exist" in log_context.output[0])
 
 
-        with patch('GUM_Dispenser.GUM_Dispenser_Main.check_for_setup', new=Mock(side_effect=SourceModuleNotFoundError)):
+        with patch('GUM_Dispenser.GUM_setup_parser.check_for_setup', new=Mock(side_effect=SourceModuleNotFoundError)):
 
             with self.assertLogs(logger='GUM Dispenser', level='ERROR') as log_context:
 
@@ -132,7 +171,7 @@ class TestGumDispenserMain(unittest.TestCase):
             self.assertTrue("Missing or bad path for .py source file" in log_context.output[0])
 
 
-        with patch('GUM_Dispenser.GUM_Dispenser_Main.check_for_setup', new=Mock(side_effect=UserConfirmedInvalidSetup)):
+        with patch('GUM_Dispenser.GUM_setup_parser.check_for_setup', new=Mock(side_effect=UserConfirmedInvalidSetup)):
 
             with self.assertLogs(logger='GUM Dispenser', level='ERROR') as log_context:
 
@@ -141,7 +180,7 @@ class TestGumDispenserMain(unittest.TestCase):
             self.assertTrue("User requested program termination. Goodbye" in log_context.output[0])
 
 
-        with patch('GUM_Dispenser.GUM_Dispenser_Main.check_for_setup', new=Mock(side_effect=KeyError)):
+        with patch('GUM_Dispenser.GUM_setup_parser.check_for_setup', new=Mock(side_effect=KeyError)):
 
             with self.assertLogs(logger='GUM Dispenser', level='ERROR') as log_context:
 
@@ -150,20 +189,40 @@ class TestGumDispenserMain(unittest.TestCase):
             self.assertTrue("Error:" in log_context.output[0])
 
 
-        # Test that already checked functions are called as expected
+        # Test that already checked functions are called as expected. dispense_gum imports them when it runs,
+        # so they are patched in the modules that define them
 
-        with patch.multiple('GUM_Dispenser.GUM_Dispenser_Main', check_for_setup=DEFAULT, parse_setup=DEFAULT,
-                            describe_project=DEFAULT, generate_project_nomnoml=DEFAULT) as patched:
+        with patch.multiple('GUM_Dispenser.GUM_setup_parser', check_for_setup=DEFAULT, parse_setup=DEFAULT) as \
+                patched_setup, \
+                patch('GUM_Dispenser.GUM_Describe_Source.describe_project') as patched_describe, \
+                patch('GUM_Dispenser.GUM_Generate_NOMNOML.write_project_nomnoml') as patched_write:
 
             dispense_gum(test_arguments)
 
-            patched['check_for_setup'].assert_called_once()
+            patched_setup['check_for_setup'].assert_called_once()
+
+            patched_setup['parse_setup'].assert_called_once()
+
+            patched_describe.assert_called_once()
+
+            patched_write.assert_called_once()
+
+
+
+    def test_emit_nomnoml(self):
+        """Test GUM_Dispenser.GUM_Dispenser.emit_nomnoml"""
 
-            patched['parse_setup'].assert_called_once()
+        test_uml_data = {'modules' : {'only' : {'dependencies' : ['os'], 'declarations' : {}}}}
 
-            patched['describe_project'].assert_called_once()
+        with tempfile.TemporaryDirectory() as output_dir:
 
-            patched['generate_project_nomnoml'].assert_called_once()
+            output_path = os.path.join(output_dir, 'diagram.txt')
+
+            emit_nomnoml(test_uml_data, [], output_path)
+
+            with open(output_path, 'r') as output_file:
+
+                self.assertEqual('#.entry: fill=#8f8\n[only]\n[only]-->[os]\n\n\n', output_file.read())
 
 
 
@@ -178,8 +237,56 @@ class TestGumDispenserMain(unittest.TestCase):
             patched['dispense_gum'].assert_called_once()
 
 
+    def measure_import_times(self, import_statement: str) -> dict:
+        """Import in a fresh interpreter and get the cumulative microseconds of each module, best of three runs"""
+
+        import_times = {}
+
+        for _ in range(3):
+
+            import_result = subprocess.run([sys.executable, '-X', 'importtime', '-c', import_statement],
+                                           cwd=str(self.base_pkg_dir), stderr=subprocess.PIPE,
+                                           universal_newlines=True, check=True)
+
+            # Each line reads 'import time: self | cumulative | module', indented by nesting
+
+            for import_line in import_result.stderr.splitlines():
+
+                import_fields = import_line.split('|')
+
+                if len(import_fields) == 3 and import_fields[1].strip().isdigit():
+
+                    module_name = import_fields[2].strip()
+
+                    import_times[module_name] = min(int(import_fields[1]),
+                                                    import_times.get(module_name, int(import_fields[1])))
+
+        return import_times
+
+
+    def test_import_time(self):
+        """Test importing GUM_Dispenser.GUM_Dispenser_Main defers heavy modules and stays within budget"""
+
+        import_times = self.measure_import_times('import GUM_Dispenser.GUM_Dispenser_Main')
+
+        self.assertEqual([], [module for module in DEFERRED_MODULES if module in import_times])
+
+        # Timings are noisy, so the budget is only a generous guard against importing everything again
+
+        baseline_times = self.measure_import_times('import ' + ', '.join(IMPORT_BASELINE_MODULES))
+
+        self.assertLess(import_times['GUM_Dispenser.GUM_Dispenser_Main'],
+                        IMPORT_TIME_RATIO * sum(baseline_times[module] for module in IMPORT_BASELINE_MODULES))
+
+
+    def test_output_formats(self):
+        """Test the --format choices in GUM_Dispenser.GUM_Defaults match GUM_Dispenser.GUM_Render.RENDERERS"""
+
+        from GUM_Dispenser.GUM_Render import RENDERERS
 
+        from GUM_Dispenser.GUM_Defaults import OUTPUT_FORMATS
 
+        self.assertEqual(OUTPUT_FORMATS, sorted(RENDERERS))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+
+import unittest
+
+from GUM_Dispenser.GUM_Entry_Points import parse_entry_point, build_entry_point_index
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMEntryPoints(unittest.TestCase):
+
+    def setUp(self):
+
+        self.test_uml_data = {'packages' :
+                              {'pkg' : {'modules' :
+                                        {'__init__' : {'dependencies' : [],
+                                                       'declarations' : {'def setup()' : {'current_scope_name' :
+                                                                                              'setup'}}},
+                                         'cli' : {'dependencies' : [],
+                                                  'declarations' : {'class Tool' : {
+                                                      'current_scope_name' : 'Tool',
+                                                      'def main(self)' : {'current_scope_name' : 'main'}},
+                                                      'def main()' : {'current_scope_name' : 'main'}}},
+                                         'sub.runner' : {'dependencies' : [],
+                                                         'declarations' : {'def run()' : {'current_scope_name' :
+                                                                                              'run'}}}}}}}
+
+
+    def test_parse_entry_point(self):
+        """Test GUM_Dispenser.GUM_Entry_Points.parse_entry_point"""
+
+        self.assertEqual(('pkg.cli', 'Tool.main'), parse_entry_point('pkg.cli:Tool.main [extra]'))
+
+        self.assertEqual(('script', None), parse_entry_point(' script '))
+
+
+    def test_build_entry_point_index(self):
+        """Test GUM_Dispenser.GUM_Entry_Points.build_entry_point_index"""
+
+        with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+            entry_index = build_entry_point_index(self.test_uml_data, ['pkg.cli:Tool.main', 'pkg:setup',
+                                                                       'pkg.sub.runner:run', 'pkg:cli',
+                                                                       'pkg.cli:missing', 'other:main'])
+
+        self.assertEqual({('pkg', 'cli', 'Tool.main') : 'pkg.cli:Tool.main',
+                          ('pkg', '__init__', 'setup') : 'pkg:setup',
+                          ('pkg', 'sub.runner', 'run') : 'pkg.sub.runner:run',
+                          ('pkg', 'cli', None) : 'pkg:cli'}, entry_index['entries'])
+
+        # Entry points that match nothing are reported
+
+        self.assertEqual(['pkg.cli:missing', 'other:main'], entry_index['unmatched'])
+
+        self.assertEqual(2, len(log_context.output))
+
+        self.assertTrue('Entry point pkg.cli:missing does not match' in log_context.output[0])
+
+
+    def test_generate_with_index(self):
+        """Test generation colors declarations by qualified name"""
+
+        entry_index = build_entry_point_index(self.test_uml_data, ['pkg.cli:Tool.main'])
+
+        sample_nomnoml = generate_project_nomnoml(self.test_uml_data, entry_index)
+
+        # Only the method is colored, not the function sharing its name
+
+        self.assertTrue('[<entry>def main(self)]' in sample_nomnoml)
+
+        self.assertTrue('[def main()]' in sample_nomnoml)
+
+        self.assertEqual(sample_nomnoml, generate_project_nomnoml(self.test_uml_data, ['pkg.cli:Tool.main']))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -1,11 +1,15 @@
 
 
 from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml, generate_module_nomnoml
+from GUM_Dispenser.GUM_Generate_NOMNOML import iter_project_nomnoml, write_project_nomnoml
+from GUM_Dispenser.GUM_Generate_NOMNOML import beautify_declaration_markup, process_declaration
 
 from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
 
 import unittest
 
+from io import StringIO
+
 def setUpModule():
 
     initialize_log({'debug' : False})
@@ -114,6 +118,82 @@ class TestGUMGenerateNOMNOML(unittest.TestCase):
         self.assertTrue('<entry>no_declarations' in sample_nomnoml)
 
 
+    def test_process_declaration(self):
+        """Test process_declaration still accepts the dictionary form and a list of entry points"""
+
+        declaration_data = {'current_scope_name' : 'outer', 'def inner() -> None' : {'current_scope_name' : 'inner'}}
+
+        self.assertEqual('[<entry>def outer() -> None|[[def inner() -> None]]',
+                         process_declaration(declaration_data, 'def outer() -> None', ['pkg.mod:outer'], 'pkg',
+                                             'mod', ''))
+
+        self.assertEqual('[def outer() -> None|[[<entry>def inner() -> None]]',
+                         process_declaration(declaration_data, 'def outer() -> None', ['mod:outer.inner'], '',
+                                             'mod', ''))
+
+
+    def test_iter_project_nomnoml(self):
+        """Test streaming NOMNOML generation"""
+
+        test_uml_data = {'packages' :
+                         {'pkg' : {'modules' : {'first' : {'dependencies' : ['os'],
+                                                           'declarations' : {'def run()' : {'current_scope_name' :
+                                                                                                'run'}}},
+                                                'second' : {'dependencies' : ['first'], 'declarations' : {}}}}}}
+
+        # The header comes first, followed by exactly one fragment per module
+
+        fragments = list(iter_project_nomnoml(test_uml_data, ['pkg.first:run']))
+
+        self.assertEqual('#.entry: fill=#8f8\n', fragments[0])
+
+        self.assertEqual(3, len(fragments))
+
+        self.assertTrue(fragments[1].startswith('[first|[<entry>def run()]]'))
+
+        self.assertTrue(fragments[2].endswith('[pkg]-[second]\n\n'))
+
+        # Writing to a stream produces the same markup as building the string
+
+        output_stream = StringIO()
+
+        characters_written = write_project_nomnoml(test_uml_data, ['pkg.first:run'], output_stream)
+
+        self.assertEqual(generate_project_nomnoml(test_uml_data, ['pkg.first:run']), output_stream.getvalue())
+
+        self.assertEqual(len(output_stream.getvalue()), characters_written)
+
+
+    def test_beautify_declaration_markup(self):
+        """Test line wrapping of declaration blocks"""
+
+        test_markup = '[module|[def first_function(argument: int) -> None]|[def second_function(other: str) -> ' + \
+                      'None]|[class Third]]\n'
+
+        # Default widths break after a declaration once 40 non-space characters are read
+
+        self.assertEqual('[module|[def first_function(argument: int) -> None]|\n[def second_function(other: str) ' +
+                         '-> None]|[class Third]]\n', beautify_declaration_markup(test_markup))
+
+        # Wrapping only adds line breaks
+
+        self.assertEqual(test_markup, beautify_declaration_markup(test_markup, 1000, 1000))
+
+        narrow_markup = beautify_declaration_markup(test_markup, 10, 10)
+
+        self.assertEqual(test_markup, narrow_markup.replace('\n', '') + '\n')
+
+        self.assertTrue(narrow_markup.count('\n') > 3)
+
+        # Widths are passed through from render options
+
+        self.assertEqual(beautify_declaration_markup('[m|[def run()]]\n', 10, 10),
+                         generate_project_nomnoml({'modules' : {'m' : {'dependencies' : [],
+                                                                     'declarations' : {'def run()' : {
+                                                                         'current_scope_name' : 'run'}}}}},
+                                                  [], {'wrap_width' : 10, 'break_width' : 10})[19:-1])
+
+
 if __name__ == '__main__':
 
     unittest.main()
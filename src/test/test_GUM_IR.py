@@ -0,0 +1,127 @@
+
+import unittest
+
+from pathlib import Path
+
+import json
+
+import os
+
+import sys
+
+import tempfile
+
+from GUM_Dispenser.GUM_IR import dump_ir, load_ir, write_ir, read_ir, IR_BINARY_MAGIC, IR_FORMAT_VERSION
+
+from GUM_Dispenser.GUM_Exceptions import InvalidIRError
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log, dispense_gum
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMIR(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_dir = Path(sys.modules[__name__].__file__).resolve().parent.parent
+
+        self.test_distro_defs = {'package_names' : ['GUM_Dispenser'],
+                                 'entry_points' : ['GUM_Dispenser.GUM_Dispenser_Main:main']}
+
+
+    def test_round_trip(self):
+        """Test GUM_Dispenser.GUM_IR.dump_ir and load_ir give back data that renders the same"""
+
+        for scan_options in [{}, {'records' : True}]:
+
+            uml_data = describe_project(self.test_distro_defs, self.base_dir, scan_options=scan_options)
+
+            expected_nomnoml = generate_project_nomnoml(uml_data, self.test_distro_defs['entry_points'])
+
+            json_bytes = dump_ir(uml_data, self.test_distro_defs['entry_points'])
+
+            binary_bytes = dump_ir(uml_data, self.test_distro_defs['entry_points'], 'binary')
+
+            self.assertEqual(IR_FORMAT_VERSION, json.loads(json_bytes)['version'])
+
+            self.assertTrue(binary_bytes.startswith(IR_BINARY_MAGIC))
+
+            self.assertTrue(len(binary_bytes) < len(json_bytes))
+
+            for ir_bytes in [json_bytes, binary_bytes]:
+
+                source_data, entry_points = load_ir(ir_bytes)
+
+                self.assertEqual(self.test_distro_defs['entry_points'], entry_points)
+
+                self.assertEqual(expected_nomnoml, generate_project_nomnoml(source_data, entry_points))
+
+        # Module only projects keep their shape
+
+        module_data = {'modules' : {'only' : {'dependencies' : ['os'],
+                                              'declarations' : {'class A' : {'current_scope_name' : 'A',
+                                                                             'def b(self)' : {
+                                                                                 'current_scope_name' : 'b'}}}}}}
+
+        source_data, entry_points = load_ir(dump_ir(module_data, []))
+
+        self.assertEqual(module_data['modules']['only'], source_data['modules']['only'].as_dict())
+
+
+    def test_invalid_ir(self):
+        """Test GUM_Dispenser.GUM_IR.load_ir refuses other versions and damaged files"""
+
+        for ir_bytes in [b'{"version": 999, "entry_points": [], "modules": {}}', b'{"version": 1}',
+                         IR_BINARY_MAGIC + b'not compressed', b'\xff\xfe', b'[1, 2]']:
+
+            with self.assertRaises(InvalidIRError):
+
+                load_ir(ir_bytes)
+
+        with self.assertRaises(ValueError):
+
+            dump_ir({'modules' : {}}, [], 'yaml')
+
+
+    def test_emit_and_render_ir(self):
+        """Test --emit-ir and --from-ir render the same diagram as a direct run"""
+
+        test_arguments = {'path' : str(self.base_dir), 'setup_file' : str(self.base_dir.joinpath('setup.py')),
+                          'debug' : False}
+
+        with tempfile.TemporaryDirectory() as output_dir:
+
+            direct_path = os.path.join(output_dir, 'direct.nomnoml')
+
+            ir_path = os.path.join(output_dir, 'project.gumir')
+
+            rendered_path = os.path.join(output_dir, 'rendered.nomnoml')
+
+            dispense_gum(dict(test_arguments, output=direct_path))
+
+            dispense_gum(dict(test_arguments, output=rendered_path, emit_ir=ir_path, ir_encoding='binary'))
+
+            # Only the IR is written unless formats are requested
+
+            self.assertFalse(os.path.exists(rendered_path))
+
+            self.assertEqual(['GUM_Dispenser.GUM_Dispenser_Main:main'], read_ir(ir_path)[1])
+
+            dispense_gum({'from_ir' : ir_path, 'output' : rendered_path, 'path' : '/does/not/exist'})
+
+            with open(direct_path, 'r') as direct_file, open(rendered_path, 'r') as rendered_file:
+
+                self.assertEqual(direct_file.read(), rendered_file.read())
+
+
+if __name__ == '__main__':
+
+    unittest.main()
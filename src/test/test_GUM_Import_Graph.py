@@ -0,0 +1,128 @@
+
+import unittest
+
+from GUM_Dispenser.GUM_Import_Graph import build_import_graph, strongly_connected_components, find_import_cycles
+from GUM_Dispenser.GUM_Import_Graph import transitive_dependents, rank_fan_in, rank_fan_out, cycle_module_keys
+from GUM_Dispenser.GUM_Import_Graph import format_import_report
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+def module_with_dependencies(*dependencies) -> dict:
+    """Build scanned module data with the given dependencies and no declarations"""
+
+    return {'dependencies' : list(dependencies), 'declarations' : {}}
+
+
+class TestGUMImportGraph(unittest.TestCase):
+
+    def setUp(self):
+
+        # a -> b -> c -> a is a cycle, d imports itself, e depends on the cycle and other.x is a second package
+
+        self.test_uml_data = {'packages' :
+                              {'pkg' : {'modules' : {'a' : module_with_dependencies('b', 'os'),
+                                                     'b' : module_with_dependencies('c'),
+                                                     'c' : module_with_dependencies('a', 'os', 'x'),
+                                                     'd' : module_with_dependencies('d'),
+                                                     'e' : module_with_dependencies('a', 'json', 'os')}},
+                               'other' : {'modules' : {'x' : module_with_dependencies('json')}}}}
+
+
+    def test_build_import_graph(self):
+        """Test GUM_Dispenser.GUM_Import_Graph.build_import_graph"""
+
+        import_graph = build_import_graph(self.test_uml_data)
+
+        self.assertEqual(['pkg.a', 'pkg.b', 'pkg.c', 'pkg.d', 'pkg.e', 'other.x', 'os', 'json'], import_graph['nodes'])
+
+        self.assertEqual(('other', 'x'), import_graph['modules'][import_graph['index']['other.x']])
+
+        self.assertEqual(None, import_graph['modules'][import_graph['index']['os']])
+
+        # Dependencies resolve to modules of the importing package first, then of any package
+
+        self.assertEqual(['pkg.a', 'os', 'other.x'], [import_graph['nodes'][node] for node in
+                                                      import_graph['edges'][import_graph['index']['pkg.c']]])
+
+
+    def test_cycles(self):
+        """Test GUM_Dispenser.GUM_Import_Graph.find_import_cycles and cycle_module_keys"""
+
+        import_graph = build_import_graph(self.test_uml_data)
+
+        self.assertEqual(len(import_graph['nodes']),
+                         sum(len(component) for component in strongly_connected_components(import_graph)))
+
+        self.assertEqual([['pkg.a', 'pkg.b', 'pkg.c'], ['pkg.d']],
+                         sorted(find_import_cycles(import_graph)))
+
+        self.assertEqual({('pkg', 'a'), ('pkg', 'b'), ('pkg', 'c'), ('pkg', 'd')}, cycle_module_keys(import_graph))
+
+        # Long import chains are walked without recursion
+
+        chain_length = 20000
+
+        chain_data = {'modules' : {'m' + str(module_index) : module_with_dependencies('m' + str(module_index + 1))
+                                   for module_index in range(chain_length)}}
+
+        chain_data['modules']['m' + str(chain_length)] = module_with_dependencies('m0')
+
+        chain_cycles = find_import_cycles(build_import_graph(chain_data))
+
+        self.assertEqual(1, len(chain_cycles))
+
+        self.assertEqual(chain_length + 1, len(chain_cycles[0]))
+
+
+    def test_rankings(self):
+        """Test GUM_Dispenser.GUM_Import_Graph.transitive_dependents, rank_fan_in and rank_fan_out"""
+
+        import_graph = build_import_graph(self.test_uml_data)
+
+        self.assertEqual(['pkg.a', 'pkg.b', 'pkg.c', 'pkg.e'], transitive_dependents(import_graph, 'other.x'))
+
+        self.assertEqual(['pkg.d'], transitive_dependents(import_graph, 'pkg.d'))
+
+        self.assertEqual([], transitive_dependents(import_graph, 'pkg.e'))
+
+        self.assertEqual([('os', 3), ('pkg.a', 2)], rank_fan_in(import_graph)[:2])
+
+        self.assertEqual([('pkg.c', 3), ('pkg.e', 3), ('pkg.a', 2)], rank_fan_out(import_graph)[:3])
+
+        import_report = format_import_report(import_graph, report_size=2)
+
+        self.assertTrue('Import graph: 6 modules, 2 external dependencies, 11 imports' in import_report)
+
+        self.assertTrue('pkg.a <-> pkg.b <-> pkg.c' in import_report)
+
+
+    def test_highlight_cycles(self):
+        """Test cycle members are colored in NOMNOML unless they are entry points"""
+
+        import_graph = build_import_graph(self.test_uml_data)
+
+        sample_nomnoml = generate_project_nomnoml(self.test_uml_data, ['pkg.b'],
+                                                  {'cycle_modules' : cycle_module_keys(import_graph)})
+
+        self.assertTrue(sample_nomnoml.startswith('#.entry: fill=#8f8\n#.cycle: fill=#f88\n'))
+
+        self.assertTrue('[<cycle>a]' in sample_nomnoml)
+
+        self.assertTrue('[<entry>b]' in sample_nomnoml)
+
+        self.assertTrue('[e]' in sample_nomnoml)
+
+        self.assertFalse('#.cycle' in generate_project_nomnoml(self.test_uml_data, []))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,179 @@
+
+import unittest
+
+from pathlib import Path
+
+import io
+
+import os
+
+import tempfile
+
+from unittest.mock import patch
+
+from GUM_Dispenser.GUM_Monorepo import find_setup_directories, run_monorepo
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml, ENTRY_STYLE_DIRECTIVE
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+from benchmark.synthetic_project import generate_synthetic_project
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMMonorepo(unittest.TestCase):
+
+    def setUp(self):
+
+        self.monorepo_context = tempfile.TemporaryDirectory()
+
+        self.monorepo_dir = Path(self.monorepo_context.name).resolve()
+
+        self.distribution_paths = [self.monorepo_dir.joinpath('libs', 'core'), self.monorepo_dir.joinpath('tools')]
+
+        for distribution_index, distribution_path in enumerate(self.distribution_paths):
+
+            distribution_path.mkdir(parents=True)
+
+            generate_synthetic_project(str(distribution_path), 3 + distribution_index,
+                                       setup_shape=['packages', 'modules'][distribution_index], seed=distribution_index)
+
+        # None of these hold distributions of their own
+
+        for skipped_path in [self.monorepo_dir.joinpath('.git', 'hooks'), self.monorepo_dir.joinpath('build'),
+                             self.monorepo_dir.joinpath('libs', 'core', 'env')]:
+
+            skipped_path.mkdir(parents=True)
+
+            open(str(skipped_path.joinpath('setup.py')), 'w').close()
+
+        open(str(self.monorepo_dir.joinpath('libs', 'core', 'env', 'pyvenv.cfg')), 'w').close()
+
+
+    def tearDown(self):
+
+        self.monorepo_context.cleanup()
+
+
+    def test_find_setup_directories(self):
+        """Test GUM_Dispenser.GUM_Monorepo.find_setup_directories skips vcs, build and virtualenv directories"""
+
+        self.assertEqual([str(distribution_path) for distribution_path in self.distribution_paths],
+                         find_setup_directories(str(self.monorepo_dir)))
+
+
+    def test_find_setup_directories_errors(self):
+        """Test GUM_Dispenser.GUM_Monorepo.find_setup_directories skips directories it cannot list"""
+
+        real_scandir = os.scandir
+
+        # The tools directory disappears after its parent was listed
+
+        def scandir_vanishing(directory_path):
+
+            if directory_path == str(self.distribution_paths[1]):
+
+                raise FileNotFoundError(2, 'No such file or directory', directory_path)
+
+            return real_scandir(directory_path)
+
+        with patch('GUM_Dispenser.GUM_Monorepo.os.scandir', side_effect=scandir_vanishing):
+
+            with self.assertLogs('GUM Dispenser', 'WARNING'):
+
+                self.assertEqual([str(self.distribution_paths[0])], find_setup_directories(str(self.monorepo_dir)))
+
+
+    def test_run_monorepo(self):
+        """Test GUM_Dispenser.GUM_Monorepo.run_monorepo writes combined and per distribution diagrams"""
+
+        expected_nomnoml = []
+
+        for distribution_path in self.distribution_paths:
+
+            distro_defs = parse_setup(str(distribution_path), 'accept')
+
+            expected_nomnoml.append(generate_project_nomnoml(describe_project(distro_defs, distribution_path),
+                                                             distro_defs['entry_points']))
+
+        for workers in [1, 2]:
+
+            output_dir = str(self.monorepo_dir.joinpath('diagrams_' + str(workers)))
+
+            batch_results = run_monorepo(str(self.monorepo_dir), output_dir, workers=workers)
+
+            self.assertEqual(['ok', 'ok'], [batch_result['status'] for batch_result in batch_results])
+
+            self.assertEqual(['libs.core.nomnoml', 'tools.nomnoml'], sorted(os.listdir(output_dir)))
+
+            for batch_result, distribution_nomnoml in zip(batch_results, expected_nomnoml):
+
+                with open(batch_result['output'], 'r') as output_file:
+
+                    self.assertEqual(distribution_nomnoml, output_file.read())
+
+            # The combined diagram holds every distribution in its own frame under a single entry point style
+
+            combined_stream = io.StringIO()
+
+            run_monorepo(str(self.monorepo_dir), workers=workers, output_stream=combined_stream)
+
+            self.assertEqual(ENTRY_STYLE_DIRECTIVE + ''.join('// Project ' + str(distribution_path) + '\n' +
+                                                             '[<package> ' + frame_name + '|\n' +
+                                                             distribution_nomnoml[len(ENTRY_STYLE_DIRECTIVE):] +
+                                                             ']\n\n'
+                                                             for distribution_path, frame_name, distribution_nomnoml
+                                                             in zip(self.distribution_paths, ['libs.core', 'tools'],
+                                                                    expected_nomnoml)),
+                             combined_stream.getvalue())
+
+
+    def test_run_monorepo_shared_names(self):
+        """Test GUM_Dispenser.GUM_Monorepo.run_monorepo keeps distributions sharing module names apart"""
+
+        for distribution_name in ['a', 'b']:
+
+            package_path = self.monorepo_dir.joinpath('shared', distribution_name, 'pkg')
+
+            package_path.mkdir(parents=True)
+
+            package_path.parent.joinpath('setup.py').write_text("setup(\n    packages=['pkg'],\n)\n")
+
+            package_path.joinpath('__init__.py').write_text("__all__ = ['util']\n")
+
+            package_path.joinpath('util.py').write_text('def helper_' + distribution_name + '():\n    pass\n')
+
+        combined_stream = io.StringIO()
+
+        run_monorepo(str(self.monorepo_dir.joinpath('shared')), output_stream=combined_stream)
+
+        # Nomnoml merges nodes with the same name unless they sit in different frames
+
+        distribution_frames = combined_stream.getvalue().split('// Project ')[1:]
+
+        self.assertEqual(2, len(distribution_frames))
+
+        for distribution_name, distribution_frame in zip(['a', 'b'], distribution_frames):
+
+            frame_lines = distribution_frame.strip().splitlines()
+
+            self.assertEqual('[<package> ' + distribution_name + '|', frame_lines[1])
+
+            self.assertEqual(']', frame_lines[-1])
+
+            self.assertTrue('[util|[def helper_' + distribution_name + '()]]' in frame_lines)
+
+            self.assertTrue('[pkg]-[util]' in frame_lines)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
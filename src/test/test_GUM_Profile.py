@@ -0,0 +1,121 @@
+
+import unittest
+
+from pathlib import Path
+
+import sys
+
+import tempfile
+
+from GUM_Dispenser.GUM_Profile import new_profile, profile_phase, record_phase, record_module, format_profile_report
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Scan_Cache import DEFAULT_CACHE_MAX_BYTES
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMProfile(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_pkg_dir = Path(sys.modules[__name__].__file__)
+
+        self.base_pkg_dir = self.base_pkg_dir.resolve().parent.parent.joinpath('GUM_Dispenser')
+
+
+    def test_format_profile_report(self):
+        """Test GUM_Dispenser.GUM_Profile.record_phase, record_module and format_profile_report"""
+
+        profile = new_profile()
+
+        record_phase(profile, 'scanning', 1.5)
+
+        record_phase(profile, 'scanning', 0.5)
+
+        with profile_phase(profile, 'setup'):
+
+            pass
+
+        # A missing profile turns timing into a no-op
+
+        with profile_phase(None, 'setup'):
+
+            pass
+
+        self.assertEqual(2.0, profile['phases']['scanning'])
+
+        self.assertEqual(['scanning', 'setup'], sorted(profile['phases']))
+
+        record_module(profile, 'GUM_Dispenser', 'fast_module', 1000, 200, 0.1)
+
+        record_module(profile, 'None', 'slow_module', 1000000, None, 1.9, cached=True)
+
+        report_lines = format_profile_report(profile, slowest_count=1).split('\n')
+
+        # Phases are listed in run order
+
+        phase_lines = [report_line.split()[0] for report_line in report_lines if report_line.startswith(('setup',
+                                                                                                         'scanning'))]
+
+        self.assertEqual(['setup', 'scanning'], phase_lines)
+
+        self.assertTrue(any(report_line.startswith('slow_module (cached)') for report_line in report_lines))
+
+        self.assertFalse(any('fast_module' in report_line for report_line in report_lines))
+
+        self.assertTrue('Scanned 2 modules (1.00 MB) at 1.0 files/s, 0.50 MB/s' in report_lines)
+
+
+    def test_describe_project_profile(self):
+        """Test describe_project records discovery time and every scanned module"""
+
+        test_distro_defs = {'package_names' : ['GUM_Dispenser']}
+
+        for workers in [1, 2]:
+
+            profile = new_profile()
+
+            uml_data = describe_project(test_distro_defs, self.base_pkg_dir.parent, workers=workers,
+                                        scan_options={'profile' : profile})
+
+            self.assertTrue('discovery' in profile['phases'])
+
+            # Worker timings come back in module order
+
+            self.assertEqual(list(uml_data['packages']['GUM_Dispenser']['modules']),
+                             [module_record['module'] for module_record in profile['modules']])
+
+            self.assertTrue(all(module_record['tokens'] > 0 for module_record in profile['modules']))
+
+            # Token counts are not part of the scanned data
+
+            self.assertFalse(any('token_count' in module_data for module_data in
+                                 uml_data['packages']['GUM_Dispenser']['modules'].values()))
+
+
+        # Cache hits are marked and have no token count
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+
+            scan_options = {'cache_dir' : cache_dir, 'cache_max_bytes' : DEFAULT_CACHE_MAX_BYTES}
+
+            describe_project(test_distro_defs, self.base_pkg_dir.parent, scan_options=scan_options)
+
+            scan_options['profile'] = new_profile()
+
+            describe_project(test_distro_defs, self.base_pkg_dir.parent, scan_options=scan_options)
+
+            self.assertTrue(all(module_record['cached'] and module_record['tokens'] is None for module_record in
+                                scan_options['profile']['modules']))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
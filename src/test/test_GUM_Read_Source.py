@@ -0,0 +1,184 @@
+
+import unittest
+
+from pathlib import Path
+
+import mmap
+
+import os
+
+import sys
+
+import tempfile
+
+import hashlib
+
+from GUM_Dispenser.GUM_Read_Source import open_source, source_readline, source_digest, is_source_stream
+
+from GUM_Dispenser.GUM_Describe_Source import describe_module, scan_module_tokens
+
+from GUM_Dispenser.GUM_Describe_AST import scan_module_ast
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMReadSource(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_pkg_dir = Path(sys.modules[__name__].__file__)
+
+        self.base_pkg_dir = self.base_pkg_dir.resolve().parent.parent.joinpath('GUM_Dispenser')
+
+        self.source_context = tempfile.TemporaryDirectory()
+
+        self.source_dir = Path(self.source_context.name)
+
+
+    def tearDown(self):
+
+        self.source_context.cleanup()
+
+
+    def test_open_source(self):
+        """Test GUM_Dispenser.GUM_Read_Source.open_source and source_readline"""
+
+        module_path = str(self.base_pkg_dir.joinpath('GUM_Describe_Source.py'))
+
+        with open(module_path, 'rb') as module_file:
+
+            expected_bytes = module_file.read()
+
+        with open_source(module_path) as (module_bytes, module_stat):
+
+            self.assertEqual(expected_bytes, module_bytes)
+
+            self.assertEqual(os.stat(module_path).st_size, module_stat.st_size)
+
+            byte_data = scan_module_tokens(module_bytes, 'GUM_Dispenser', 'GUM_Describe_Source').as_dict()
+
+        # Large files are scanned straight from a memory map, and each scan starts from the first line
+
+        with open_source(module_path, mmap_threshold=1) as (module_map, module_stat):
+
+            self.assertTrue(isinstance(module_map, mmap.mmap))
+
+            self.assertEqual(expected_bytes.split(b'\n')[0] + b'\n', source_readline(module_map)())
+
+            self.assertEqual(byte_data,
+                             scan_module_tokens(module_map, 'GUM_Dispenser', 'GUM_Describe_Source').as_dict())
+
+            self.assertEqual(scan_module_ast(expected_bytes, 'GUM_Dispenser', 'GUM_Describe_Source').as_dict(),
+                             scan_module_ast(module_map, 'GUM_Dispenser', 'GUM_Describe_Source').as_dict())
+
+        self.assertTrue(module_map.closed)
+
+        # Empty files are never mapped
+
+        empty_path = str(self.source_dir.joinpath('empty.py'))
+
+        open(empty_path, 'w').close()
+
+        with open_source(empty_path, mmap_threshold=0) as (module_bytes, module_stat):
+
+            self.assertEqual(b'', module_bytes)
+
+
+    def test_stream_source(self):
+        """Test open_source streams files over stream_threshold, and source_digest hashes every buffer the same"""
+
+        module_path = str(self.base_pkg_dir.joinpath('GUM_Describe_Source.py'))
+
+        with open(module_path, 'rb') as module_file:
+
+            expected_bytes = module_file.read()
+
+        expected_digest = hashlib.sha256(expected_bytes).hexdigest()
+
+        for open_options in [{}, {'mmap_threshold' : 1}, {'stream_threshold' : 1}]:
+
+            with open_source(module_path, **open_options) as (module_buffer, module_stat):
+
+                self.assertEqual('stream_threshold' in open_options, is_source_stream(module_buffer))
+
+                self.assertEqual(expected_digest, source_digest(module_buffer))
+
+                # Hashing leaves streams ready to be scanned from the first line
+
+                self.assertEqual(expected_bytes.split(b'\n')[0] + b'\n', source_readline(module_buffer)())
+
+
+    def test_large_module(self):
+        """Test describe_module scans only top level declarations of large modules, or skips them"""
+
+        with open(str(self.source_dir.joinpath('large_module.py')), 'w') as module_file:
+
+            module_file.write('import os\n\nclass Outer(object):\n    def method(self,\n            other):\n' +
+                              '        from json import loads\n\nif os.name:\n    def conditional(\n' +
+                              '            value):\n        pass\n')
+
+        scan_options = {'large_module_bytes' : 10, 'records' : True}
+
+        with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+            module_info = describe_module('None', 'large_module', self.source_dir, {'modules' : {}},
+                                          scan_options)['modules']['large_module']
+
+        self.assertTrue('Only scanning top level declarations' in log_context.output[0])
+
+        # Nested declarations are dropped but their imports are kept
+
+        self.assertEqual(['os', 'json'], list(module_info.dependencies))
+
+        self.assertEqual(['class Outer(object)', 'def conditional( value)'],
+                         [signature for signature, declaration in module_info.iter_declarations()])
+
+        self.assertEqual(None, module_info.get_declaration('class Outer(object)').declarations)
+
+        self.assertEqual('conditional', module_info.get_declaration('def conditional( value)').scope_name)
+
+        # Below the limit the module is scanned in full
+
+        with open(str(self.source_dir.joinpath('large_module.py')), 'rb') as module_file:
+
+            full_info = scan_module_tokens(module_file.read(), 'None', 'large_module')
+
+        self.assertEqual(list(full_info.dependencies), list(module_info.dependencies))
+
+        self.assertTrue(full_info.get_declaration('class Outer(object)').declarations)
+
+        with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+            module_dict = describe_module('None', 'large_module', self.source_dir, {'modules' : {}},
+                                          {'large_module_bytes' : 10, 'large_module_policy' : 'skip'})
+
+        self.assertTrue('Skipping module large_module' in log_context.output[0])
+
+        self.assertEqual({'dependencies' : [], 'declarations' : {}}, module_dict['modules']['large_module'])
+
+
+    def test_encoding_cookie(self):
+        """Test describe_module decodes modules with the encoding named in their PEP 263 cookie"""
+
+        with open(str(self.source_dir.joinpath('latin_module.py')), 'wb') as module_file:
+
+            module_file.write('# -*- coding: latin-1 -*-\n\ndef café(crème: str) -> str:\n'
+                              '    return crème\n'.encode('latin-1'))
+
+        for engine in ['tokenize', 'ast']:
+
+            module_dict = describe_module('None', 'latin_module', self.source_dir, {'modules' : {}},
+                                          {'engine' : engine})
+
+            self.assertEqual(['def café(crème: str) -> str'],
+                             list(module_dict['modules']['latin_module']['declarations']))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,142 @@
+
+import unittest
+
+from GUM_Dispenser.GUM_Reduce import reduce_project, reduction_requested, module_selected
+
+from GUM_Dispenser.GUM_Scan_Model import as_module_dict
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Generate_DOT import generate_project_dot
+
+from GUM_Dispenser.GUM_Generate_PlantUML import generate_project_plantuml
+
+from GUM_Dispenser.GUM_Generate_JSON import generate_project_json
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+import json
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMReduce(unittest.TestCase):
+
+    def setUp(self):
+
+        nested_declarations = {'class Outer' : {'current_scope_name' : 'Outer',
+                                                'def method(self)' : {'current_scope_name' : 'method',
+                                                                      'def inner()' : {
+                                                                          'current_scope_name' : 'inner'}}},
+                               'def helper()' : {'current_scope_name' : 'helper'}}
+
+        self.test_uml_data = {'packages' :
+                              {'app' : {'modules' : {'core' : {'dependencies' : ['os', 'util', 'json'],
+                                                               'declarations' : nested_declarations},
+                                                     'util' : {'dependencies' : ['os'], 'declarations' : {}},
+                                                     'tests' : {'dependencies' : ['core', 'unittest'],
+                                                                'declarations' : {}}}},
+                               'lib' : {'modules' : {'util' : {'dependencies' : ['os', 'lib'],
+                                                               'declarations' : {}}}}}}
+
+
+    def test_filters(self):
+        """Test GUM_Dispenser.GUM_Reduce.reduce_project include and exclude globs and max_depth"""
+
+        self.assertFalse(reduction_requested({'include' : [], 'max_depth' : None, 'merge_edges' : False}))
+
+        self.assertTrue(reduction_requested({'max_depth' : 0}))
+
+        self.assertTrue(module_selected('app.core', ['app.*'], ['*.tests']))
+
+        self.assertFalse(module_selected('app.tests', ['app.*'], ['*.tests']))
+
+        self.assertFalse(module_selected('lib.util', ['app.*'], []))
+
+        reduced_data, edge_weights = reduce_project(self.test_uml_data, {'exclude' : ['*.tests', 'lib.*'],
+                                                                         'max_depth' : 2})
+
+        self.assertEqual(['app'], list(reduced_data['packages']))
+
+        self.assertEqual(['core', 'util'], list(reduced_data['packages']['app']['modules']))
+
+        core_data = as_module_dict(reduced_data['packages']['app']['modules']['core'])
+
+        self.assertEqual({'current_scope_name' : 'method'},
+                         core_data['declarations']['class Outer']['def method(self)'])
+
+        # util is still scanned in app, so the edge to it stays
+
+        self.assertEqual(['os', 'util', 'json'], core_data['dependencies'])
+
+        self.assertEqual({}, edge_weights)
+
+        # The source data is left as it was
+
+        self.assertTrue('tests' in self.test_uml_data['packages']['app']['modules'])
+
+        self.assertTrue('def inner()' in
+                        self.test_uml_data['packages']['app']['modules']['core']['declarations']['class Outer'][
+                            'def method(self)'])
+
+        reduced_data, edge_weights = reduce_project(self.test_uml_data, {'include' : ['app.tests'], 'max_depth' : 0})
+
+        self.assertEqual({'dependencies' : ['unittest'], 'declarations' : {}},
+                         as_module_dict(reduced_data['packages']['app']['modules']['tests']))
+
+
+    def test_collapse_and_merge(self):
+        """Test GUM_Dispenser.GUM_Reduce.reduce_project collapse_external and merge_edges"""
+
+        reduced_data, edge_weights = reduce_project(self.test_uml_data, {'collapse_external' : True,
+                                                                         'merge_edges' : True})
+
+        self.assertEqual(['os', 'json', 'unittest'], reduced_data['packages']['app']['dependencies'])
+
+        self.assertEqual(['util'], list(reduced_data['packages']['app']['modules']['core'].dependencies))
+
+        self.assertEqual({('app', 'os') : 2}, edge_weights)
+
+        sample_nomnoml = generate_project_nomnoml(reduced_data, [], {'edge_weights' : edge_weights})
+
+        self.assertTrue('[app]-->2[os]\n[app]-->[json]\n' in sample_nomnoml)
+
+        self.assertFalse('[core]-->[os]' in sample_nomnoml)
+
+        self.assertTrue('"app" -> "os" [style=dashed label="2"];' in
+                        generate_project_dot(reduced_data, [], {'edge_weights' : edge_weights}))
+
+        self.assertTrue('"app" ..> "os" : 2' in
+                        generate_project_plantuml(reduced_data, [], {'edge_weights' : edge_weights}))
+
+        json_packages = json.loads(generate_project_json(reduced_data, []))['packages']
+
+        self.assertEqual(['os', 'json', 'unittest'], json_packages['app']['dependencies'])
+
+        # lib names a scanned package, so it is not external
+
+        self.assertEqual(['os'], json_packages['lib']['dependencies'])
+
+        self.assertEqual(['lib'], json_packages['lib']['modules']['util']['dependencies'])
+
+        # Modules sharing a name are drawn as one node, so their edges merge
+
+        reduced_data, edge_weights = reduce_project(self.test_uml_data, {'merge_edges' : True})
+
+        self.assertEqual({('util', 'os') : 2}, edge_weights)
+
+        self.assertEqual(['lib'], list(reduced_data['packages']['lib']['modules']['util'].dependencies))
+
+        sample_nomnoml = generate_project_nomnoml(reduced_data, [], {'edge_weights' : edge_weights})
+
+        self.assertEqual(1, sample_nomnoml.count('[util]-->2[os]'))
+
+        self.assertEqual(0, sample_nomnoml.count('[util]-->[os]'))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
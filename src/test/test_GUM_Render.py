@@ -0,0 +1,182 @@
+
+import unittest
+
+from unittest.mock import patch
+
+import io
+
+import os
+
+import json
+
+import tempfile
+
+from GUM_Dispenser.GUM_Render import RENDERERS, register_renderer, render_project, parse_format_option, render_formats, \
+    write_rendered
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Generate_DOT import generate_project_dot
+
+from GUM_Dispenser.GUM_Generate_PlantUML import generate_project_plantuml
+
+from GUM_Dispenser.GUM_Generate_JSON import generate_project_json
+
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMRender(unittest.TestCase):
+
+    def setUp(self):
+
+        self.test_uml_data = {'packages' :
+                              {'pkg' : {'modules' :
+                                        {'cli' : {'dependencies' : ['os', 'pkg.util'],
+                                                  'declarations' : {'class Tool' : {
+                                                      'current_scope_name' : 'Tool',
+                                                      'def main(self) -> int' : {'current_scope_name' : 'main'}},
+                                                      'def main()' : {'current_scope_name' : 'main'}}},
+                                         'util' : {'dependencies' : [], 'declarations' : {}}}}}}
+
+        self.test_entry_points = ['pkg.cli:Tool.main', 'pkg:util']
+
+
+    def test_generate_project_dot(self):
+        """Test GUM_Dispenser.GUM_Generate_DOT.generate_project_dot"""
+
+        sample_dot = generate_project_dot(self.test_uml_data, self.test_entry_points)
+
+        self.assertTrue(sample_dot.startswith('digraph GUM {'))
+
+        self.assertTrue(sample_dot.endswith('}\n'))
+
+        # Nested declarations are indented, entry points are filled and signatures are escaped
+
+        self.assertTrue('<TR><TD ALIGN="LEFT" BGCOLOR="#88ff88">&nbsp;&nbsp;def main(self) -&gt; int</TD></TR>' in
+                        sample_dot)
+
+        self.assertTrue('<TR><TD ALIGN="LEFT">def main()</TD></TR>' in sample_dot)
+
+        self.assertTrue('<TR><TD BGCOLOR="#88ff88"><B>util</B></TD></TR>' in sample_dot)
+
+        self.assertTrue('    "cli" -> "pkg.util" [style=dashed];\n' in sample_dot)
+
+        self.assertTrue('    "pkg" -> "cli" [arrowhead=none];\n' in sample_dot)
+
+
+    def test_generate_project_plantuml(self):
+        """Test GUM_Dispenser.GUM_Generate_PlantUML.generate_project_plantuml"""
+
+        sample_plantuml = generate_project_plantuml(self.test_uml_data, self.test_entry_points)
+
+        self.assertTrue(sample_plantuml.startswith('@startuml\n'))
+
+        self.assertTrue(sample_plantuml.endswith('@enduml\n'))
+
+        self.assertTrue('class "cli" {\n    class Tool\n      <back:#88ff88>def main(self) -> int</back>\n' +
+                        '    def main()\n}\n"cli" ..> "os"\n"cli" ..> "pkg.util"\n' in sample_plantuml)
+
+        self.assertTrue('class "util" <<entry>> {\n}\n"pkg" -- "util"\n' in sample_plantuml)
+
+
+    def test_generate_project_json(self):
+        """Test GUM_Dispenser.GUM_Generate_JSON.generate_project_json"""
+
+        sample_json = json.loads(generate_project_json(self.test_uml_data, self.test_entry_points))
+
+        self.assertEqual(self.test_uml_data['packages'], sample_json['packages'])
+
+        self.assertEqual([{'package' : 'pkg', 'module' : 'cli', 'qualified_name' : 'Tool.main',
+                           'entry_point' : 'pkg.cli:Tool.main'},
+                          {'package' : 'pkg', 'module' : 'util', 'qualified_name' : None,
+                           'entry_point' : 'pkg:util'}], sample_json['entry_points']['matched'])
+
+        # Records and module only projects give the same document as their dictionary form
+
+        module_data = {'modules' : {'only' : self.test_uml_data['packages']['pkg']['modules']['cli'],
+                                    'empty' : {'dependencies' : [], 'declarations' : {}}}}
+
+        record_data = {'modules' : {module_name : ModuleInfo.from_dict(module_dict) for module_name, module_dict in
+                                    module_data['modules'].items()}}
+
+        self.assertEqual(module_data['modules'], json.loads(generate_project_json(record_data, []))['modules'])
+
+
+    def test_render_formats(self):
+        """Test GUM_Dispenser.GUM_Render.render_formats renders every format from the same data"""
+
+        self.assertEqual(('dot', 'out.dot'), parse_format_option('DOT=out.dot'))
+
+        self.assertEqual(('json', None), parse_format_option('json'))
+
+        with self.assertRaises(ValueError):
+
+            parse_format_option('svg=out.svg')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+
+            format_outputs = [(format_name, os.path.join(output_dir, 'diagram.' + format_name)) for format_name in
+                              ['nomnoml', 'dot', 'plantuml', 'json']]
+
+            render_formats(self.test_uml_data, self.test_entry_points, format_outputs)
+
+            for (format_name, output_path), generate_project in zip(format_outputs,
+                                                                   [generate_project_nomnoml, generate_project_dot,
+                                                                    generate_project_plantuml, generate_project_json]):
+
+                with open(output_path, 'r') as output_file:
+
+                    self.assertEqual(generate_project(self.test_uml_data, self.test_entry_points), output_file.read())
+
+        with self.assertRaises(ValueError):
+
+            render_formats(self.test_uml_data, [], [('dot', None), ('json', None)])
+
+
+    def test_register_renderer(self):
+        """Test GUM_Dispenser.GUM_Render.register_renderer"""
+
+        with patch.dict(RENDERERS):
+
+            register_renderer('count', lambda source_data, entry_points, render_options:
+                              iter([str(len(source_data['packages']['pkg']['modules']))]))
+
+            output_stream = io.StringIO()
+
+            self.assertEqual(1, render_project(self.test_uml_data, [], 'count', output_stream))
+
+            self.assertEqual('2', output_stream.getvalue())
+
+        self.assertFalse('count' in RENDERERS)
+
+
+    def test_write_rendered(self):
+        """Test GUM_Dispenser.GUM_Render.write_rendered writes chunks to streams and file paths"""
+
+        output_stream = io.StringIO()
+
+        self.assertEqual(5, write_rendered(output_stream, iter(['ab', 'c', 'de'])))
+
+        self.assertEqual('abcde', output_stream.getvalue())
+
+        with tempfile.TemporaryDirectory() as output_dir:
+
+            output_path = os.path.join(output_dir, 'diagram.txt')
+
+            self.assertEqual(3, write_rendered(output_path, iter(['x', 'yz'])))
+
+            with open(output_path, 'r') as output_file:
+
+                self.assertEqual('xyz', output_file.read())
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,172 @@
+
+import unittest
+
+from unittest.mock import patch, Mock
+
+from pathlib import Path
+
+import os
+
+import sys
+
+import tempfile
+
+from GUM_Dispenser.GUM_Scan_Cache import module_cache_key, load_cached_module, store_cached_module
+from GUM_Dispenser.GUM_Scan_Cache import evict_cache_entries, CACHE_FORMAT_VERSION
+
+from GUM_Dispenser.GUM_Describe_Source import describe_module
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMScanCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_pkg_dir = Path(sys.modules[__name__].__file__)
+
+        self.base_pkg_dir = self.base_pkg_dir.resolve().parent.parent.joinpath('GUM_Dispenser')
+
+        self.cache_context = tempfile.TemporaryDirectory()
+
+        self.cache_dir = self.cache_context.name
+
+
+    def tearDown(self):
+
+        self.cache_context.cleanup()
+
+
+    def test_module_cache_key(self):
+        """Test GUM_Dispenser.GUM_Scan_Cache.module_cache_key"""
+
+        module_path = str(self.base_pkg_dir.joinpath('GUM_Exceptions.py'))
+
+        module_stat = os.stat(module_path)
+
+        first_key = module_cache_key(module_path, module_stat, b'class A: pass', 'GUM_Dispenser')
+
+        # Same inputs give the same key
+
+        self.assertEqual(first_key, module_cache_key(module_path, module_stat, b'class A: pass', 'GUM_Dispenser'))
+
+        # Content and package both change the key
+
+        self.assertNotEqual(first_key, module_cache_key(module_path, module_stat, b'class B: pass', 'GUM_Dispenser'))
+
+        self.assertNotEqual(first_key, module_cache_key(module_path, module_stat, b'class A: pass', 'None'))
+
+
+    def test_store_and_load(self):
+        """Test GUM_Dispenser.GUM_Scan_Cache.store_cached_module and load_cached_module"""
+
+        module_data = {'dependencies' : ['os'],
+                       'declarations' : {'def outer()' : {'current_scope_name' : 'outer',
+                                                          'def inner()' : {'current_scope_name' : 'inner'}}}}
+
+        self.assertIsNone(load_cached_module(self.cache_dir, 'missing'))
+
+        store_cached_module(self.cache_dir, 'present', module_data)
+
+        self.assertEqual(module_data, load_cached_module(self.cache_dir, 'present'))
+
+        # No temporary files are left behind
+
+        self.assertEqual(['present.json'], os.listdir(self.cache_dir))
+
+
+        # Damaged entries are misses
+
+        with open(os.path.join(self.cache_dir, 'damaged.json'), 'w') as damaged_file:
+
+            damaged_file.write('{')
+
+        with self.assertLogs(logger='GUM Dispenser', level='WARNING'):
+
+            self.assertIsNone(load_cached_module(self.cache_dir, 'damaged'))
+
+
+    def test_evict_cache_entries(self):
+        """Test GUM_Dispenser.GUM_Scan_Cache.evict_cache_entries"""
+
+        module_data = {'dependencies' : [], 'declarations' : {}}
+
+        for entry_age, cache_key in enumerate(['newest', 'middle', 'oldest']):
+
+            store_cached_module(self.cache_dir, cache_key, module_data)
+
+            entry_time = 1000000 - entry_age * 100
+
+            os.utime(os.path.join(self.cache_dir, cache_key + '.json'), (entry_time, entry_time))
+
+        entry_size = os.stat(os.path.join(self.cache_dir, 'newest.json')).st_size
+
+        # Within budget, nothing is removed
+
+        self.assertEqual(0, evict_cache_entries(self.cache_dir, entry_size * 3))
+
+        # Loading an entry marks it as recently used
+
+        load_cached_module(self.cache_dir, 'oldest')
+
+        self.assertEqual(entry_size * 2, evict_cache_entries(self.cache_dir, entry_size))
+
+        self.assertEqual(['oldest.json'], os.listdir(self.cache_dir))
+
+
+    def test_describe_module_cache(self):
+        """Test GUM_Dispenser.GUM_Describe_Source.describe_module with a scan cache"""
+
+        scan_options = {'cache_dir' : self.cache_dir}
+
+        first_data = describe_module('None', 'GUM_Exceptions', self.base_pkg_dir, {'modules' : {}}, scan_options)
+
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        # A cache hit must not tokenize the module again
+
+        with patch('GUM_Dispenser.GUM_Describe_Source.tokenize', new=Mock(side_effect=AssertionError)):
+
+            second_data = describe_module('None', 'GUM_Exceptions', self.base_pkg_dir, {'modules' : {}},
+                                          scan_options)
+
+        self.assertEqual(first_data, second_data)
+
+
+    def test_cache_format_version(self):
+        """Test entries stored by an earlier cache format version are not reused"""
+
+        module_dir = Path(self.cache_dir).joinpath('source')
+
+        module_dir.mkdir()
+
+        module_path = module_dir.joinpath('multiline.py')
+
+        module_path.write_bytes(b'class Tool(\n        object):\n    pass\n')
+
+        # Version 1 named declarations with a signature over several lines after the newline token
+
+        with patch('GUM_Dispenser.GUM_Scan_Cache.CACHE_FORMAT_VERSION', new=1):
+
+            stale_key = module_cache_key(str(module_path), os.stat(str(module_path)), module_path.read_bytes(), 'None')
+
+        store_cached_module(self.cache_dir, stale_key, {'dependencies' : [],
+                                                         'declarations' : {'class Tool( object)' :
+                                                                           {'current_scope_name' : '\n'}}})
+
+        self.assertTrue(CACHE_FORMAT_VERSION > 1)
+
+        uml_data = describe_module('None', 'multiline', module_dir, {'modules' : {}}, {'cache_dir' : self.cache_dir})
+
+        self.assertEqual('Tool',
+                         uml_data['modules']['multiline']['declarations']['class Tool( object)']['current_scope_name'])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
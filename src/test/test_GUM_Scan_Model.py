@@ -0,0 +1,117 @@
+
+import unittest
+
+from pathlib import Path
+
+import pickle
+
+import sys
+
+import tempfile
+
+from GUM_Dispenser.GUM_Scan_Model import ModuleInfo, Declaration, as_module_info, as_module_dict
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMScanModel(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_pkg_dir = Path(sys.modules[__name__].__file__)
+
+        self.base_pkg_dir = self.base_pkg_dir.resolve().parent.parent.joinpath('GUM_Dispenser')
+
+
+    def test_module_info(self):
+        """Test GUM_Dispenser.GUM_Scan_Model.ModuleInfo and its legacy dictionary adapter"""
+
+        module_info = ModuleInfo()
+
+        self.assertTrue(module_info.add_dependency('os'))
+
+        self.assertTrue(module_info.add_dependency('sys'))
+
+        self.assertFalse(module_info.add_dependency('os'))
+
+        outer_class = module_info.add_declaration('class Outer', 'Outer')
+
+        outer_class.add_declaration('def method(self)', 'method')
+
+        module_info.add_declaration('def helper()', 'helper')
+
+        # Declarations without nested declarations do not hold a dictionary
+
+        self.assertEqual(None, module_info.get_declaration('def helper()').declarations)
+
+        self.assertFalse(hasattr(outer_class, '__dict__'))
+
+        legacy_data = {'dependencies' : ['os', 'sys'],
+                       'declarations' : {'class Outer' : {'current_scope_name' : 'Outer',
+                                                          'def method(self)' : {'current_scope_name' : 'method'}},
+                                         'def helper()' : {'current_scope_name' : 'helper'}}}
+
+        self.assertEqual(legacy_data, module_info.as_dict())
+
+        self.assertEqual(legacy_data, as_module_dict(module_info))
+
+        self.assertTrue(as_module_dict(legacy_data) is legacy_data)
+
+        # Converting back keeps declaration order
+
+        self.assertEqual(list(legacy_data['declarations']),
+                         [signature for signature, declaration in as_module_info(legacy_data).iter_declarations()])
+
+        self.assertEqual(legacy_data, ModuleInfo.from_dict(legacy_data).as_dict())
+
+        self.assertTrue(isinstance(as_module_info(legacy_data).get_declaration('class Outer'), Declaration))
+
+        # Records cross process boundaries for worker pools
+
+        self.assertEqual(legacy_data, pickle.loads(pickle.dumps(module_info)).as_dict())
+
+
+    def test_describe_project_records(self):
+        """Test describe_project stores records that match the legacy dictionaries"""
+
+        test_distro_defs = {'package_names' : ['GUM_Dispenser']}
+
+        legacy_data = describe_project(test_distro_defs, self.base_pkg_dir.parent)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+
+            # Fresh scans, cached scans and scans from worker processes all give records
+
+            for scan_options in [{'records' : True}, {'records' : True, 'cache_dir' : cache_dir},
+                                 {'records' : True, 'cache_dir' : cache_dir}]:
+
+                for workers in [1, 2]:
+
+                    record_data = describe_project(test_distro_defs, self.base_pkg_dir.parent, workers,
+                                                   dict(scan_options))
+
+                    record_modules = record_data['packages']['GUM_Dispenser']['modules']
+
+                    self.assertTrue(all(isinstance(module_info, ModuleInfo) for module_info in
+                                        record_modules.values()))
+
+                    self.assertEqual(legacy_data['packages']['GUM_Dispenser']['modules'],
+                                     {module_name : module_info.as_dict() for module_name, module_info in
+                                      record_modules.items()})
+
+                    self.assertEqual(generate_project_nomnoml(legacy_data, ['GUM_Dispenser.GUM_Dispenser_Main:main']),
+                                     generate_project_nomnoml(record_data, ['GUM_Dispenser.GUM_Dispenser_Main:main']))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,333 @@
+
+import unittest
+
+from pathlib import Path
+
+import http.client
+
+import socket
+
+import tempfile
+
+import threading
+
+from benchmark.synthetic_project import generate_synthetic_project
+
+from GUM_Dispenser.GUM_Serve import parse_serve_address, new_serve_state, get_project_state, revalidate_project
+from GUM_Dispenser.GUM_Serve import render_request, create_server, allowed_host
+
+from GUM_Dispenser.GUM_setup_parser import parse_setup
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket"""
+
+    def __init__(self, socket_path: str) -> None:
+
+        super().__init__('localhost')
+
+        self.socket_path = socket_path
+
+
+    def connect(self) -> None:
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        self.sock.connect(self.socket_path)
+
+
+class TestGUMServe(unittest.TestCase):
+
+    def setUp(self):
+
+        self.project_context = tempfile.TemporaryDirectory()
+
+        self.project_dir = Path(self.project_context.name)
+
+        generate_synthetic_project(str(self.project_dir), 4)
+
+        self.package_dir = self.project_dir.joinpath('synthetic_0')
+
+
+    def tearDown(self):
+
+        self.project_context.cleanup()
+
+
+    def expected_nomnoml(self) -> str:
+
+        distro_defs = parse_setup(str(self.project_dir), 'accept')
+
+        return generate_project_nomnoml(describe_project(distro_defs, self.project_dir), distro_defs['entry_points'])
+
+
+    def test_parse_serve_address(self):
+        """Test GUM_Dispenser.GUM_Serve.parse_serve_address only accepts loopback hosts"""
+
+        self.assertEqual(('tcp', '127.0.0.1', 7337), parse_serve_address('127.0.0.1:7337'))
+
+        self.assertEqual(('tcp', '::1', 0), parse_serve_address('[::1]:0'))
+
+        self.assertEqual(('unix', '/tmp/gum.sock', None), parse_serve_address('unix:/tmp/gum.sock'))
+
+        for serve_address in ['0.0.0.0:7337', 'example.com:80', '127.0.0.1']:
+
+            with self.assertRaises(ValueError):
+
+                parse_serve_address(serve_address)
+
+
+    def test_allowed_host(self):
+        """Test GUM_Dispenser.GUM_Serve.allowed_host only accepts loopback names with the bound port"""
+
+        for host_header in ['127.0.0.1:7337', 'localhost:7337', 'LOCALHOST:7337', '[::1]:7337']:
+
+            self.assertTrue(allowed_host(host_header, 7337))
+
+        for host_header in [None, '', 'attacker.example:7337', '127.0.0.1:8080', '127.0.0.1', 'localhost:port',
+                            '127.0.0.1.attacker.example:7337']:
+
+            self.assertFalse(allowed_host(host_header, 7337))
+
+        self.assertTrue(allowed_host('localhost', 80))
+
+        self.assertTrue(allowed_host('localhost'))
+
+        self.assertFalse(allowed_host('localhost:7337'))
+
+
+    def test_project_limit(self):
+        """Test GUM_Dispenser.GUM_Serve.get_project_state drops the least recently requested project"""
+
+        serve_state = new_serve_state(max_projects=2)
+
+        project_dirs = [self.project_dir.joinpath('project_' + str(project_number)) for project_number in range(3)]
+
+        for project_dir in project_dirs:
+
+            project_dir.mkdir()
+
+        first_state = get_project_state(serve_state, str(project_dirs[0]))
+
+        get_project_state(serve_state, str(project_dirs[1]))
+
+        # Asking for the first project again makes the second the least recently requested
+
+        self.assertTrue(first_state is get_project_state(serve_state, str(project_dirs[0])))
+
+        get_project_state(serve_state, str(project_dirs[2]))
+
+        self.assertEqual([str(project_dirs[0].resolve()), str(project_dirs[2].resolve())],
+                         [project_key[0] for project_key in serve_state['projects']])
+
+
+    def test_revalidate_project(self):
+        """Test GUM_Dispenser.GUM_Serve.revalidate_project only rescans what changed on disk"""
+
+        serve_state = new_serve_state()
+
+        project_state = get_project_state(serve_state, str(self.project_dir))
+
+        self.assertTrue(project_state is get_project_state(serve_state, str(self.project_dir) + '/.'))
+
+        self.assertEqual('cold', revalidate_project(project_state, serve_state))
+
+        self.assertEqual('warm', revalidate_project(project_state, serve_state))
+
+        # Saving through a temporary file touches the directory without changing its modules
+
+        temporary_path = self.package_dir.joinpath('.module_0.py.swp')
+
+        temporary_path.write_text('draft')
+
+        temporary_path.unlink()
+
+        self.assertEqual('warm', revalidate_project(project_state, serve_state))
+
+        with open(str(self.package_dir.joinpath('module_0.py')), 'a') as module_file:
+
+            module_file.write('\ndef added_function():\n    pass\n')
+
+        self.assertEqual('rescanned', revalidate_project(project_state, serve_state))
+
+        self.assertTrue('def added_function()' in
+                        project_state['uml_data']['packages']['synthetic_0']['modules']['module_0'].declarations)
+
+        # A new module may be listed by __init__.py, so modules are discovered again
+
+        self.package_dir.joinpath('module_new.py').write_text('import os\n')
+
+        self.assertEqual('reloaded', revalidate_project(project_state, serve_state))
+
+        self.assertEqual('warm', revalidate_project(project_state, serve_state))
+
+
+    def test_revalidate_subpackage_layout(self):
+        """Test GUM_Dispenser.GUM_Serve.revalidate_project notices modules added to a subpackage"""
+
+        subpackage_dir = self.project_dir.joinpath('nested', 'sub')
+
+        subpackage_dir.mkdir(parents=True)
+
+        self.project_dir.joinpath('setup.py').write_text("setup(\n    packages=['nested'],\n)\n")
+
+        self.project_dir.joinpath('nested', '__init__.py').write_text("__all__ = ['a', 'sub']\n")
+
+        for package_file in ['a.py', 'sub/__init__.py', 'sub/b.py']:
+
+            self.project_dir.joinpath('nested', package_file).write_text('import os\n')
+
+        serve_state = new_serve_state()
+
+        project_state = get_project_state(serve_state, str(self.project_dir))
+
+        self.assertEqual('cold', revalidate_project(project_state, serve_state))
+
+        self.assertEqual(['a', 'sub.__init__', 'sub.b'],
+                         sorted(project_state['uml_data']['packages']['nested']['modules']))
+
+        subpackage_dir.joinpath('c.py').write_text('import os\n')
+
+        self.assertEqual('reloaded', revalidate_project(project_state, serve_state))
+
+        self.assertEqual(['a', 'sub.__init__', 'sub.b', 'sub.c'],
+                         sorted(project_state['uml_data']['packages']['nested']['modules']))
+
+        self.assertEqual('warm', revalidate_project(project_state, serve_state))
+
+        # The subpackage __init__.py decides which of its modules are included
+
+        subpackage_dir.joinpath('__init__.py').write_text("__all__ = ['b']\n")
+
+        self.assertEqual('reloaded', revalidate_project(project_state, serve_state))
+
+        self.assertEqual(['a', 'sub.b'], sorted(project_state['uml_data']['packages']['nested']['modules']))
+
+
+    def test_render_request(self):
+        """Test GUM_Dispenser.GUM_Serve.render_request answers like a direct run"""
+
+        serve_state = new_serve_state()
+
+        status, content_type, body_text, extra_headers = render_request(serve_state, {'path' : str(self.project_dir)})
+
+        self.assertEqual((200, 'cold'), (status, extra_headers['X-GUM-Scan']))
+
+        self.assertEqual(self.expected_nomnoml(), body_text)
+
+        status, content_type, body_text, extra_headers = render_request(serve_state, {'path' : str(self.project_dir),
+                                                                                      'format' : 'json'})
+
+        self.assertEqual((200, 'application/json', 'warm'), (status, content_type, extra_headers['X-GUM-Scan']))
+
+        self.assertEqual(404, render_request(serve_state, {'path' : str(self.project_dir.joinpath('missing'))})[0])
+
+        self.assertEqual(400, render_request(serve_state, {'path' : str(self.project_dir), 'format' : 'svg'})[0])
+
+        self.assertEqual(400, render_request(serve_state, {})[0])
+
+
+    def test_server(self):
+        """Test GUM_Dispenser.GUM_Serve.create_server over TCP and a Unix socket"""
+
+        socket_path = str(self.project_dir.joinpath('gum.sock'))
+
+        for serve_address in ['127.0.0.1:0', 'unix:' + socket_path]:
+
+            server = create_server(new_serve_state(), serve_address)
+
+            server_thread = threading.Thread(target=server.serve_forever)
+
+            server_thread.start()
+
+            try:
+
+                if serve_address.startswith('unix:'):
+
+                    connection = UnixHTTPConnection(socket_path)
+
+                else:
+
+                    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+
+                for expected_scan in ['cold', 'warm']:
+
+                    connection.request('GET', '/render?path=' + str(self.project_dir))
+
+                    response = connection.getresponse()
+
+                    self.assertEqual(200, response.status)
+
+                    self.assertEqual(expected_scan, response.getheader('X-GUM-Scan'))
+
+                    self.assertEqual(self.expected_nomnoml(), response.read().decode('utf-8'))
+
+                connection.request('GET', '/status')
+
+                self.assertTrue(str(self.project_dir.resolve()) in connection.getresponse().read().decode('utf-8'))
+
+                # Requests for other names are refused, so a rebound DNS name cannot reach the server
+
+                connection.request('GET', '/status', headers={'Host' : 'attacker.example'})
+
+                response = connection.getresponse()
+
+                self.assertEqual(403, response.status)
+
+                response.read()
+
+                connection.close()
+
+            finally:
+
+                server.shutdown()
+
+                server.server_close()
+
+                server_thread.join()
+
+
+
+    def test_create_server_socket_path(self):
+        """Test GUM_Dispenser.GUM_Serve.create_server only replaces stale sockets at a unix: path"""
+
+        socket_path = str(self.project_dir.joinpath('gum.sock'))
+
+        # A regular file at the socket path is left alone
+
+        Path(socket_path).write_text('keep me')
+
+        with self.assertRaises(FileExistsError):
+
+            create_server(new_serve_state(), 'unix:' + socket_path)
+
+        self.assertEqual('keep me', Path(socket_path).read_text())
+
+        Path(socket_path).unlink()
+
+        # A socket left behind by an earlier server is replaced
+
+        stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        stale_socket.bind(socket_path)
+
+        stale_socket.close()
+
+        server = create_server(new_serve_state(), 'unix:' + socket_path)
+
+        server.server_close()
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,103 @@
+
+import unittest
+
+import os
+
+import tempfile
+
+from pathlib import Path
+
+from GUM_Dispenser.GUM_Shard import split_by_package, build_package_edges, generate_index_nomnoml, write_shards
+from GUM_Dispenser.GUM_Shard import INDEX_FILE_NAME
+
+from GUM_Dispenser.GUM_Generate_NOMNOML import generate_project_nomnoml
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMShard(unittest.TestCase):
+
+    def setUp(self):
+
+        self.test_uml_data = {'packages' :
+                              {'app' : {'modules' : {'main' : {'dependencies' : ['util', 'lib', 'os'],
+                                                               'declarations' : {'def run()' : {
+                                                                   'current_scope_name' : 'run'}}},
+                                                     'cli' : {'dependencies' : ['helpers'], 'declarations' : {}}}},
+                               'lib' : {'modules' : {'util' : {'dependencies' : ['os'], 'declarations' : {}},
+                                                     'helpers' : {'dependencies' : ['util'],
+                                                                  'declarations' : {}}}}}}
+
+        self.test_entry_points = ['app.main:run']
+
+
+    def test_index(self):
+        """Test GUM_Dispenser.GUM_Shard.build_package_edges and generate_index_nomnoml"""
+
+        self.assertEqual(['app', 'lib'], list(split_by_package(self.test_uml_data)))
+
+        self.assertEqual({'' : {'modules' : {}}}, split_by_package({'modules' : {}}))
+
+        # main imports util and the lib package itself, cli imports helpers
+
+        self.assertEqual({('app', 'lib') : 3}, build_package_edges(self.test_uml_data))
+
+        self.assertEqual('#.entry: fill=#8f8\n[<entry>app]\n[lib]\n\n[app]-->3[lib]\n',
+                         generate_index_nomnoml(self.test_uml_data, self.test_entry_points))
+
+
+    def test_write_shards(self):
+        """Test GUM_Dispenser.GUM_Shard.write_shards renders the same shards serially and in parallel"""
+
+        with tempfile.TemporaryDirectory() as output_dir:
+
+            shard_contents = []
+
+            for workers in [1, 2]:
+
+                shard_dir = os.path.join(output_dir, str(workers))
+
+                written_files = write_shards(self.test_uml_data, self.test_entry_points, shard_dir, workers=workers)
+
+                self.assertEqual(os.path.join(shard_dir, INDEX_FILE_NAME), written_files['index'])
+
+                self.assertEqual(['app', 'lib'], list(written_files['shards']))
+
+                shard_contents.append({package : Path(shard_path).read_text()
+                                       for package, shard_path in written_files['shards'].items()})
+
+            self.assertEqual(shard_contents[0], shard_contents[1])
+
+            # Each shard is the diagram of its package alone, with only its own entry points
+
+            self.assertEqual(generate_project_nomnoml({'packages' : {'lib' : self.test_uml_data['packages']['lib']}},
+                                                      []) + '\n', shard_contents[0]['lib'])
+
+            self.assertTrue('[<entry>def run()]' in shard_contents[0]['app'])
+
+            # Render one shard again without touching the other
+
+            lib_path = os.path.join(output_dir, '1', 'lib.nomnoml')
+
+            os.remove(lib_path)
+
+            written_files = write_shards(self.test_uml_data, self.test_entry_points, os.path.join(output_dir, '1'),
+                                         packages=['app'])
+
+            self.assertEqual(['app'], list(written_files['shards']))
+
+            self.assertFalse(os.path.exists(lib_path))
+
+            with self.assertRaises(ValueError):
+
+                write_shards(self.test_uml_data, self.test_entry_points, output_dir, packages=['missing'])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
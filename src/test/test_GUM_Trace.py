@@ -0,0 +1,97 @@
+
+import unittest
+
+from pathlib import Path
+
+import os
+
+import sys
+
+import logging
+
+import tempfile
+
+from GUM_Dispenser.GUM_Trace import trace_event, write_trace, read_trace
+
+from GUM_Dispenser.GUM_Describe_Source import describe_module
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMTrace(unittest.TestCase):
+
+    def setUp(self):
+
+        self.base_pkg_dir = Path(sys.modules[__name__].__file__)
+
+        self.base_pkg_dir = self.base_pkg_dir.resolve().parent.parent.joinpath('GUM_Dispenser')
+
+        self.trace_context = tempfile.TemporaryDirectory()
+
+        self.trace_path = os.path.join(self.trace_context.name, 'trace.jsonl')
+
+
+    def tearDown(self):
+
+        self.trace_context.cleanup()
+
+        logging.getLogger('GUM Dispenser').setLevel(logging.INFO)
+
+
+    def test_write_trace(self):
+        """Test GUM_Dispenser.GUM_Trace.trace_event, write_trace and read_trace"""
+
+        trace_lines = []
+
+        trace_event(trace_lines, 'token', module='example', type='NAME', string='def')
+
+        write_trace(self.trace_path, trace_lines)
+
+        # Nothing is written for an empty trace, and later writes append
+
+        write_trace(self.trace_path, [])
+
+        write_trace(self.trace_path, trace_lines)
+
+        self.assertEqual([{'event' : 'token', 'module' : 'example', 'type' : 'NAME', 'string' : 'def'}] * 2,
+                         read_trace(self.trace_path))
+
+
+    def test_describe_module_trace(self):
+        """Test describe_module only traces when debug messages are enabled"""
+
+        scan_options = {'trace_path' : self.trace_path}
+
+        describe_module('None', 'GUM_Exceptions', self.base_pkg_dir, {'modules' : {}}, scan_options)
+
+        self.assertFalse(os.path.exists(self.trace_path))
+
+        for engine in ['tokenize', 'ast']:
+
+            logging.getLogger('GUM Dispenser').setLevel(logging.DEBUG)
+
+            scan_options['engine'] = engine
+
+            describe_module('None', 'GUM_Exceptions', self.base_pkg_dir, {'modules' : {}}, scan_options)
+
+            trace_events = read_trace(self.trace_path)
+
+            os.remove(self.trace_path)
+
+            scope_events = [trace_line['scope'] for trace_line in trace_events if trace_line['event'] == 'scope_enter']
+
+            self.assertTrue('class InvalidSourcePathError(Exception)' in scope_events)
+
+            if engine == 'tokenize':
+
+                self.assertTrue(any(trace_line['event'] == 'token' for trace_line in trace_events))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,171 @@
+
+import unittest
+
+from unittest.mock import patch, Mock
+
+from pathlib import Path
+
+import os
+
+import tempfile
+
+from GUM_Dispenser.GUM_Watch_Source import module_source_paths, snapshot_modules, find_changed_modules
+from GUM_Dispenser.GUM_Watch_Source import watch_project
+
+from GUM_Dispenser.GUM_Describe_Source import describe_project, describe_module
+
+from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
+
+
+def setUpModule():
+
+    initialize_log({'debug' : False})
+
+
+class TestGUMWatchSource(unittest.TestCase):
+
+    def setUp(self):
+
+        self.project_context = tempfile.TemporaryDirectory()
+
+        self.project_dir = Path(self.project_context.name)
+
+        self.write_module('first', 'import os\n\ndef first_function():\n    pass\n')
+
+        self.write_module('second', 'import sys\n\nclass Second:\n    pass\n')
+
+        self.uml_data = describe_project({'module_names' : ['first', 'second']}, self.project_dir)
+
+
+    def tearDown(self):
+
+        self.project_context.cleanup()
+
+
+    def write_module(self, module_name: str, module_text: str) -> None:
+
+        with open(str(self.project_dir.joinpath(module_name + '.py')), 'w') as module_file:
+
+            module_file.write(module_text)
+
+
+    def test_find_changed_modules(self):
+        """Test GUM_Dispenser.GUM_Watch_Source.find_changed_modules"""
+
+        module_paths = module_source_paths(self.uml_data, self.project_dir)
+
+        self.assertEqual({('None', 'first') : self.project_dir, ('None', 'second') : self.project_dir}, module_paths)
+
+        module_snapshot = snapshot_modules(module_paths)
+
+        self.assertEqual([], find_changed_modules(module_paths, module_snapshot))
+
+        self.write_module('second', 'import sys\nimport re\n\nclass Second:\n    pass\n')
+
+        self.assertEqual([('None', 'second')], find_changed_modules(module_paths, module_snapshot))
+
+        # The snapshot is updated, so the same change is only reported once
+
+        self.assertEqual([], find_changed_modules(module_paths, module_snapshot))
+
+
+    def test_watch_project(self):
+        """Test GUM_Dispenser.GUM_Watch_Source.watch_project"""
+
+        # Edit one module during the first poll and nothing during the second
+
+        edits = [lambda: self.write_module('first', 'import os\nimport re\n\ndef renamed_function():\n    pass\n'),
+                 lambda: None]
+
+        mock_sleep = Mock(side_effect=lambda interval: edits.pop(0)())
+
+        mock_render = Mock()
+
+        with patch('GUM_Dispenser.GUM_Watch_Source.describe_module', new=Mock(wraps=describe_module)) as rescan:
+
+            uml_data = watch_project(self.uml_data, self.project_dir, mock_render, max_polls=2, sleep=mock_sleep)
+
+        # Only the changed module was scanned again, and only one render happened
+
+        self.assertEqual(1, rescan.call_count)
+
+        mock_render.assert_called_once()
+
+        self.assertEqual(['os', 're'], uml_data['modules']['first']['dependencies'])
+
+        self.assertTrue('def renamed_function()' in uml_data['modules']['first']['declarations'])
+
+        # Module order is preserved when splicing results back in
+
+        self.assertEqual(['first', 'second'], list(uml_data['modules']))
+
+
+        # Removed modules leave the diagram
+
+        edits = [lambda: os.remove(str(self.project_dir.joinpath('second.py')))]
+
+        uml_data = watch_project(uml_data, self.project_dir, mock_render, max_polls=1, sleep=mock_sleep)
+
+        self.assertEqual(['first'], list(uml_data['modules']))
+
+
+    def test_watch_project_layout(self):
+        """Test GUM_Dispenser.GUM_Watch_Source.watch_project picks up added and removed modules"""
+
+        package_dir = self.project_dir.joinpath('pkg')
+
+        package_dir.joinpath('sub').mkdir(parents=True)
+
+        for module_path, module_text in [('__init__.py', ''), ('a.py', 'import os\n'), ('sub/__init__.py', ''),
+                                         ('sub/b.py', 'import sys\n')]:
+
+            package_dir.joinpath(module_path).write_text(module_text)
+
+        uml_data = describe_project({'package_names' : ['pkg']}, self.project_dir)
+
+        # Add a module to the subpackage, then remove one from the package, then change nothing
+
+        edits = [lambda: package_dir.joinpath('sub', 'c.py').write_text('import re\n'),
+                 lambda: package_dir.joinpath('a.py').unlink(),
+                 lambda: None]
+
+        mock_sleep = Mock(side_effect=lambda interval: edits.pop(0)())
+
+        mock_render = Mock()
+
+        rendered_modules = []
+
+        mock_render.side_effect = lambda current_data: rendered_modules.append(
+            list(current_data['packages']['pkg']['modules']))
+
+        with patch('GUM_Dispenser.GUM_Watch_Source.describe_module', new=Mock(wraps=describe_module)) as rescan:
+
+            uml_data = watch_project(uml_data, self.project_dir, mock_render, max_polls=3, sleep=mock_sleep)
+
+        # Only the new module was scanned, and each change was rendered once
+
+        self.assertEqual(1, rescan.call_count)
+
+        self.assertEqual([['__init__', 'a', 'sub.__init__', 'sub.b', 'sub.c'],
+                          ['__init__', 'sub.__init__', 'sub.b', 'sub.c']], rendered_modules)
+
+        self.assertEqual(['re'], uml_data['packages']['pkg']['modules']['sub.c']['dependencies'])
+
+
+    def test_watch_project_bad_save(self):
+        """Test GUM_Dispenser.GUM_Watch_Source.watch_project with a module that does not tokenize"""
+
+        edits = [lambda: self.write_module('first', 'def broken(:\n    """unterminated\n')]
+
+        mock_sleep = Mock(side_effect=lambda interval: edits.pop(0)())
+
+        with self.assertLogs(logger='GUM Dispenser', level='ERROR'):
+
+            uml_data = watch_project(self.uml_data, self.project_dir, Mock(), max_polls=1, sleep=mock_sleep)
+
+        self.assertTrue('def first_function()' in uml_data['modules']['first']['declarations'])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -9,11 +9,13 @@ import sys
 
 import os
 
+import tempfile
+
 from GUM_Dispenser.GUM_setup_parser import parse_setup, read_setup_contents, check_setup_size, handle_invalid_setup_size
 
 from GUM_Dispenser.GUM_Dispenser_Main import initialize_log
 
-from GUM_Dispenser.GUM_Exceptions import UserConfirmedInvalidSetup, ConfigurationNotFoundError
+from GUM_Dispenser.GUM_Exceptions import UserConfirmedInvalidSetup, ConfigurationNotFoundError, SetupSizeLimitError
 
 
 # Mock for setup size > 2 KB
@@ -100,7 +102,7 @@ class TestSetupParser(unittest.TestCase):
 
         # Test error is still raised from parse_setup if size is > 2 KB
 
-        mock_check_setup = Mock(side_effect=lambda setup_path: {'valid_size' : False})
+        mock_check_setup = Mock(side_effect=lambda setup_path, size_limit: {'valid_size' : False})
 
         mock_prompt = Mock(side_effect=lambda text: 'no')
 
@@ -108,7 +110,9 @@ class TestSetupParser(unittest.TestCase):
 
             with patch('builtins.input', new=mock_prompt):
 
-                self.assertRaises(UserConfirmedInvalidSetup, parse_setup, str(self.base_src_dir))
+                with patch('GUM_Dispenser.GUM_setup_parser.sys.stdin', new=Mock(isatty=Mock(return_value=True))):
+
+                    self.assertRaises(UserConfirmedInvalidSetup, parse_setup, str(self.base_src_dir))
 
 
         # Test normal execution of setup parser
@@ -137,6 +141,73 @@ class TestSetupParser(unittest.TestCase):
             self.assertRaises(ConfigurationNotFoundError, parse_setup, str(self.base_src_dir))
 
 
+    def test_setup_size_policy(self):
+        """Test parse_setup size policies never block without a terminal"""
+
+        with tempfile.TemporaryDirectory() as setup_dir:
+
+            # Packages come first, followed by a long list of entry points
+
+            with open(os.path.join(setup_dir, 'setup.py'), 'w') as setup_file:
+
+                setup_file.write("from setuptools import setup\n\nsetup(\n    packages=['pkg'],\n" +
+                                 "    entry_points={\n        'console_scripts': [\n" +
+                                 ''.join("            'tool_" + str(tool_index) + " = pkg.cli:main_" +
+                                         str(tool_index) + "',\n" for tool_index in range(100)) +
+                                 "        ]\n    }\n)\n")
+
+            mock_prompt = Mock(side_effect=AssertionError('Prompted without a terminal'))
+
+            with patch('builtins.input', new=mock_prompt), \
+                    patch('GUM_Dispenser.GUM_setup_parser.sys.stdin', new=Mock(isatty=Mock(return_value=False))):
+
+                self.assertRaises(SetupSizeLimitError, parse_setup, setup_dir, 'reject')
+
+                with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+                    setup_info = parse_setup(setup_dir, 'accept')
+
+                self.assertTrue('Accepting setup.py larger than 2000 bytes' in log_context.output[0])
+
+                self.assertEqual(100, len(setup_info['entry_points']))
+
+                # By default, and for a prompt nobody can answer, we read up to the limit and keep what we found
+
+                for size_policy in [None, 'truncate', 'prompt']:
+
+                    with self.assertLogs(logger='GUM Dispenser', level='WARNING') as log_context:
+
+                        setup_info = parse_setup(setup_dir, size_policy)
+
+                    self.assertTrue(any('Reading only the first 2000 bytes' in message
+                                        for message in log_context.output))
+
+                    self.assertTrue(any('cut off at the size limit' in message for message in log_context.output))
+
+                    self.assertEqual(['pkg'], setup_info['package_names'])
+
+                    self.assertTrue(0 < len(setup_info['entry_points']) < 100)
+
+                # Nothing happens below the limit
+
+                self.assertEqual(100, len(parse_setup(setup_dir, 'reject', 100000)['entry_points']))
+
+                # A cut through a character encoded in several bytes is not a decoding error
+
+                setup_text = "\nfrom setuptools import setup\n\nsetup(\n    packages=['pkg'],\n" + \
+                    "    description='" + '\u00e9' * 3000 + "',\n)\n"
+
+                self.assertTrue(0x80 <= setup_text.encode('utf-8')[2000] < 0xc0)
+
+                with open(os.path.join(setup_dir, 'setup.py'), 'w', encoding='utf-8') as setup_file:
+
+                    setup_file.write(setup_text)
+
+                with self.assertLogs(logger='GUM Dispenser', level='WARNING'):
+
+                    self.assertEqual(['pkg'], parse_setup(setup_dir, 'truncate')['package_names'])
+
+
 if __name__ == '__main__':
 
     unittest.main()